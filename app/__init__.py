@@ -1,7 +1,16 @@
+import logging
 from flask import Flask
 from flask_cors import CORS
 import os
+
+# Logging first, so records emitted while the modules below are imported go through the pipeline
+from .core.logging_setup import configure_logging
+configure_logging()
+
 from .core.data_loader import DataLoader
+from .core.lifecycle import lifecycle
+
+logger = logging.getLogger(__name__)
 
 # Global Data Loader Instance
 loader = None
@@ -24,19 +33,32 @@ def create_app():
     
     CORS(app, supports_credentials=True)
     
-    # Initialize Data Loader
+    # orjson-backed jsonify (NumPy-aware); JSON_PROVIDER=stdlib to opt out
+    from .core.json_provider import init_json
+    init_json(app)
+    
+    # Static files: hashed/precompressed variants from the asset build (python -m app.core.static_assets)
+    from .core.static_assets import static_assets
+    app.view_functions['static'] = static_assets.send
+    app.jinja_env.globals['asset_url'] = static_assets.url
+    
+    # Opt-in request profiling + continuous stack sampling (registered first so captures include compression)
+    from .core.profiling import init_profiling
+    init_profiling(app)
+    
+    # Request timing + /metrics (registered before compression so byte counts are on-the-wire sizes)
+    from .core.metrics import init_metrics
+    init_metrics(app)
+    
+    # gzip/brotli for dynamic JSON/HTML responses
+    from .core.compression import init_compression
+    init_compression(app)
+    
+    # Data Loader instance is created now; the CSVs are loaded by the warm-up below
     BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
     
     if loader is None:
         loader = DataLoader(BASE_DIR)
-        loader.load_all_data()
-    
-    # Initialize Supabase Database
-    try:
-        from .core.database import init_database
-        init_database()
-    except Exception as e:
-        print(f"[App] Database initialization warning: {e}")
     
     # Register Auth Blueprint
     from .auth_routes import auth_bp
@@ -54,13 +76,48 @@ def create_app():
     from .notification_routes import notification_bp
     app.register_blueprint(notification_bp)
     
-    # Initialize Notification System (Firebase + Scheduler)
+    # Slow startup work runs in the background; /readyz reports progress
+    register_warmup_tasks()
+    lifecycle.start()
+
+    return app
+
+
+def _load_nutrition_data():
+    loader.load_all_data()
+    
+    # Keep the sharded client export (static/data/nutrition) in sync with the CSVs
     try:
-        from .services.notification_service import init_notifications
-        notification_status = init_notifications()
-        print(f"[App] Notification system: Firebase={notification_status['firebase']}, Scheduler={notification_status['scheduler']}")
+        from .core.nutrition_export import ensure_nutrition_export
+        ensure_nutrition_export(loader)
     except Exception as e:
-        print(f"[App] Notification system initialization warning: {e}")
+        logger.warning("Nutrition export warning: %s", e)
+    
+    foods = len(loader.get_dataframe())
+    return {"ok": foods > 0, "foods": foods}
+
+
+def _init_database():
+    from .core.database import init_database
+    return init_database()
+
+
+def _init_notifications():
+    # Firebase + Scheduler, then restore jobs from the database
+    from .services.notification_service import init_notifications
+    status = init_notifications()
+    logger.info("Notification system: Firebase=%s, Scheduler=%s", status['firebase'], status['scheduler'])
+    return dict(status, ok=status['scheduler'])
+
+
+def _init_ai_clients():
+    from .services.ai_diet_service import client_pool, GEMINI_API_KEYS
+    warmed = client_pool.warm(GEMINI_API_KEYS)
+    return {"ok": warmed > 0, "clients": warmed}
 
-    return app
 
+def register_warmup_tasks():
+    lifecycle.register('nutrition_data', _load_nutrition_data)
+    lifecycle.register('database', _init_database, retry=True)
+    lifecycle.register('notifications', _init_notifications, depends_on=('database',), critical=False)
+    lifecycle.register('ai_clients', _init_ai_clients, critical=False)
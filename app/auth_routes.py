@@ -8,6 +8,10 @@ from .core.database import (
     create_user, authenticate_user, get_user_by_id,
     get_profile, get_profile_progress, save_profile_step, clear_all_data
 )
+from .core.session_profile import (
+    get_profile_snapshot, store_from_progress, record_profile_step, clear_snapshot
+)
+from .services.assistant_cache import profile_context_cache
 import os
 
 auth_bp = Blueprint('auth', __name__)
@@ -73,6 +77,7 @@ def signup():
         # Auto-login after signup
         session['user_id'] = user_id
         session.permanent = True
+        store_from_progress(user_id, {"has_profile": False, "is_complete": False, "current_step": 1})
         
         return jsonify({
             "success": True,
@@ -102,8 +107,9 @@ def login():
         session['user_id'] = user_id
         session.permanent = True
         
-        # Check profile status
+        # Check profile status (and seed the session snapshot used by /api/auth/status)
         progress = get_profile_progress(user_id)
+        store_from_progress(user_id, progress)
         
         if progress['is_complete']:
             redirect_url = '/diet'
@@ -123,17 +129,33 @@ def login():
 
 @auth_bp.route('/api/auth/status', methods=['GET'])
 def auth_status():
-    """Get current auth status and profile progress"""
+    """
+    Get current auth status and profile progress.
+    Answered from the session snapshot; ?full=1 loads the full profile from the database.
+    """
     if is_authenticated():
         user_id = get_current_user()
-        progress = get_profile_progress(user_id)
+        
+        if request.args.get('full') == '1':
+            progress = get_profile_progress(user_id)
+            store_from_progress(user_id, progress)
+            return jsonify({
+                "authenticated": True,
+                "user_id": user_id,
+                "has_profile": progress['has_profile'],
+                "is_complete": progress['is_complete'],
+                "current_step": progress['current_step'],
+                "profile": progress['profile']
+            })
+        
+        snapshot = get_profile_snapshot(user_id)
         return jsonify({
             "authenticated": True,
             "user_id": user_id,
-            "has_profile": progress['has_profile'],
-            "is_complete": progress['is_complete'],
-            "current_step": progress['current_step'],
-            "profile": progress['profile']
+            "has_profile": snapshot['has_profile'],
+            "is_complete": snapshot['is_complete'],
+            "current_step": snapshot['current_step'],
+            "profile": {"name": snapshot['name']} if snapshot['name'] else None
         })
     
     return jsonify({
@@ -167,8 +189,10 @@ def save_profile_step_api():
     
     user_id = get_current_user()
     result = save_profile_step(user_id, step, step_data)
+    profile_context_cache.invalidate(user_id)
     
     if result:
+        record_profile_step(user_id, step, result)
         return jsonify({
             "success": True,
             "message": f"Step {step} saved",
@@ -206,6 +230,7 @@ def clear_database():
         return jsonify({"error": "Unauthorized"}), 403
     
     success = clear_all_data()
+    clear_snapshot()
     
     return jsonify({
         "success": success,
@@ -0,0 +1,71 @@
+"""
+Response Compression for DietNotify
+Compresses JSON/HTML/text responses above a size threshold with brotli (if installed) or gzip
+Static files are not touched here - they are served precompressed by static_assets
+"""
+import os
+import gzip
+
+from flask import Flask, request, Response
+
+from .static_assets import brotli, BROTLI_AVAILABLE
+
+
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))    # bytes
+COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', '6'))
+COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', '5'))   # dynamic: favour speed
+
+COMPRESSIBLE_TYPES = {
+    'application/json',
+    'text/html',
+    'text/plain',
+    'text/css',
+    'text/javascript',
+    'application/javascript',
+    'image/svg+xml',
+}
+
+
+def choose_encoding() -> str:
+    """Best encoding the client accepts ('br', 'gzip' or '')."""
+    accepted = request.accept_encodings
+    if BROTLI_AVAILABLE and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return ''
+
+
+def compress_response(response: Response) -> Response:
+    if (response.status_code < 200 or response.status_code >= 300 or response.status_code == 204
+            or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    if (response.content_length or 0) < COMPRESS_MIN_SIZE:
+        return response
+    encoding = choose_encoding()
+    if not encoding:
+        return response
+
+    data = response.get_data()
+    if encoding == 'br':
+        body = brotli.compress(data, quality=COMPRESS_BROTLI_QUALITY)
+    else:
+        body = gzip.compress(data, compresslevel=COMPRESS_GZIP_LEVEL)
+    if len(body) >= len(data):
+        return response
+
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    # A strong ETag names one representation: give the encoded body its own tag
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+    return response
+
+
+def init_compression(app: Flask):
+    app.after_request(compress_response)
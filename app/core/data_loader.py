@@ -1,11 +1,19 @@
+import logging
 import pandas as pd
 import glob
 import os
 
+from .fuzzy_index import FuzzyIndex, FUZZY_MIN_RESULTS
+
+logger = logging.getLogger(__name__)
+
+
 class DataLoader:
     def __init__(self, base_dir):
         self.base_dir = base_dir
         self.data = pd.DataFrame()
+        self.source_files = []   # CSVs that fed the knowledge base (drives the client export)
+        self.fuzzy = None        # typo-tolerant fallback index over the food names
         self.non_veg_keywords = [
             "chicken", "beef", "pork", "ham", "turkey", "fish", "salmon", "tuna", 
             "shrimp", "crab", "lobster", "oyster", "clam", "mussel", "egg", 
@@ -17,24 +25,26 @@ class DataLoader:
         self.veg_exceptions = ["eggplant", "vegetable burger", "veggie burger"]
 
     def load_all_data(self):
-        print("Initializing Data Pipeline...")
+        logger.info("Initializing Data Pipeline...")
         all_dfs = []
+        self.source_files = []
 
         # 1. Load Combined Data (Primary)
         combined_path = os.path.join(self.base_dir, "data", "nutrition_db", "DeitNotify", "nutrition prediction", "dataset", "combined_food_data.csv")
-        print(f"Checking path: {combined_path}")
-        print(f"Path exists: {os.path.exists(combined_path)}")
+        logger.debug("Checking path: %s", combined_path)
+        logger.debug("Path exists: %s", os.path.exists(combined_path))
         if os.path.exists(combined_path):
             try:
-                print(f"Loading Primary Dataset: {combined_path}")
+                logger.info("Loading Primary Dataset: %s", combined_path)
                 df1 = pd.read_csv(combined_path, encoding='utf-8')
                 df1.columns = df1.columns.str.strip()
                 all_dfs.append(df1)
-                print(f"Loaded {len(df1)} records from combined_food_data.csv")
+                self.source_files.append(combined_path)
+                logger.info("Loaded %s records from combined_food_data.csv", len(df1))
             except Exception as e:
-                print(f"Error loading {combined_path}: {e}")
+                logger.error("Error loading %s: %s", combined_path, e)
         else:
-            print(f"WARNING: Combined data file not found at {combined_path}")
+            logger.warning("Combined data file not found at %s", combined_path)
 
         # 2. Load Group Data (Supplemental)
         # Pattern: data/nutrition_db/FINAL FOOD DATASET/FOOD-DATA-GROUP*.csv
@@ -43,34 +53,36 @@ class DataLoader:
         
         for f in group_files:
             try:
-                print(f"Loading Group Dataset: {f}")
+                logger.info("Loading Group Dataset: %s", f)
                 df_g = pd.read_csv(f, encoding='utf-8')
                 df_g.columns = df_g.columns.str.strip()
                 all_dfs.append(df_g)
-                print(f"Loaded {len(df_g)} records from {os.path.basename(f)}")
+                self.source_files.append(f)
+                logger.info("Loaded %s records from %s", len(df_g), os.path.basename(f))
             except Exception as e:
-                print(f"Error loading {f}: {e}")
+                logger.error("Error loading %s: %s", f, e)
 
         # 3. Load Indian Foods Dataset (NEW)
         indian_foods_path = os.path.join(self.base_dir, "data", "nutrition_db", "indian_foods.csv")
         if os.path.exists(indian_foods_path):
             try:
-                print(f"Loading Indian Foods Dataset: {indian_foods_path}")
+                logger.info("Loading Indian Foods Dataset: %s", indian_foods_path)
                 df_indian = pd.read_csv(indian_foods_path, encoding='utf-8')
                 df_indian.columns = df_indian.columns.str.strip()
                 all_dfs.append(df_indian)
-                print(f"Loaded {len(df_indian)} records from indian_foods.csv")
+                self.source_files.append(indian_foods_path)
+                logger.info("Loaded %s records from indian_foods.csv", len(df_indian))
             except Exception as e:
-                print(f"Error loading Indian foods: {e}")
+                logger.error("Error loading Indian foods: %s", e)
 
         if not all_dfs:
-            print("CRITICAL: No data loaded.")
+            logger.critical("No data loaded.")
             return
 
         # 3. Merge
         # We use concat. Columns that don't match will be filled with NaN (later 0)
         self.data = pd.concat(all_dfs, ignore_index=True)
-        print(f"Total Raw Records: {len(self.data)}")
+        logger.info("Total Raw Records: %s", len(self.data))
 
         # 4. Filter Duplicates (by Food Name)
         if 'food' in self.data.columns:
@@ -82,7 +94,12 @@ class DataLoader:
         # 6. Clean Nans
         self.data.fillna(0, inplace=True)
         
-        print(f"Final Knowledge Base Size: {len(self.data)} items.")
+        # 7. Fuzzy index (row positions into self.data)
+        if 'food' in self.data.columns:
+            self.fuzzy = FuzzyIndex(self.data['food'])
+            logger.info("Fuzzy index: %s words, %s delete variants", len(self.fuzzy.postings), len(self.fuzzy.deletes))
+        
+        logger.info("Final Knowledge Base Size: %s items.", len(self.data))
 
     def _apply_veg_filter(self):
         if 'food' not in self.data.columns:
@@ -99,17 +116,37 @@ class DataLoader:
         self.data = self.data[self.data['food'].apply(is_veg)]
 
     def search(self, query, limit=20):
-        if self.data.empty: return []
+        return self.search_frame(query, limit).to_dict(orient='records')
+
+    def search_frame(self, query, limit=20, after=None):
+        """
+        Matching rows as a DataFrame slice (serialize with frame_response, no per-row dicts).
+        Rows are ordered by (rank, row index); `after` is the (rank, index) of the last row
+        already returned, for keyset paging.
+        """
+        if self.data.empty: return self.data
         
         query = query.lower()
         # Simple text search (can be upgraded to TF-IDF)
         matches = self.data[self.data['food'].str.lower().str.contains(query, na=False)]
         
-        # Sort: Exact start first
+        # Sort: Exact start first (stable, so ties keep knowledge-base order for paging)
         matches['rank'] = matches['food'].apply(lambda x: 0 if x.lower().startswith(query) else 1)
-        matches = matches.sort_values('rank')
         
-        return matches.head(limit).to_dict(orient='records')
+        # Few exact hits: add typo-tolerant matches after them, ranked 2 + edit distance
+        if len(matches) < FUZZY_MIN_RESULTS and self.fuzzy is not None:
+            hits = [(p, d) for p, d in self.fuzzy.search(query) if self.data.index[p] not in matches.index]
+            if hits:
+                fuzzy = self.data.iloc[[p for p, _ in hits]].assign(rank=[2 + d for _, d in hits])
+                matches = pd.concat([matches, fuzzy])
+        
+        matches = matches.sort_values('rank', kind='stable')
+        
+        if after is not None:
+            rank, index = after
+            matches = matches[(matches['rank'] > rank) | ((matches['rank'] == rank) & (matches.index > index))]
+        
+        return matches.head(limit)
 
     def get_dataframe(self):
         return self.data
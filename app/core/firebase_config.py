@@ -10,16 +10,13 @@ SETUP INSTRUCTIONS:
 5. Save as "firebase-admin-key.json" in this folder (app/core/)
 6. IMPORTANT: Add firebase-admin-key.json to .gitignore!
 """
+import logging
 import os
 import json
-from datetime import datetime
 
-def log_to_file(msg):
-    try:
-        with open("notification_debug.log", "a", encoding="utf-8") as f:
-            f.write(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {msg}\n")
-    except:
-        pass
+from .metrics import observe_upstream
+
+logger = logging.getLogger(__name__)
 
 # Firebase Admin SDK
 try:
@@ -27,7 +24,7 @@ try:
     from firebase_admin import credentials, messaging
     FIREBASE_AVAILABLE = True
 except ImportError:
-    print("[Firebase] firebase-admin not installed. Run: pip install firebase-admin")
+    logger.warning("firebase-admin not installed. Run: pip install firebase-admin")
     FIREBASE_AVAILABLE = False
     firebase_admin = None
     credentials = None
@@ -52,9 +49,9 @@ else:
     FIREBASE_KEY_PATH = None
 
 if not FIREBASE_KEY_PATH:
-    print("[Firebase] WARNING: Service account key not found in any standard location!")
+    logger.warning("Service account key not found in any standard location!")
 else:
-    print(f"[Firebase] Loaded key from: {FIREBASE_KEY_PATH}")
+    logger.info("Loaded key from: %s", FIREBASE_KEY_PATH)
 
 # Firebase Web Config (for frontend)
 FIREBASE_WEB_CONFIG = {
@@ -78,25 +75,25 @@ def init_firebase():
     global _firebase_app
     
     if not FIREBASE_AVAILABLE:
-        print("[Firebase] SDK not available - notifications disabled")
+        logger.warning("SDK not available - notifications disabled")
         return False
     
     if _firebase_app:
-        print("[Firebase] Already initialized")
+        logger.info("Already initialized")
         return True
     
     if not os.path.exists(FIREBASE_KEY_PATH):
-        print(f"[Firebase] Service account key not found at: {FIREBASE_KEY_PATH}")
-        print("[Firebase] Please follow setup instructions in this file")
+        logger.warning("Service account key not found at: %s", FIREBASE_KEY_PATH)
+        logger.warning("Please follow setup instructions in this file")
         return False
     
     try:
         cred = credentials.Certificate(FIREBASE_KEY_PATH)
         _firebase_app = firebase_admin.initialize_app(cred)
-        print("[Firebase] Admin SDK initialized successfully!")
+        logger.info("Admin SDK initialized successfully!")
         return True
     except Exception as e:
-        print(f"[Firebase] Initialization error: {e}")
+        logger.error("Initialization error: %s", e)
         return False
 
 
@@ -114,7 +111,7 @@ def send_push_notification(token: str, title: str, body: str, data: dict = None)
         True if sent successfully, False otherwise
     """
     if not FIREBASE_AVAILABLE or not _firebase_app:
-        print("[Firebase] Not initialized - cannot send notification")
+        logger.warning("Not initialized - cannot send notification")
         return False
     
     try:
@@ -145,18 +142,20 @@ def send_push_notification(token: str, title: str, body: str, data: dict = None)
             )
         )
         
-        response = messaging.send(message)
-        log_to_file(f"[Firebase] Notification sent: {response}")
-        print(f"[Firebase] Notification sent: {response}")
+        with observe_upstream('fcm', 'send') as call:
+            try:
+                response = messaging.send(message)
+            except messaging.UnregisteredError:
+                call.status = 'unregistered'
+                raise
+        logger.info("Notification sent: %s", response)
         return True
         
     except messaging.UnregisteredError:
-        log_to_file(f"[Firebase] Token invalid/unregistered: {token[:20]}...")
-        print(f"[Firebase] Token invalid/unregistered: {token[:20]}...")
+        logger.warning("Token invalid/unregistered: %s...", token[:20])
         return False
     except Exception as e:
-        log_to_file(f"[Firebase] Send error: {e}")
-        print(f"[Firebase] Send error: {e}")
+        logger.error("Send error: %s", e)
         return False
 
 
@@ -190,8 +189,11 @@ def send_bulk_notifications(tokens: list, title: str, body: str, data: dict = No
             )
         )
         
-        response = messaging.send_each_for_multicast(message)
-        print(f"[Firebase] Bulk send: {response.success_count} success, {response.failure_count} failed")
+        with observe_upstream('fcm', 'send_multicast') as call:
+            response = messaging.send_each_for_multicast(message)
+            if response.failure_count:
+                call.status = 'partial' if response.success_count else 'failed'
+        logger.info("Bulk send: %s success, %s failed", response.success_count, response.failure_count)
         
         return {
             "success_count": response.success_count,
@@ -199,7 +201,7 @@ def send_bulk_notifications(tokens: list, title: str, body: str, data: dict = No
         }
         
     except Exception as e:
-        print(f"[Firebase] Bulk send error: {e}")
+        logger.error("Bulk send error: %s", e)
         return {"success_count": 0, "failure_count": len(tokens), "error": str(e)}
 
 
@@ -0,0 +1,111 @@
+"""
+Typo-Tolerant Food Search for DietNotify
+SymSpell-style deletion dictionary over the words of the food names: every word (prefix) is indexed
+under all its variants with up to `max_distance` characters deleted, so a misspelled query word is
+matched by generating its own deletes and verifying candidates with a bounded edit distance.
+"""
+import os
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+FUZZY_MAX_DISTANCE = int(os.getenv('FUZZY_MAX_DISTANCE', '2'))
+FUZZY_MIN_RESULTS = int(os.getenv('FUZZY_MIN_RESULTS', '5'))    # fuzzy fallback below this many exact hits; 0 = off
+FUZZY_PREFIX_LENGTH = 7     # SymSpell prefix: longer words are indexed by their first 7 characters
+FUZZY_MIN_WORD = 3          # shorter query/name words are ignored (too many neighbours)
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+def words(text: str) -> List[str]:
+    return [w for w in _WORD.findall(str(text).lower()) if len(w) >= FUZZY_MIN_WORD]
+
+
+def allowed_distance(word: str, max_distance: int = FUZZY_MAX_DISTANCE) -> int:
+    """1 typo for words up to 5 characters, `max_distance` beyond."""
+    return min(max_distance, 1) if len(word) <= 5 else max_distance
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (adjacent transpositions count 1); limit + 1 once exceeded."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if a == b:
+        return 0
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    found = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier if len(w) > 1 for i in range(len(w))}
+        found |= frontier
+    return found
+
+
+class FuzzyIndex:
+    """Deletion dictionary over name words, with word -> row postings."""
+
+    def __init__(self, names: Iterable[str], max_distance: int = FUZZY_MAX_DISTANCE,
+                 prefix_length: int = FUZZY_PREFIX_LENGTH):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.postings: Dict[str, List[int]] = defaultdict(list)    # word -> row positions
+        self.deletes: Dict[str, List[str]] = defaultdict(list)     # deleted prefix -> words
+
+        for position, name in enumerate(names):
+            for word in set(words(name)):
+                self.postings[word].append(position)
+        for word in self.postings:
+            for variant in _deletes(word[:prefix_length], max_distance):
+                self.deletes[variant].append(word)
+
+    def lookup(self, word: str) -> Dict[str, int]:
+        """Indexed words within the allowed edit distance of `word`, with their distances."""
+        limit = allowed_distance(word, self.max_distance)
+        found = {}
+        for variant in _deletes(word[:self.prefix_length], limit):
+            for candidate in self.deletes.get(variant, ()):
+                if candidate not in found:
+                    found[candidate] = edit_distance(word, candidate, limit)
+        return {w: d for w, d in found.items() if d <= limit}
+
+    def search(self, query: str) -> List[Tuple[int, int]]:
+        """
+        (row position, total distance) for rows that contain a close match for every query
+        word, best first. Each query word contributes the distance of its closest name word.
+        """
+        query_words = words(query)
+        if not query_words:
+            return []
+        scores = None
+        for word in query_words:
+            best = {}
+            for candidate, distance in self.lookup(word).items():
+                for position in self.postings[candidate]:
+                    if distance < best.get(position, distance + 1):
+                        best[position] = distance
+            if scores is None:
+                scores = best
+            else:
+                scores = {p: d + best[p] for p, d in scores.items() if p in best}
+            if not scores:
+                return []
+        return sorted(scores.items(), key=lambda item: (item[1], item[0]))
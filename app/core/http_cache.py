@@ -0,0 +1,51 @@
+"""
+HTTP Conditional GET Helpers for DietNotify
+Strong ETags from cheap version fields, If-None-Match -> 304, and private revalidation headers
+Lets routes answer unchanged resources without loading or serializing the body
+"""
+import hashlib
+from typing import Optional
+
+from flask import request, Response
+
+
+# Authenticated, per-user data: browsers may keep a copy but must revalidate every use
+PRIVATE_REVALIDATE = 'private, no-cache'
+
+
+def make_etag(*parts) -> str:
+    """Opaque strong validator from the fields that identify a resource version."""
+    raw = '|'.join('' if p is None else str(p) for p in parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:32]
+
+
+def etag_variants(etag: str) -> tuple:
+    """The tag itself plus the per-encoding tags set by response compression."""
+    return etag, f"{etag}-br", f"{etag}-gzip"
+
+
+def _apply_validators(response: Response, etag: str) -> Response:
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = PRIVATE_REVALIDATE
+    response.vary.add('Cookie')
+    return response
+
+
+def not_modified(etag: Optional[str]) -> Optional[Response]:
+    """A 304 response if the client already holds `etag` (any encoded variant), else None."""
+    if not etag:
+        return None
+    for tag in etag_variants(etag):
+        if request.if_none_match.contains(tag):
+            response = _apply_validators(Response(status=304), tag)
+            response.vary.add('Accept-Encoding')
+            return response
+    return None
+
+
+def with_etag(response: Response, etag: Optional[str]) -> Response:
+    """Attach the validator and cache headers to a full response."""
+    if etag:
+        return _apply_validators(response, etag)
+    response.headers['Cache-Control'] = 'private, no-store'
+    return response
@@ -0,0 +1,101 @@
+"""
+JSON Serialization for DietNotify
+Flask JSON provider backed by orjson (if installed, with native NumPy support), falling back to
+the stdlib encoder with NumPy/pandas scalar handling. Selected with JSON_PROVIDER=auto|orjson|stdlib.
+"""
+import os
+import logging
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+from flask import Flask, Response, current_app
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'auto').lower()
+
+
+def _default(o):
+    """Types neither encoder handles natively: NumPy scalars/arrays, pandas scalars, sets, Decimal."""
+    if isinstance(o, np.generic):
+        return o.item()
+    if isinstance(o, np.ndarray):
+        return o.tolist()
+    if isinstance(o, pd.Timestamp):
+        return o.isoformat()
+    if o is pd.NaT:
+        return None
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    if isinstance(o, Decimal):
+        return str(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class NumpyJSONProvider(DefaultJSONProvider):
+    """Stdlib provider that also accepts NumPy / pandas scalars."""
+
+    @staticmethod
+    def default(o):
+        try:
+            return _default(o)
+        except TypeError:
+            return DefaultJSONProvider.default(o)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    orjson-backed provider. Keys are still sorted (Flask's default) so ETags computed
+    from response bodies stay stable; debug-mode pretty printing uses OPT_INDENT_2.
+    """
+
+    def _options(self) -> int:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=_default, option=self._options()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self._options()
+        if self.compact is False or (self.compact is None and self._app.debug):
+            option |= orjson.OPT_INDENT_2
+        body = orjson.dumps(obj, default=_default, option=option | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def frame_response(frame: pd.DataFrame) -> Response:
+    """
+    JSON array of row objects straight from a DataFrame's column arrays (pandas' C encoder),
+    without materialising a dict per row. Keys follow column order.
+    """
+    body = frame.to_json(orient='records', force_ascii=False)
+    return current_app.response_class(body, mimetype='application/json')
+
+
+def init_json(app: Flask):
+    if JSON_PROVIDER == 'stdlib' or (JSON_PROVIDER in ('auto', 'orjson') and not ORJSON_AVAILABLE):
+        if JSON_PROVIDER == 'orjson':
+            logger.warning("JSON_PROVIDER=orjson but orjson is not installed; using stdlib json")
+        app.json = NumpyJSONProvider(app)
+    else:
+        app.json = OrjsonProvider(app)
+    logger.info("JSON provider: %s", type(app.json).__name__)
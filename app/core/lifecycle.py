@@ -0,0 +1,180 @@
+"""
+Application Lifecycle Manager for DietNotify
+Runs slow startup work (CSV load, database probe, Firebase + scheduler restore, AI clients)
+as background warm-up tasks and tracks per-subsystem readiness for /readyz and route guards
+"""
+import logging
+import os
+import time
+import threading
+from functools import wraps
+from typing import Callable, Dict, Any, Optional, Sequence
+
+from flask import jsonify
+
+logger = logging.getLogger(__name__)
+
+
+LIFECYCLE_SYNC = os.getenv('LIFECYCLE_SYNC', '').lower() in ('1', 'true', 'yes')   # run warm-up inline
+LIFECYCLE_WAIT_SECONDS = float(os.getenv('LIFECYCLE_WAIT_SECONDS', '5'))          # default route wait
+LIFECYCLE_RETRY_SECONDS = float(os.getenv('LIFECYCLE_RETRY_SECONDS', '30'))
+
+PENDING = 'pending'
+STARTING = 'starting'
+READY = 'ready'
+UNAVAILABLE = 'unavailable'   # ran, but reported it cannot serve (e.g. no credentials)
+FAILED = 'failed'             # raised during warm-up
+
+
+class Subsystem:
+    def __init__(self, name: str, start_fn: Callable[[], Any], depends_on: Sequence[str] = (),
+                 critical: bool = True, retry: bool = False):
+        self.name = name
+        self.start_fn = start_fn
+        self.depends_on = tuple(depends_on)
+        self.critical = critical
+        self.retry = retry
+        self.state = PENDING
+        self.error = None
+        self.detail = None
+        self.attempts = 0
+        self.duration = None
+        self.settled = threading.Event()   # set once the first attempt finished
+        self.ready = threading.Event()     # set once an attempt succeeded
+
+    def snapshot(self) -> Dict[str, Any]:
+        info = {"state": self.state, "critical": self.critical, "attempts": self.attempts}
+        if self.duration is not None:
+            info["startup_seconds"] = round(self.duration, 3)
+        if self.error:
+            info["error"] = self.error
+        if isinstance(self.detail, dict):
+            info["detail"] = self.detail
+        return info
+
+
+class LifecycleManager:
+    """
+    Registry of startup subsystems. `start()` runs each one on its own daemon
+    thread once its dependencies have settled; returning False (or a dict
+    with "ok": False) marks it unavailable, raising marks it failed.
+    Subsystems registered with `retry=True` are re-attempted every
+    LIFECYCLE_RETRY_SECONDS until ready, and a subsystem whose attempt ran
+    while a dependency was not ready is re-run once the dependency is.
+    """
+
+    def __init__(self):
+        self._subsystems = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def register(self, name: str, start_fn: Callable[[], Any], depends_on: Sequence[str] = (),
+                 critical: bool = True, retry: bool = False) -> Subsystem:
+        with self._lock:
+            if name not in self._subsystems:
+                self._subsystems[name] = Subsystem(name, start_fn, depends_on, critical, retry)
+            return self._subsystems[name]
+
+    def _run(self, sub: Subsystem):
+        deps = [self._subsystems[d] for d in sub.depends_on if d in self._subsystems]
+        for dep in deps:
+            dep.settled.wait()
+
+        while True:
+            # An attempt made while a dependency was down is repeated once it comes up
+            deps_ready = all(dep.state == READY for dep in deps)
+            sub.state = STARTING
+            sub.attempts += 1
+            t0 = time.time()
+            try:
+                result = sub.start_fn()
+                sub.detail = result
+                sub.error = None
+                ok = result.get('ok', True) if isinstance(result, dict) else result is not False
+                sub.state = READY if ok else UNAVAILABLE
+            except Exception as e:
+                sub.state = FAILED
+                sub.error = str(e)
+                logger.warning("%s failed: %s", sub.name, e)
+            sub.duration = time.time() - t0
+            if sub.state == READY:
+                sub.ready.set()
+            sub.settled.set()
+            logger.info("%s: %s in %.2fs", sub.name, sub.state, sub.duration)
+
+            if LIFECYCLE_SYNC:
+                return
+            if not deps_ready:
+                for dep in deps:
+                    dep.ready.wait()
+                logger.info("%s: dependencies ready, re-running", sub.name)
+                continue
+            if sub.state == READY or not sub.retry:
+                return
+            time.sleep(LIFECYCLE_RETRY_SECONDS)
+
+    def start(self):
+        """Kick off every pending subsystem (inline when LIFECYCLE_SYNC is set)."""
+        with self._lock:
+            pending = [s for s in self._subsystems.values() if s.state == PENDING]
+            for sub in pending:
+                sub.state = STARTING
+        for sub in pending:
+            if LIFECYCLE_SYNC:
+                self._run(sub)
+            else:
+                threading.Thread(target=self._run, args=(sub,), name=f"warmup-{sub.name}", daemon=True).start()
+
+    def get(self, name: str) -> Optional[Subsystem]:
+        return self._subsystems.get(name)
+
+    def is_ready(self, name: str) -> bool:
+        sub = self._subsystems.get(name)
+        return sub is not None and sub.state == READY
+
+    def wait(self, name: str, timeout: float = LIFECYCLE_WAIT_SECONDS) -> bool:
+        """Block until the subsystem's first attempt settles (or timeout); True if ready."""
+        sub = self._subsystems.get(name)
+        if sub is None:
+            return True   # not managed here - nothing to wait for
+        if sub.state != READY and timeout > 0:
+            sub.settled.wait(timeout)
+        return sub.state == READY
+
+    def status(self) -> Dict[str, Any]:
+        subsystems = {name: sub.snapshot() for name, sub in self._subsystems.items()}
+        ready = all(s.state == READY for s in self._subsystems.values() if s.critical)
+        return {
+            "ready": ready,
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "subsystems": subsystems
+        }
+
+
+def requires(*names: str, timeout: Optional[float] = None):
+    """
+    Route guard: wait up to `timeout` seconds (default LIFECYCLE_WAIT_SECONDS, 0 = fail fast)
+    for the named subsystems, then answer 503 with Retry-After if any is still not ready.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            wait_for = LIFECYCLE_WAIT_SECONDS if timeout is None else timeout
+            for name in names:
+                if not lifecycle.wait(name, wait_for):
+                    sub = lifecycle.get(name)
+                    response = jsonify({
+                        "error": "Service is starting up, please retry shortly",
+                        "subsystem": name,
+                        "state": sub.state if sub else None
+                    })
+                    response.status_code = 503
+                    response.headers['Retry-After'] = '5'
+                    return response
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Global instance
+lifecycle = LifecycleManager()
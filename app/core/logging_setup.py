@@ -0,0 +1,134 @@
+"""
+Logging Pipeline for DietNotify
+Every module logs through `logging.getLogger(__name__)`; records are handed to a queue
+(QueueHandler) and formatted/written by a background QueueListener, so request and
+scheduler threads never block on console or file I/O.
+
+Environment:
+    LOG_LEVEL=INFO                  root level for the app
+    LOG_LEVELS=app.core.storage=DEBUG,app.services.key_pool=WARNING   per-module overrides
+    LOG_FORMAT=json|text            console format (json by default)
+    LOG_FILE=logs/dietnotify.log    optional rotating JSON log file
+    NOTIFICATION_LOG_FILE=notification_debug.log   rotating file for notification/FCM modules
+    LOG_MAX_BYTES / LOG_BACKUP_COUNT   rotation size and number of kept files
+"""
+import os
+import sys
+import copy
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+from datetime import datetime, timezone
+
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_LEVELS = os.getenv('LOG_LEVELS', '')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json').lower()
+LOG_FILE = os.getenv('LOG_FILE', '')
+NOTIFICATION_LOG_FILE = os.getenv('NOTIFICATION_LOG_FILE', 'notification_debug.log')
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', str(5 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', '5'))
+
+# Modules whose records also go to the notification debug log
+NOTIFICATION_LOGGERS = ('app.services.notification_service', 'app.core.firebase_config',
+                        'app.core.notification_db', 'app.notification_routes')
+
+# Attributes every LogRecord has; anything else was passed via `extra=` and is emitted as a field
+_RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'taskName'}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, extra fields, exception."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Merges args into the message on the calling thread but keeps exc_info for the formatter."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class _PrefixFilter(logging.Filter):
+    def __init__(self, prefixes):
+        super().__init__()
+        self.prefixes = prefixes
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.name.startswith(self.prefixes)
+
+
+def _parse_levels(spec: str) -> dict:
+    levels = {}
+    for part in spec.split(','):
+        if '=' in part:
+            name, level = part.split('=', 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def _rotating(path: str) -> logging.Handler:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(
+        path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8', delay=True)
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+def configure_logging():
+    """Install the queue pipeline on the root logger (idempotent)."""
+    global _listener
+    if _listener is not None:
+        return
+
+    console = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == 'text':
+        console.setFormatter(logging.Formatter('%(asctime)s %(levelname)s [%(name)s] %(message)s'))
+    else:
+        console.setFormatter(JsonFormatter())
+    handlers = [console]
+
+    if LOG_FILE:
+        handlers.append(_rotating(LOG_FILE))
+    if NOTIFICATION_LOG_FILE:
+        notification_file = _rotating(NOTIFICATION_LOG_FILE)
+        notification_file.addFilter(_PrefixFilter(NOTIFICATION_LOGGERS))
+        handlers.append(notification_file)
+
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(_QueueHandler(log_queue))
+    root.setLevel(logging.WARNING)   # third-party libraries stay quiet unless overridden
+
+    logging.getLogger('app').setLevel(LOG_LEVEL)
+    logging.getLogger('__main__').setLevel(LOG_LEVEL)
+    for name, level in _parse_levels(LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
@@ -0,0 +1,197 @@
+"""
+Request & Upstream Instrumentation for DietNotify
+In-process histograms/counters for route latency and upstream calls (storage, Gemini, FCM)
+Exposed at /metrics in Prometheus text format (p50/p95/p99 via histogram_quantile)
+"""
+import os
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from typing import Sequence, Tuple
+
+from flask import Flask, Response, g, request
+
+
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')   # optional bearer token for /metrics
+
+# Seconds: covers cache hits (~1ms) up to multi-minute plan generation
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Tuple, extra: str = '') -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(n, '')) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}")
+        return '\n'.join(lines)
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set (Prometheus semantics)."""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}   # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(n, '')) for n in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series[:-2]):
+                cumulative += count
+                le = f'le="{_format_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_number(round(series[-2], 6))}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return '\n'.join(lines)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        metric = Histogram(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, *args, **kwargs) -> Counter:
+        metric = Counter(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return '\n'.join(m.render() for m in self._metrics) + '\n'
+
+
+# Global registry + metric families
+metrics = MetricsRegistry()
+
+http_request_duration = metrics.histogram(
+    'dietnotify_http_request_duration_seconds', 'Request latency by route',
+    ('method', 'route', 'status'))
+http_response_bytes = metrics.counter(
+    'dietnotify_http_response_bytes_total', 'Response body bytes by route', ('method', 'route'))
+upstream_duration = metrics.histogram(
+    'dietnotify_upstream_duration_seconds', 'Upstream call latency',
+    ('upstream', 'operation', 'status'))
+upstream_bytes = metrics.counter(
+    'dietnotify_upstream_payload_bytes_total', 'Upstream payload bytes', ('upstream', 'operation', 'direction'))
+upstream_tokens = metrics.counter(
+    'dietnotify_upstream_tokens_total', 'LLM tokens consumed', ('upstream', 'operation'))
+
+
+class UpstreamCall:
+    """Mutable record filled in by the instrumented call site."""
+    __slots__ = ('status', 'bytes_out', 'bytes_in', 'tokens')
+
+    def __init__(self):
+        self.status = 'ok'
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.tokens = 0
+
+
+@contextmanager
+def observe_upstream(upstream: str, operation: str):
+    """
+    Time an upstream call. The body may set call.status / bytes_out / bytes_in / tokens;
+    an exception is recorded as status "error" (unless the body set a more specific
+    status first) and re-raised.
+    """
+    call = UpstreamCall()
+    t0 = time.perf_counter()
+    try:
+        yield call
+    except Exception:
+        if call.status == 'ok':
+            call.status = 'error'
+        raise
+    finally:
+        upstream_duration.observe(time.perf_counter() - t0, upstream=upstream, operation=operation, status=call.status)
+        if call.bytes_out:
+            upstream_bytes.inc(call.bytes_out, upstream=upstream, operation=operation, direction='out')
+        if call.bytes_in:
+            upstream_bytes.inc(call.bytes_in, upstream=upstream, operation=operation, direction='in')
+        if call.tokens:
+            upstream_tokens.inc(call.tokens, upstream=upstream, operation=operation)
+
+
+# ============== FLASK HOOKS ==============
+def _before_request():
+    g._metrics_start = time.perf_counter()
+
+
+def _after_request(response):
+    start = getattr(g, '_metrics_start', None)
+    if start is None:
+        return response
+    # Label by URL rule (not raw path) to keep cardinality bounded
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    http_request_duration.observe(time.perf_counter() - start, method=request.method,
+                                  route=route, status=response.status_code)
+    if response.content_length:
+        http_response_bytes.inc(response.content_length, method=request.method, route=route)
+    return response
+
+
+def metrics_endpoint():
+    if METRICS_TOKEN and request.headers.get('Authorization') != f"Bearer {METRICS_TOKEN}":
+        return Response('Unauthorized\n', status=401, mimetype='text/plain')
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+def init_metrics(app: Flask):
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_endpoint)
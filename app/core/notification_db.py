@@ -2,9 +2,12 @@
 Notification Database Operations for DietNotify
 Handles FCM tokens and notification preferences in Supabase
 """
-import requests
+import logging
 from datetime import datetime
-from .database import SUPABASE_URL, get_headers
+from .database import query_params
+from .storage import storage
+
+logger = logging.getLogger(__name__)
 
 
 # ============== NOTIFICATION TOKENS ==============
@@ -23,9 +26,8 @@ def save_notification_token(user_id: str, fcm_token: str, device_info: dict = No
     
     try:
         # Check if token already exists
-        response = requests.get(
-            f"{SUPABASE_URL}/rest/v1/notification_tokens",
-            headers=get_headers(),
+        response = storage.get(
+            "notification_tokens",
             params={"fcm_token": f"eq.{fcm_token}", "limit": "1"}
         )
         
@@ -34,19 +36,17 @@ def save_notification_token(user_id: str, fcm_token: str, device_info: dict = No
             
             if existing:
                 # Update existing token
-                response = requests.patch(
-                    f"{SUPABASE_URL}/rest/v1/notification_tokens",
-                    headers=get_headers(),
+                response = storage.patch(
+                    "notification_tokens",
                     params={"fcm_token": f"eq.{fcm_token}"},
-                    json=token_data
+                    json_body=token_data
                 )
             else:
                 # Insert new token
                 token_data["created_at"] = datetime.utcnow().isoformat()
-                response = requests.post(
-                    f"{SUPABASE_URL}/rest/v1/notification_tokens",
-                    headers=get_headers(),
-                    json=token_data
+                response = storage.post(
+                    "notification_tokens",
+                    json_body=token_data
                 )
             
             if 200 <= response.status_code < 300:
@@ -54,42 +54,40 @@ def save_notification_token(user_id: str, fcm_token: str, device_info: dict = No
                 if not response.text or response.status_code == 204:
                     return token_data
                 result = response.json()
-                print(f"[NotificationDB] Token saved for user: {user_id}")
+                logger.info("Token saved for user: %s", user_id)
                 return result[0] if result else token_data
             else:
-                print(f"[NotificationDB] Save token error! Status: {response.status_code}")
-                print(f"[NotificationDB] Response: {response.text}")
+                logger.error("Save token error! Status: %s", response.status_code)
+                logger.error("Response: %s", response.text)
                 return None
                 
         return None
     except Exception as e:
-        print(f"[NotificationDB] Save token exception: {e}")
+        logger.error("Save token exception: %s", e)
         return None
 
 
-def get_user_tokens(user_id: str) -> list:
+def get_user_tokens(user_id: str, columns: str = None) -> list:
     """Get all FCM tokens for a user (multiple devices)."""
     try:
-        response = requests.get(
-            f"{SUPABASE_URL}/rest/v1/notification_tokens",
-            headers=get_headers(),
-            params={"user_id": f"eq.{user_id}"}
+        response = storage.get(
+            "notification_tokens",
+            params=query_params({"user_id": f"eq.{user_id}"}, columns=columns)
         )
         
         if response.status_code == 200:
             return response.json()
         return []
     except Exception as e:
-        print(f"[NotificationDB] Get tokens error: {e}")
+        logger.error("Get tokens error: %s", e)
         return []
 
 
 def delete_notification_token(user_id: str, fcm_token: str) -> bool:
     """Delete a specific FCM token."""
     try:
-        response = requests.delete(
-            f"{SUPABASE_URL}/rest/v1/notification_tokens",
-            headers=get_headers(),
+        response = storage.delete(
+            "notification_tokens",
             params={
                 "user_id": f"eq.{user_id}",
                 "fcm_token": f"eq.{fcm_token}"
@@ -97,26 +95,25 @@ def delete_notification_token(user_id: str, fcm_token: str) -> bool:
         )
         
         if response.status_code in [200, 204]:
-            print(f"[NotificationDB] Token deleted for user: {user_id}")
+            logger.info("Token deleted for user: %s", user_id)
             return True
         return False
     except Exception as e:
-        print(f"[NotificationDB] Delete token error: {e}")
+        logger.error("Delete token error: %s", e)
         return False
 
 
 def delete_all_user_tokens(user_id: str) -> bool:
     """Delete all tokens for a user."""
     try:
-        response = requests.delete(
-            f"{SUPABASE_URL}/rest/v1/notification_tokens",
-            headers=get_headers(),
+        response = storage.delete(
+            "notification_tokens",
             params={"user_id": f"eq.{user_id}"}
         )
         
         return response.status_code in [200, 204]
     except Exception as e:
-        print(f"[NotificationDB] Delete all tokens error: {e}")
+        logger.error("Delete all tokens error: %s", e)
         return False
 
 
@@ -136,9 +133,8 @@ def save_notification_preferences(user_id: str, preferences: dict) -> dict:
     
     try:
         # Check if preferences exist
-        response = requests.get(
-            f"{SUPABASE_URL}/rest/v1/notification_preferences",
-            headers=get_headers(),
+        response = storage.get(
+            "notification_preferences",
             params={"user_id": f"eq.{user_id}", "limit": "1"}
         )
         
@@ -147,19 +143,17 @@ def save_notification_preferences(user_id: str, preferences: dict) -> dict:
             
             if existing:
                 # Update
-                response = requests.patch(
-                    f"{SUPABASE_URL}/rest/v1/notification_preferences",
-                    headers=get_headers(),
+                response = storage.patch(
+                    "notification_preferences",
                     params={"user_id": f"eq.{user_id}"},
-                    json=pref_data
+                    json_body=pref_data
                 )
             else:
                 # Insert
                 pref_data["created_at"] = datetime.utcnow().isoformat()
-                response = requests.post(
-                    f"{SUPABASE_URL}/rest/v1/notification_preferences",
-                    headers=get_headers(),
-                    json=pref_data
+                response = storage.post(
+                    "notification_preferences",
+                    json_body=pref_data
                 )
             
             if 200 <= response.status_code < 300:
@@ -167,26 +161,25 @@ def save_notification_preferences(user_id: str, preferences: dict) -> dict:
                 if not response.text or response.status_code == 204:
                     return pref_data
                 result = response.json()
-                print(f"[NotificationDB] Preferences saved for user: {user_id}")
+                logger.info("Preferences saved for user: %s", user_id)
                 return result[0] if result else pref_data
             else:
-                print(f"[NotificationDB] Save preferences error! Status: {response.status_code}")
-                print(f"[NotificationDB] Response: {response.text}")
+                logger.error("Save preferences error! Status: %s", response.status_code)
+                logger.error("Response: %s", response.text)
                 return None
                 
         return None
     except Exception as e:
-        print(f"[NotificationDB] Save preferences exception: {e}")
+        logger.error("Save preferences exception: %s", e)
         return None
 
 
-def get_notification_preferences(user_id: str) -> dict:
+def get_notification_preferences(user_id: str, columns: str = None) -> dict:
     """Get user's notification preferences."""
     try:
-        response = requests.get(
-            f"{SUPABASE_URL}/rest/v1/notification_preferences",
-            headers=get_headers(),
-            params={"user_id": f"eq.{user_id}", "limit": "1"}
+        response = storage.get(
+            "notification_preferences",
+            params=query_params({"user_id": f"eq.{user_id}"}, columns=columns, limit=1)
         )
         
         if response.status_code == 200:
@@ -194,22 +187,42 @@ def get_notification_preferences(user_id: str) -> dict:
             return prefs[0] if prefs else None
         return None
     except Exception as e:
-        print(f"[NotificationDB] Get preferences error: {e}")
+        logger.error("Get preferences error: %s", e)
         return None
 
 
-def get_all_enabled_preferences() -> list:
-    """Get all enabled notification preferences for job restoration."""
+def get_all_enabled_preferences(columns: str = None, limit: int = None, after_user_id: str = None) -> list:
+    """
+    Get enabled notification preferences for job restoration.
+    Ordered by user_id; pass the last row's user_id as `after_user_id` for the next page.
+    """
     try:
-        response = requests.get(
-            f"{SUPABASE_URL}/rest/v1/notification_preferences",
-            headers=get_headers(),
-            params={"enabled": "eq.true"}
+        response = storage.get(
+            "notification_preferences",
+            params=query_params(
+                {"enabled": "eq.true"},
+                columns=columns,
+                order="user_id.asc",
+                limit=limit,
+                cursor_column="user_id",
+                cursor=after_user_id
+            )
         )
         
         if response.status_code == 200:
             return response.json()
         return []
     except Exception as e:
-        print(f"[NotificationDB] Get all enabled prefs error: {e}")
+        logger.error("Get all enabled prefs error: %s", e)
         return []
+
+
+def iter_enabled_preferences(columns: str = None, page_size: int = 500):
+    """Yield every enabled preference row, one keyset page at a time."""
+    after = None
+    while True:
+        page = get_all_enabled_preferences(columns=columns, limit=page_size, after_user_id=after)
+        yield from page
+        if len(page) < page_size:
+            return
+        after = page[-1]['user_id']
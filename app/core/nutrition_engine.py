@@ -3,6 +3,8 @@ DietNotify - Scientific Calculations & Models
 This file contains ONLY functions and classes for nutrition calculations.
 NO SERVER CODE HERE - Use server.py to run the application.
 """
+import numpy as np
+
 
 # ============== SCIENTIFIC NUTRIENT CALCULATIONS ==============
 
@@ -175,3 +177,30 @@ def classify_food_health_score(item):
         classification = "Poor"
     
     return {"score": round(score), "classification": classification}
+
+
+def classify_health_scores(frame):
+    """
+    classify_food_health_score for every row of a DataFrame at once.
+    
+    Returns:
+        (scores, classifications) NumPy arrays aligned with the frame's rows
+    """
+    def column(name):
+        if name not in frame:
+            return np.zeros(len(frame))
+        return np.asarray(frame[name], dtype=float)
+    
+    vitamins = sum(column(f'Vitamin {v}') for v in ['A', 'C', 'D', 'E', 'K'])
+    score = (50
+             + np.minimum(column('Protein') * 2, 15)
+             + np.minimum(column('Fiber') * 3, 15)
+             + np.minimum(vitamins * 0.5, 10)
+             - np.minimum(column('Sugars') * 0.5, 15)
+             - np.minimum(column('Saturated Fats') * 1, 10)
+             - np.minimum(column('Sodium') * 0.01, 10))
+    score = np.clip(score, 0, 100)
+    
+    classification = np.select([score >= 80, score >= 60, score >= 40],
+                               ["Excellent", "Good", "Moderate"], default="Poor")
+    return np.rint(score).astype(int), classification
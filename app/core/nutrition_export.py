@@ -0,0 +1,136 @@
+"""
+Nutrition Database Export for DietNotify
+Writes the DataLoader knowledge base as a compact columnar client format:
+  index.json        sorted food names (for local prefix search) + shard list + column names
+  shard-NNN.json    per-shard nutrient arrays, one array per column
+Regenerated whenever the source CSVs change (content hash recorded in the index)
+
+Export with:  python -m app.core.nutrition_export
+"""
+import logging
+import os
+import sys
+import json
+import hashlib
+from typing import Dict, Any, List
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+EXPORT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'static', 'data', 'nutrition'))
+EXPORT_SHARD_SIZE = int(os.getenv('NUTRITION_EXPORT_SHARD_SIZE', '200'))
+EXPORT_FORMAT = 1
+EXPORT_DECIMALS = 3
+
+# Loader bookkeeping / index columns that carry no nutrition data
+DROP_COLUMNS = {'rank'}
+
+
+def source_signature(paths: List[str]) -> str:
+    """Content hash of the source CSVs (stable across checkouts, unlike mtimes)."""
+    digest = hashlib.sha256()
+    digest.update(f"format={EXPORT_FORMAT};shard={EXPORT_SHARD_SIZE}".encode())
+    for path in sorted(paths):
+        digest.update(os.path.basename(path).encode('utf-8'))
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+
+def nutrient_columns(df: pd.DataFrame) -> List[str]:
+    return [
+        c for c in df.columns
+        if c != 'food' and c not in DROP_COLUMNS and not str(c).startswith('Unnamed')
+        and pd.api.types.is_numeric_dtype(df[c])
+    ]
+
+
+def _write_json(path: str, payload: Dict[str, Any]):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, separators=(',', ':'), ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def export_nutrition_db(df: pd.DataFrame, out_dir: str = EXPORT_DIR, source: str = None,
+                        shard_size: int = EXPORT_SHARD_SIZE) -> Dict[str, Any]:
+    """
+    Write index.json + shard files for the knowledge base. Rows are sorted by
+    lower-cased name; row i lives in shard i // shard_size at offset i % shard_size.
+    """
+    df = df[df['food'].astype(str).str.strip() != ''].copy()
+    df['food'] = df['food'].astype(str).str.strip()
+    df = df.iloc[np.argsort(df['food'].str.lower().to_numpy(), kind='stable')]
+    columns = nutrient_columns(df)
+    values = df[columns].to_numpy(dtype=float).round(EXPORT_DECIMALS)
+
+    os.makedirs(out_dir, exist_ok=True)
+    shards = []
+    for n, start in enumerate(range(0, len(df), shard_size)):
+        block = values[start:start + shard_size]
+        name = f"shard-{n:03d}.json"
+        _write_json(os.path.join(out_dir, name), {
+            "start": start,
+            "count": len(block),
+            # Columnar: one array per nutrient; integers stay integers to save bytes
+            "values": {
+                col: [int(v) if v.is_integer() else float(v) for v in block[:, i]]
+                for i, col in enumerate(columns)
+            }
+        })
+        shards.append(name)
+
+    index = {
+        "format": EXPORT_FORMAT,
+        "source": source,
+        "count": len(df),
+        "shard_size": shard_size,
+        "columns": columns,
+        "shards": shards,
+        "names": df['food'].tolist()
+    }
+    _write_json(os.path.join(out_dir, 'index.json'), index)
+
+    # Drop shards left over from a larger previous export
+    for name in os.listdir(out_dir):
+        if name.startswith('shard-') and name.endswith('.json') and name not in shards:
+            os.remove(os.path.join(out_dir, name))
+
+    logger.info("Wrote %s foods in %s shard(s) to %s", len(df), len(shards), out_dir)
+    return index
+
+
+def ensure_nutrition_export(loader, out_dir: str = EXPORT_DIR) -> bool:
+    """Re-export if the loader's source CSVs changed since the last export. Returns True if written."""
+    paths = getattr(loader, 'source_files', None) or []
+    if loader.get_dataframe().empty or not paths:
+        return False
+    signature = source_signature(paths)
+    try:
+        with open(os.path.join(out_dir, 'index.json'), encoding='utf-8') as f:
+            if json.load(f).get('source') == signature:
+                return False
+    except (OSError, ValueError):
+        pass
+    export_nutrition_db(loader.get_dataframe(), out_dir, source=signature)
+    return True
+
+
+if __name__ == '__main__':
+    from .data_loader import DataLoader
+    from .logging_setup import configure_logging
+
+    configure_logging()
+    logger.setLevel(logging.INFO)    # the export summary belongs in the build log
+
+    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    data_loader = DataLoader(base_dir)
+    data_loader.load_all_data()
+    if '--force' in sys.argv:
+        export_nutrition_db(data_loader.get_dataframe(), source=source_signature(data_loader.source_files))
+    elif not ensure_nutrition_export(data_loader):
+        logger.info("Export is up to date")
@@ -0,0 +1,68 @@
+"""
+Diet Plan Storage Format for DietNotify
+Splits a plan into a small summary record and a compressed full protocol blob
+The summary serves listing/scheduling; the blob is only decoded when the full plan is needed
+"""
+import json
+import zlib
+import base64
+from typing import Dict, Any, Optional
+
+
+BLOB_PREFIX = 'z1:'  # format marker: zlib + base64 of compact JSON
+
+
+def compress_plan(plan_data: Dict[str, Any]) -> str:
+    """Encode full plan JSON as a compact compressed text blob."""
+    raw = json.dumps(plan_data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return BLOB_PREFIX + base64.b64encode(zlib.compress(raw, 6)).decode('ascii')
+
+
+def decompress_plan(blob: str) -> Optional[Dict[str, Any]]:
+    """Decode a blob written by compress_plan (None if empty / unknown format)."""
+    if not blob or not blob.startswith(BLOB_PREFIX):
+        return None
+    raw = zlib.decompress(base64.b64decode(blob[len(BLOB_PREFIX):]))
+    return json.loads(raw.decode('utf-8'))
+
+
+def build_plan_summary(plan_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Small summary of a plan: key targets and the meal schedule.
+    Keeps the plan_data shape for meals (diet_protocol.meals) so schedulers and
+    templates can read a summary wherever they previously read the full plan.
+    """
+    plan_data = plan_data or {}
+    protocol = plan_data.get('diet_protocol', {}) or {}
+    overview = plan_data.get('user_overview', {}) or {}
+    return {
+        "user_overview": {
+            k: overview.get(k) for k in
+            ('daily_calories_target', 'protein_target_g', 'carbs_target_g', 'fat_target_g', 'water_target_l')
+            if k in overview
+        },
+        "diet_protocol": {
+            "meals": [
+                {
+                    "time": m.get('time'),
+                    "name": m.get('name'),
+                    "macros": m.get('macros'),
+                    "bullets": m.get('bullets', [])
+                }
+                for m in protocol.get('meals', []) or []
+            ]
+        },
+        "bio_summary": (plan_data.get('bio_analysis') or {}).get('body_type', 'N/A')
+    }
+
+
+def hydrate_plan(row: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Fill row['plan_data'] from the compressed blob (legacy rows already have it)."""
+    if not row:
+        return row
+    blob = row.pop('plan_blob', None)
+    if blob and not row.get('plan_data'):
+        row['plan_data'] = decompress_plan(blob)
+    if not row.get('plan_summary') and row.get('plan_data'):
+        row['plan_summary'] = build_plan_summary(row['plan_data'])
+    return row
@@ -0,0 +1,167 @@
+"""
+Profile Write-Behind Buffer for DietNotify
+Coalesces profile-setup auto-saves per user and flushes them as one merged upsert
+Pending state is optionally journaled to disk so a restart does not lose it
+"""
+import logging
+import os
+import json
+import atexit
+import hashlib
+import threading
+from typing import Callable, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+PROFILE_FLUSH_DELAY = float(os.getenv('PROFILE_FLUSH_DELAY', '3'))   # debounce seconds
+PROFILE_JOURNAL_DIR = os.getenv('PROFILE_JOURNAL_DIR', '')          # empty = memory only
+FINAL_PROFILE_STEP = 5
+
+
+class ProfileWriteBuffer:
+    """
+    Per-user pending profile changes with a debounce timer.
+
+    `stage()` merges step data into the user's pending record and (re)arms a
+    timer; the record is flushed through `flush_fn(user_id, data)` after
+    `delay` seconds of quiet, immediately on the final step, or at exit.
+    """
+
+    def __init__(self, flush_fn: Callable[[str, Dict[str, Any]], Optional[dict]],
+                 delay: float = PROFILE_FLUSH_DELAY, journal_dir: str = PROFILE_JOURNAL_DIR):
+        self.flush_fn = flush_fn
+        self.delay = delay
+        self.journal_dir = journal_dir
+        self._pending = {}      # user_id -> merged profile fields
+        self._inflight = {}     # user_id -> fields being written by flush(), until the write succeeds
+        self._timers = {}       # user_id -> threading.Timer
+        self._lock = threading.Lock()
+        self.flushes = 0
+        self.coalesced = 0
+
+        if self.journal_dir:
+            os.makedirs(self.journal_dir, exist_ok=True)
+        atexit.register(self.flush_all)
+
+    # ---------- journal ----------
+    def _journal_path(self, user_id: str) -> Optional[str]:
+        if not self.journal_dir:
+            return None
+        digest = hashlib.sha1(user_id.encode('utf-8')).hexdigest()
+        return os.path.join(self.journal_dir, f"{digest}.json")
+
+    def _journal_write(self, user_id: str, data: Dict[str, Any]):
+        path = self._journal_path(user_id)
+        if not path:
+            return
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({"user_id": user_id, "data": data}, f)
+        os.replace(tmp, path)
+
+    def _journal_clear(self, user_id: str):
+        path = self._journal_path(user_id)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def recover(self) -> int:
+        """Flush records left in the journal by a previous process."""
+        if not self.journal_dir or not os.path.isdir(self.journal_dir):
+            return 0
+        recovered = 0
+        for name in os.listdir(self.journal_dir):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.journal_dir, name), encoding='utf-8') as f:
+                    entry = json.load(f)
+                with self._lock:
+                    self._pending.setdefault(entry['user_id'], {}).update(entry['data'])
+                if self.flush(entry['user_id']) is not None:
+                    recovered += 1
+            except Exception as e:
+                logger.error("Journal recovery error (%s): %s", name, e)
+        if recovered:
+            logger.info("Recovered %s pending profile(s) from journal", recovered)
+        return recovered
+
+    # ---------- buffering ----------
+    def stage(self, user_id: str, step_data: Dict[str, Any], flush_now: bool = False) -> Dict[str, Any]:
+        """Merge step data into the pending record; returns the pending state."""
+        with self._lock:
+            pending = self._pending.get(user_id)
+            if pending is None:
+                pending = self._pending[user_id] = {}
+            else:
+                self.coalesced += 1
+            pending.update(step_data)
+            snapshot = dict(pending)
+
+            timer = self._timers.pop(user_id, None)
+            if timer:
+                timer.cancel()
+            if not flush_now:
+                timer = threading.Timer(self.delay, self.flush, args=(user_id,))
+                timer.daemon = True
+                self._timers[user_id] = timer
+                timer.start()
+
+        self._journal_write(user_id, snapshot)
+        return snapshot
+
+    def pending(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Unwritten fields: those still being flushed, overlaid with anything staged since."""
+        with self._lock:
+            data = dict(self._inflight.get(user_id) or {})
+            data.update(self._pending.get(user_id) or {})
+            return data or None
+
+    def flush(self, user_id: str) -> Optional[dict]:
+        """Write the user's pending record now. Returns the stored row (None on failure / nothing pending)."""
+        with self._lock:
+            timer = self._timers.pop(user_id, None)
+            if timer:
+                timer.cancel()
+            data = self._pending.pop(user_id, None)
+            if not data:
+                return None
+            # Readable through pending() until stored; an overlapping flush carries older fields along
+            inflight = dict(self._inflight.get(user_id) or {})
+            inflight.update(data)
+            self._inflight[user_id] = inflight
+
+        result = self.flush_fn(user_id, data)
+        if result is None:
+            # Put it back (merging with anything staged meanwhile) and retry later
+            with self._lock:
+                self._drop_inflight(user_id, inflight)
+                newer = self._pending.get(user_id, {})
+                data.update(newer)
+                self._pending[user_id] = data
+                if user_id not in self._timers:
+                    timer = threading.Timer(self.delay * 2, self.flush, args=(user_id,))
+                    timer.daemon = True
+                    self._timers[user_id] = timer
+                    timer.start()
+            logger.warning("Flush failed for %s, will retry", user_id)
+            return None
+
+        with self._lock:
+            self._drop_inflight(user_id, inflight)
+            still_pending = user_id in self._pending
+            self.flushes += 1
+        if not still_pending:
+            self._journal_clear(user_id)
+        return result
+
+    def _drop_inflight(self, user_id: str, inflight: Dict[str, Any]):
+        # Only this flush's entry; a later overlapping flush has replaced it with its own
+        if self._inflight.get(user_id) is inflight:
+            del self._inflight[user_id]
+
+    def flush_all(self):
+        with self._lock:
+            users = list(self._pending.keys())
+        for user_id in users:
+            self.flush(user_id)
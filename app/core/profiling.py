@@ -0,0 +1,347 @@
+"""
+Request Profiling for DietNotify
+Opt-in per-request capture (X-Profile header, or the admin toggle for the next N requests) under
+a stack sampler or cProfile, plus continuous low-rate sampling aggregated across requests.
+Samples are written as folded stacks (flamegraph.pl / speedscope); cProfile captures as .prof (pstats).
+"""
+import io
+import os
+import sys
+import time
+import pstats
+import cProfile
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+from flask import Flask, Response, g, jsonify, request, send_from_directory
+
+
+logger = logging.getLogger(__name__)
+
+PROFILING_TOKEN = os.getenv('PROFILING_TOKEN', '')                # empty = profiling endpoints/header disabled
+PROFILING_DIR = os.getenv('PROFILING_DIR', 'logs/profiles')
+PROFILING_KEEP = int(os.getenv('PROFILING_KEEP', '50'))           # capture files kept on disk
+PROFILING_REQUEST_HZ = float(os.getenv('PROFILING_REQUEST_HZ', '200'))
+PROFILING_SAMPLE_HZ = float(os.getenv('PROFILING_SAMPLE_HZ', '0'))  # continuous sampling; 0 = off at startup
+PROFILING_MAX_STACKS = 20000                                       # distinct stacks kept in the continuous report
+PROFILING_MAX_DEPTH = 128
+
+MODES = ('sample', 'cprofile')
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _fold(frame) -> str:
+    """Root-first 'a;b;c' stack for one frame chain."""
+    labels = []
+    while frame is not None and len(labels) < PROFILING_MAX_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return ';'.join(labels)
+
+
+def format_folded(stacks: Counter) -> str:
+    return ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class StackSampler:
+    """
+    One daemon thread that snapshots the stacks of request threads via sys._current_frames().
+    Per-request captures are sampled at PROFILING_REQUEST_HZ; threads serving any request are
+    sampled at the continuous rate when it is enabled, with the route as the root frame.
+    """
+
+    def __init__(self, request_hz: float = PROFILING_REQUEST_HZ, continuous_hz: float = PROFILING_SAMPLE_HZ):
+        self.request_hz = request_hz
+        self.continuous_hz = continuous_hz
+        self._lock = threading.Lock()
+        self._active = {}       # thread id -> route, for every in-flight request
+        self._captures = {}     # thread id -> Counter, for per-request sample captures
+        self.stacks = Counter()
+        self.samples = 0
+        self.dropped = 0
+        self.since = time.time()
+        self._wake = threading.Event()
+        self._thread = None
+
+    # ---- request bookkeeping ----
+
+    def enter(self, route: str):
+        with self._lock:
+            self._active[threading.get_ident()] = route
+        if self.continuous_hz:
+            self._ensure_thread()
+
+    def leave(self):
+        with self._lock:
+            self._active.pop(threading.get_ident(), None)
+
+    def begin_capture(self) -> None:
+        with self._lock:
+            self._captures[threading.get_ident()] = Counter()
+        self._ensure_thread()
+        self._wake.set()
+
+    def end_capture(self) -> Counter:
+        with self._lock:
+            return self._captures.pop(threading.get_ident(), Counter())
+
+    # ---- continuous report ----
+
+    def set_rate(self, hz: float):
+        self.continuous_hz = max(0.0, hz)
+        if self.continuous_hz:
+            self._ensure_thread()
+        self._wake.set()
+
+    def reset(self):
+        with self._lock:
+            self.stacks = Counter()
+            self.samples = 0
+            self.dropped = 0
+            self.since = time.time()
+
+    def report(self) -> str:
+        with self._lock:
+            stacks = Counter(self.stacks)
+        return format_folded(stacks)
+
+    # ---- sampling loop ----
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        next_continuous = time.monotonic()
+        while True:
+            with self._lock:
+                capturing = bool(self._captures)
+            if not capturing and not self.continuous_hz:
+                self._wake.wait()
+                self._wake.clear()
+                next_continuous = time.monotonic()
+                continue
+
+            now = time.monotonic()
+            take_continuous = bool(self.continuous_hz) and now >= next_continuous
+            if take_continuous:
+                next_continuous = now + 1.0 / self.continuous_hz
+            self._sample(take_continuous)
+
+            interval = 1.0 / self.request_hz if capturing else max(0.0, next_continuous - time.monotonic())
+            if self._wake.wait(interval):
+                self._wake.clear()
+
+    def _sample(self, continuous: bool):
+        frames = sys._current_frames()
+        with self._lock:
+            for ident, counter in self._captures.items():
+                frame = frames.get(ident)
+                if frame is not None:
+                    counter[_fold(frame)] += 1
+            if not continuous:
+                return
+            for ident, route in self._active.items():
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack = f"{route};{_fold(frame)}"
+                if stack in self.stacks or len(self.stacks) < PROFILING_MAX_STACKS:
+                    self.stacks[stack] += 1
+                else:
+                    self.dropped += 1
+                self.samples += 1
+
+
+class RequestProfiler:
+    """Per-request capture decisions, capture storage and the admin toggle state."""
+
+    def __init__(self, directory: str = PROFILING_DIR, keep: int = PROFILING_KEEP):
+        self.directory = directory
+        self.keep = keep
+        self.sampler = StackSampler()
+        # Python 3.12+ allows only one active cProfile per process; serialise captures
+        self._cprofile_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self.pending = 0            # admin toggle: profile the next N (matching) requests
+        self.pending_route = ''
+        self.pending_mode = 'sample'
+
+    def arm(self, count: int, route: str = '', mode: str = 'sample'):
+        with self._lock:
+            self.pending = max(0, count)
+            self.pending_route = route
+            self.pending_mode = mode if mode in MODES else 'sample'
+
+    def requested_mode(self) -> Optional[str]:
+        """Mode for the current request, or None when it should not be profiled."""
+        header = request.headers.get('X-Profile')
+        if header and request.headers.get('X-Profile-Token') == PROFILING_TOKEN:
+            return header if header in MODES else 'sample'
+        if self.pending:
+            route = request.url_rule.rule if request.url_rule else request.path
+            with self._lock:
+                if self.pending and (not self.pending_route or route.startswith(self.pending_route)):
+                    self.pending -= 1
+                    return self.pending_mode
+        return None
+
+    def start(self, mode: str):
+        if mode == 'cprofile':
+            if not self._cprofile_lock.acquire(blocking=False):
+                return None
+            profile = cProfile.Profile()
+            profile.enable()
+            return profile
+        self.sampler.begin_capture()
+        return True
+
+    def stop(self, mode: str, handle) -> Optional[str]:
+        """Finish a capture and write it; returns the capture file name."""
+        route = request.url_rule.rule if request.url_rule else request.path
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        slug = route.strip('/').replace('/', '_').replace('<', '').replace('>', '') or 'root'
+        os.makedirs(self.directory, exist_ok=True)
+
+        if mode == 'cprofile':
+            handle.disable()
+            self._cprofile_lock.release()
+            name = f"{stamp}-{request.method}-{slug}.prof"
+            handle.dump_stats(os.path.join(self.directory, name))
+        else:
+            stacks = self.sampler.end_capture()
+            name = f"{stamp}-{request.method}-{slug}.folded"
+            with open(os.path.join(self.directory, name), 'w', encoding='utf-8') as f:
+                f.write(format_folded(stacks))
+        self._prune()
+        return name
+
+    def captures(self) -> list:
+        try:
+            names = [n for n in os.listdir(self.directory) if n.endswith(('.prof', '.folded'))]
+        except FileNotFoundError:
+            return []
+        return sorted(names, reverse=True)
+
+    def _prune(self):
+        for name in self.captures()[self.keep:]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+
+# Global instance
+profiler = RequestProfiler()
+
+
+# ============== FLASK HOOKS ==============
+def _before_request():
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    profiler.sampler.enter(f"{request.method} {route}")
+    mode = profiler.requested_mode()
+    if mode:
+        handle = profiler.start(mode)
+        if handle is not None:
+            g._profile = (mode, handle)
+
+
+def _after_request(response):
+    capture = g.pop('_profile', None)
+    if capture:
+        try:
+            response.headers['X-Profile-Id'] = profiler.stop(*capture)
+        except Exception as e:
+            logger.warning("Profile capture failed: %s", e)
+    return response
+
+
+def _teardown_request(exc):
+    # Requests that raised never reached after_request
+    capture = g.pop('_profile', None)
+    if capture:
+        try:
+            profiler.stop(*capture)
+        except Exception as e:
+            logger.warning("Profile capture failed: %s", e)
+    profiler.sampler.leave()
+
+
+def _authorized() -> bool:
+    return request.headers.get('Authorization') == f"Bearer {PROFILING_TOKEN}"
+
+
+def profile_status():
+    if not _authorized():
+        return jsonify({"error": "Unauthorized"}), 401
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        if 'sampling_hz' in data:
+            profiler.sampler.set_rate(float(data['sampling_hz'] or 0))
+        if data.get('reset'):
+            profiler.sampler.reset()
+        if 'capture_next' in data:
+            profiler.arm(int(data['capture_next']), data.get('route', ''), data.get('mode', 'sample'))
+        logger.info("Profiling settings changed: %s", data)
+    sampler = profiler.sampler
+    return jsonify({
+        "sampling_hz": sampler.continuous_hz,
+        "samples": sampler.samples,
+        "distinct_stacks": len(sampler.stacks),
+        "dropped": sampler.dropped,
+        "since": datetime.fromtimestamp(sampler.since).isoformat(timespec='seconds'),
+        "capture_next": profiler.pending,
+        "capture_route": profiler.pending_route,
+        "capture_mode": profiler.pending_mode,
+        "captures": profiler.captures(),
+    })
+
+
+def profile_report():
+    if not _authorized():
+        return Response('Unauthorized\n', status=401, mimetype='text/plain')
+    filename = datetime.now().strftime('dietnotify-%Y%m%d-%H%M%S.folded')
+    return Response(profiler.sampler.report(), mimetype='text/plain',
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+
+def profile_capture(name: str):
+    if not _authorized():
+        return Response('Unauthorized\n', status=401, mimetype='text/plain')
+    if name.endswith('.prof') and request.args.get('format') == 'text':
+        path = os.path.join(profiler.directory, os.path.basename(name))
+        if not os.path.isfile(path):
+            return Response('Not found\n', status=404, mimetype='text/plain')
+        # Top functions by cumulative time, for a quick look without pstats tooling
+        out = io.StringIO()
+        pstats.Stats(path, stream=out) \
+            .sort_stats('cumulative').print_stats(40)
+        return Response(out.getvalue(), mimetype='text/plain')
+    return send_from_directory(os.path.abspath(profiler.directory), name, as_attachment=True)
+
+
+def init_profiling(app: Flask):
+    """Hooks + /debug/profile endpoints; a no-op unless PROFILING_TOKEN is set."""
+    if not PROFILING_TOKEN:
+        return
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.add_url_rule('/debug/profile', 'profile_status', profile_status, methods=['GET', 'POST'])
+    app.add_url_rule('/debug/profile/report', 'profile_report', profile_report)
+    app.add_url_rule('/debug/profile/captures/<path:name>', 'profile_capture', profile_capture)
+    if profiler.sampler.continuous_hz:
+        profiler.sampler.set_rate(profiler.sampler.continuous_hz)
+    logger.info("Profiling enabled (continuous sampling %s Hz, captures in %s)",
+                profiler.sampler.continuous_hz, profiler.directory)
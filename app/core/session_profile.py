@@ -0,0 +1,67 @@
+"""
+Session Profile Snapshot for DietNotify
+Keeps a compact, versioned profile-progress record in the signed session cookie
+so auth status checks on every page load don't hit the database
+"""
+import os
+import time
+from typing import Dict, Any, Optional
+
+from flask import session
+
+from .database import get_profile_progress
+from .profile_buffer import FINAL_PROFILE_STEP
+
+
+SNAPSHOT_KEY = 'profile_snapshot'
+SNAPSHOT_VERSION = 1   # bump when the snapshot shape changes; older cookies are rebuilt
+PROFILE_SNAPSHOT_TTL = int(os.getenv('PROFILE_SNAPSHOT_TTL', '900'))   # seconds (bounds cross-device staleness)
+
+
+def _store(user_id: str, has_profile: bool, is_complete: bool, current_step: int, name: Optional[str]) -> Dict[str, Any]:
+    snapshot = {
+        "v": SNAPSHOT_VERSION,
+        "uid": user_id,
+        "at": int(time.time()),
+        "has_profile": bool(has_profile),
+        "is_complete": bool(is_complete),
+        "current_step": current_step or 1,
+        "name": name or None
+    }
+    session[SNAPSHOT_KEY] = snapshot
+    return snapshot
+
+
+def store_from_progress(user_id: str, progress: Dict[str, Any]) -> Dict[str, Any]:
+    """Snapshot a get_profile_progress() result into the session."""
+    profile = progress.get('profile') or {}
+    return _store(user_id, progress.get('has_profile'), progress.get('is_complete'),
+                  progress.get('current_step'), profile.get('name'))
+
+
+def record_profile_step(user_id: str, step: int, saved: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Refresh the snapshot after save_profile_step without re-reading the profile."""
+    previous = session.get(SNAPSHOT_KEY) or {}
+    name = (saved or {}).get('name') or (previous.get('name') if previous.get('uid') == user_id else None)
+    return _store(user_id, True, step >= FINAL_PROFILE_STEP, step, name)
+
+
+def load_snapshot(user_id: str) -> Optional[Dict[str, Any]]:
+    """The session snapshot if it belongs to this user, has the current version and is fresh."""
+    snapshot = session.get(SNAPSHOT_KEY)
+    if (not snapshot or snapshot.get('v') != SNAPSHOT_VERSION or snapshot.get('uid') != user_id
+            or time.time() - snapshot.get('at', 0) > PROFILE_SNAPSHOT_TTL):
+        return None
+    return snapshot
+
+
+def get_profile_snapshot(user_id: str) -> Dict[str, Any]:
+    """Session snapshot, rebuilt from the database only when missing or stale."""
+    snapshot = load_snapshot(user_id)
+    if snapshot is None:
+        snapshot = store_from_progress(user_id, get_profile_progress(user_id))
+    return snapshot
+
+
+def clear_snapshot():
+    session.pop(SNAPSHOT_KEY, None)
@@ -0,0 +1,229 @@
+"""
+Static Asset Pipeline for DietNotify
+Build step: content-hashed copies of app/static plus precompressed .gz/.br variants and a manifest
+Runtime: serves the best precompressed variant; hashed URLs get far-future immutable caching
+
+Build with:  python -m app.core.static_assets
+"""
+import logging
+import os
+import re
+import sys
+import json
+import gzip
+import hashlib
+import mimetypes
+from typing import Dict, Any
+
+from flask import request, send_file, send_from_directory
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+
+STATIC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'static'))
+BUILD_DIRNAME = 'dist'
+MANIFEST_NAME = 'manifest.json'
+
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'   # hashed URLs never change content
+REVALIDATE_CACHE = 'public, no-cache'                      # original URLs: cache + ETag revalidation
+
+# Regenerated at runtime (nutrition export): never hashed into the manifest, always served from disk
+RUNTIME_DIRS = ('data/',)
+
+# Keep a compressed variant only if it saves at least this fraction (PNG/JPEG rarely do)
+MIN_COMPRESSION_GAIN = 0.05
+ALREADY_COMPRESSED = {'.png', '.jpg', '.jpeg', '.gif', '.webp', '.mp3', '.mp4', '.woff2', '.zip', '.gz', '.br'}
+
+# /static/... references inside CSS are rewritten to hashed URLs at build time
+_CSS_URL = re.compile(r"""url\((['"]?)/static/([^'")?#]+)\1\)""")
+
+
+def _hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _hashed_name(relpath: str, digest: str) -> str:
+    root, ext = os.path.splitext(relpath)
+    return f"{root}.{digest[:10]}{ext}"
+
+
+def _write_if_missing(path: str, data: bytes):
+    if os.path.exists(path):
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _build_one(relpath: str, data: bytes, build_dir: str) -> Dict[str, Any]:
+    digest = _hash_bytes(data)
+    hashed = _hashed_name(relpath, digest)
+    out_path = os.path.join(build_dir, hashed)
+    _write_if_missing(out_path, data)
+
+    encodings = []
+    if os.path.splitext(relpath)[1].lower() not in ALREADY_COMPRESSED and data:
+        limit = len(data) * (1 - MIN_COMPRESSION_GAIN)
+        if BROTLI_AVAILABLE:
+            br = brotli.compress(data, quality=11)
+            if len(br) <= limit:
+                _write_if_missing(out_path + '.br', br)
+                encodings.append('br')
+        gz = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(gz) <= limit:
+            _write_if_missing(out_path + '.gz', gz)
+            encodings.append('gzip')
+
+    return {"hashed": hashed.replace(os.sep, '/'), "hash": digest[:32], "size": len(data), "encodings": encodings}
+
+
+def build_static_assets(static_dir: str = STATIC_DIR) -> Dict[str, Any]:
+    """
+    Write hashed + precompressed copies of every file under static_dir into
+    static_dir/dist and record them in dist/manifest.json. Unchanged files are
+    not rewritten; outputs no longer referenced by the manifest are removed.
+    """
+    build_dir = os.path.join(static_dir, BUILD_DIRNAME)
+    sources = []
+    for root, dirs, files in os.walk(static_dir):
+        if os.path.abspath(root) == os.path.abspath(static_dir) and BUILD_DIRNAME in dirs:
+            dirs.remove(BUILD_DIRNAME)
+        for name in files:
+            full = os.path.join(root, name)
+            relpath = os.path.relpath(full, static_dir).replace(os.sep, '/')
+            if not relpath.startswith(RUNTIME_DIRS):
+                sources.append(relpath)
+
+    files = {}
+    # CSS last: its url(/static/...) references point at the hashed names built first
+    for relpath in sorted(sources, key=lambda p: (p.endswith('.css'), p)):
+        with open(os.path.join(static_dir, relpath), 'rb') as f:
+            data = f.read()
+        if relpath.endswith('.css'):
+            text = data.decode('utf-8')
+            text = _CSS_URL.sub(
+                lambda m: f"url({m.group(1)}/static/{files[m.group(2)]['hashed']}{m.group(1)})"
+                if m.group(2) in files else m.group(0),
+                text
+            )
+            data = text.encode('utf-8')
+        files[relpath] = _build_one(relpath, data, build_dir)
+
+    manifest = {"version": 1, "files": files}
+    os.makedirs(build_dir, exist_ok=True)
+    tmp = os.path.join(build_dir, MANIFEST_NAME + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, os.path.join(build_dir, MANIFEST_NAME))
+
+    # Prune stale outputs from earlier builds
+    keep = {MANIFEST_NAME}
+    for entry in files.values():
+        keep.add(entry['hashed'])
+        keep.update(f"{entry['hashed']}{'.br' if e == 'br' else '.gz'}" for e in entry['encodings'])
+    for root, _, names in os.walk(build_dir):
+        for name in names:
+            rel = os.path.relpath(os.path.join(root, name), build_dir).replace(os.sep, '/')
+            if rel not in keep:
+                os.remove(os.path.join(root, name))
+
+    return manifest
+
+
+class StaticAssets:
+    """
+    Serves app/static through the build manifest (falls back to plain files
+    when no build exists). The manifest is reloaded when it changes on disk.
+    """
+
+    def __init__(self, static_dir: str = STATIC_DIR):
+        self.static_dir = static_dir
+        self.build_dir = os.path.join(static_dir, BUILD_DIRNAME)
+        self.manifest_path = os.path.join(self.build_dir, MANIFEST_NAME)
+        self._mtime = None
+        self._files = {}        # original relpath -> manifest entry
+        self._by_hashed = {}    # hashed relpath -> original relpath
+
+    def _load(self):
+        try:
+            mtime = os.path.getmtime(self.manifest_path)
+        except OSError:
+            self._mtime, self._files, self._by_hashed = None, {}, {}
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                files = json.load(f).get('files', {})
+        except Exception as e:
+            logger.error("Manifest load error: %s", e)
+            return
+        self._files = files
+        self._by_hashed = {entry['hashed']: path for path, entry in files.items()}
+        self._mtime = mtime
+        logger.info("Loaded manifest with %s asset(s)", len(files))
+
+    def url(self, relpath: str) -> str:
+        """Public URL for a static file: hashed when built, plain otherwise."""
+        self._load()
+        relpath = relpath.lstrip('/')
+        entry = self._files.get(relpath)
+        return f"/static/{entry['hashed'] if entry else relpath}"
+
+    def send(self, filename: str):
+        if filename.startswith(RUNTIME_DIRS):
+            # Current file on disk, revalidated by ETag (a build may predate the last regeneration)
+            response = send_from_directory(self.static_dir, filename, max_age=0)
+            response.headers['Cache-Control'] = REVALIDATE_CACHE
+            return response
+        self._load()
+        original = self._by_hashed.get(filename)
+        immutable = original is not None
+        entry = self._files.get(original or filename)
+        if not entry:
+            return send_from_directory(self.static_dir, filename)
+
+        path = os.path.join(self.build_dir, entry['hashed'])
+        encoding = None
+        accepted = request.accept_encodings
+        for candidate, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if candidate in entry['encodings'] and accepted[candidate]:
+                encoding, path = candidate, path + suffix
+                break
+
+        mimetype = mimetypes.guess_type(original or filename)[0] or 'application/octet-stream'
+        etag = entry['hash'] + (f"-{encoding}" if encoding else '')
+        response = send_file(path, mimetype=mimetype, etag=etag, conditional=True,
+                             max_age=None, last_modified=None)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if entry['encodings']:
+            response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE if immutable else REVALIDATE_CACHE
+        return response
+
+
+# Global instance
+static_assets = StaticAssets()
+
+
+if __name__ == '__main__':
+    from .logging_setup import configure_logging
+
+    configure_logging()
+    logger.setLevel(logging.INFO)    # the build summary belongs in the build log
+    target = sys.argv[1] if len(sys.argv) > 1 else STATIC_DIR
+    result = build_static_assets(target)
+    built = result['files'].values()
+    raw = sum(e['size'] for e in built)
+    logger.info("Built %s asset(s), %.0f KB source, %s with precompressed variants",
+                len(result['files']), raw / 1024, sum(1 for e in built if e['encodings']))
@@ -0,0 +1,189 @@
+"""
+Tracking Aggregation Layer for DietNotify
+Maintains per-user daily/weekly/monthly rollups of daily_tracking as reports are saved
+and caches AI progress reports per (user, tracking state)
+"""
+import hashlib
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Any, List, Optional
+
+
+ROLLUP_RETENTION_DAYS = 60
+
+
+def _parse_score(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def summarize_day(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact summary of one daily_tracking row (items are 0-10 meal ratings)."""
+    items = record.get('data') or record.get('items') or []
+    scores = [_parse_score(i.get('score')) for i in items if isinstance(i, dict)]
+    score = _parse_score(record.get('total_score'))
+    if not score and scores:
+        score = sum(scores) / len(scores)
+    return {
+        "date": record.get('date'),
+        "score": round(score, 1),
+        "adherence": round(score * 10),                         # % of a perfect 10
+        "meals_logged": len(scores),
+        "meals_on_track": sum(1 for s in scores if s >= 7),
+        "meals": {i.get('name'): _parse_score(i.get('score')) for i in items if isinstance(i, dict) and i.get('name')}
+    }
+
+
+def _streaks(dates: List[str], today: datetime) -> Dict[str, int]:
+    """Current and longest runs of consecutive logged days."""
+    days = sorted({datetime.strptime(d, '%Y-%m-%d').date() for d in dates if d})
+    longest, run, prev = 0, 0, None
+    for d in days:
+        run = run + 1 if prev and (d - prev).days == 1 else 1
+        longest = max(longest, run)
+        prev = d
+
+    current = 0
+    cursor = today.date()
+    logged = set(days)
+    if cursor not in logged:
+        cursor -= timedelta(days=1)  # today not logged yet doesn't break the streak
+    while cursor in logged:
+        current += 1
+        cursor -= timedelta(days=1)
+    return {"current": current, "longest": longest}
+
+
+def _window(days: List[Dict[str, Any]], since: str, span: int) -> Dict[str, Any]:
+    logged = [d for d in days if d['date'] >= since]
+    count = len(logged)
+    avg = sum(d['score'] for d in logged) / count if count else 0.0
+    meal_totals = {}
+    for d in logged:
+        for name, s in d['meals'].items():
+            meal_totals.setdefault(name, []).append(s)
+    return {
+        "days_logged": count,
+        "span_days": span,
+        "avg_score": round(avg, 1),
+        "avg_adherence": round(avg * 10),
+        "consistency": round(count / span * 100),
+        "score_cap": int(count / span * 100),
+        "meal_averages": {n: round(sum(v) / len(v), 1) for n, v in meal_totals.items()}
+    }
+
+
+def build_rollups(daily: Dict[str, Dict[str, Any]], now: datetime = None) -> Dict[str, Any]:
+    """Today / 7-day / 30-day rollups plus streaks from per-day summaries."""
+    now = now or datetime.now()
+    today_str = now.strftime('%Y-%m-%d')
+    days = sorted(daily.values(), key=lambda d: d['date'])
+    month = [d for d in days if d['date'] >= (now - timedelta(days=30)).strftime('%Y-%m-%d')]
+
+    return {
+        "today": daily.get(today_str),
+        "weekly": _window(days, (now - timedelta(days=7)).strftime('%Y-%m-%d'), 7),
+        "monthly": _window(days, (now - timedelta(days=30)).strftime('%Y-%m-%d'), 30),
+        "streaks": _streaks([d['date'] for d in days], now),
+        "daily_series": [[d['date'], d['score']] for d in month],
+        "last_date": days[-1]['date'] if days else None
+    }
+
+
+class TrackingAggregator:
+    """
+    In-memory per-user store of day summaries, updated on every tracking save.
+
+    A user's summaries are loaded once from history (via `loader`) and then
+    maintained incrementally by `record()`, so rollups never re-scan raw rows.
+    At most `max_users` users are kept; the least recently used one is evicted.
+    """
+
+    def __init__(self, max_users: int = 5000):
+        self.max_users = max_users
+        self._daily = {}        # user_id -> {date: summary}, least recently used first
+        self._versions = {}     # user_id -> fingerprint of the current state
+        self._lock = threading.Lock()
+
+    def _fingerprint(self, daily: Dict[str, Dict[str, Any]]) -> str:
+        payload = json.dumps(sorted((d['date'], d['score'], d['meals_logged']) for d in daily.values()))
+        return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+    def _trim(self, daily: Dict[str, Dict[str, Any]]):
+        cutoff = (datetime.now() - timedelta(days=ROLLUP_RETENTION_DAYS)).strftime('%Y-%m-%d')
+        for date in [d for d in daily if d < cutoff]:
+            del daily[date]
+
+    def _ensure_loaded(self, user_id: str, loader: Callable[[], List[Dict[str, Any]]]):
+        with self._lock:
+            if user_id in self._daily:
+                return
+        history = loader() or []
+        daily = {r['date']: summarize_day(r) for r in history if r.get('date')}
+        with self._lock:
+            if user_id not in self._daily:
+                self._trim(daily)
+                if len(self._daily) >= self.max_users:
+                    evicted = next(iter(self._daily))
+                    self._daily.pop(evicted)
+                    self._versions.pop(evicted, None)
+                self._daily[user_id] = daily
+                self._versions[user_id] = self._fingerprint(daily)
+
+    def record(self, user_id: str, tracking_record: Dict[str, Any]):
+        """Fold a freshly saved day into the user's rollups (no-op if not loaded yet)."""
+        with self._lock:
+            daily = self._daily.get(user_id)
+            if daily is None or not tracking_record.get('date'):
+                return
+            daily[tracking_record['date']] = summarize_day(tracking_record)
+            self._trim(daily)
+            self._versions[user_id] = self._fingerprint(daily)
+
+    def get(self, user_id: str, loader: Callable[[], List[Dict[str, Any]]]) -> Dict[str, Any]:
+        self._ensure_loaded(user_id, loader)
+        with self._lock:
+            if user_id in self._daily:
+                self._daily[user_id] = self._daily.pop(user_id)   # mark most recently used
+            daily = dict(self._daily.get(user_id, {}))
+            version = self._versions.get(user_id)
+        rollups = build_rollups(daily)
+        rollups['version'] = version
+        return rollups
+
+    def invalidate(self, user_id: str):
+        with self._lock:
+            self._daily.pop(user_id, None)
+            self._versions.pop(user_id, None)
+
+
+class ReportCache:
+    """AI progress reports keyed by (user, current date, last tracking date, rollup version)."""
+
+    def __init__(self, max_users: int = 5000):
+        self.max_users = max_users
+        self._reports = {}      # user_id -> (key, report)
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str, key: tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._reports.get(user_id)
+            return item[1] if item and item[0] == key else None
+
+    def put(self, user_id: str, key: tuple, report: Dict[str, Any]):
+        with self._lock:
+            if len(self._reports) >= self.max_users and user_id not in self._reports:
+                self._reports.pop(next(iter(self._reports)))
+            self._reports[user_id] = (key, report)
+
+    def invalidate(self, user_id: str):
+        with self._lock:
+            self._reports.pop(user_id, None)
+
+
+# Global instances
+tracking_aggregator = TrackingAggregator()
+report_cache = ReportCache()
@@ -0,0 +1,192 @@
+"""
+Tracking Summary Engine for DietNotify
+Vectorized per-day / per-week adherence, score and meal-completion series over daily_tracking
+Results are cached per user and dropped on that user's next tracking save
+"""
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+SUMMARY_RANGES = {'7d': 7, '30d': 30, '90d': 90}
+DEFAULT_SUMMARY_RANGE = '30d'
+MAX_SUMMARY_DAYS = 365
+ON_TRACK_SCORE = 7
+
+
+def parse_range(value: Optional[str]) -> int:
+    """'7d' / '30d' / '90d' or a plain day count; falls back to the default range."""
+    value = (value or DEFAULT_SUMMARY_RANGE).strip().lower()
+    if value in SUMMARY_RANGES:
+        return SUMMARY_RANGES[value]
+    try:
+        days = int(value.rstrip('d'))
+    except ValueError:
+        return SUMMARY_RANGES[DEFAULT_SUMMARY_RANGE]
+    return max(1, min(days, MAX_SUMMARY_DAYS))
+
+
+def _series(values: np.ndarray, logged: np.ndarray, decimals: int = 1) -> List[Optional[float]]:
+    """Rounded values with None for days that were not logged (chart gaps)."""
+    rounded = np.round(values.astype(float), decimals)
+    return [float(v) if ok else None for v, ok in zip(rounded, logged)]
+
+
+def compute_tracking_summary(rows: List[Dict[str, Any]], days: int, now: datetime = None) -> Dict[str, Any]:
+    """
+    Daily and weekly series for the last `days` days ending today.
+
+    Each row is a daily_tracking record (date, data = [{name, score}], total_score).
+    Item scores are flattened once into arrays and aggregated per day with
+    bincount, so the cost is linear in logged meals with no per-day Python work.
+    """
+    now = now or datetime.now()
+    end = pd.Timestamp(now.date())
+    index = pd.date_range(end - pd.Timedelta(days=days - 1), end, freq='D')
+
+    rows = [r for r in rows or [] if r.get('date')]
+    dates = pd.to_datetime([r['date'] for r in rows], errors='coerce')
+    keep = np.asarray(dates.isin(index)) if len(rows) else np.zeros(0, dtype=bool)
+    rows = [r for r, k in zip(rows, keep) if k]
+    dates = dates[keep] if len(keep) else dates
+
+    # Flatten meal items: one entry per logged meal, tagged with its row position
+    items = [[i for i in (r.get('data') or []) if isinstance(i, dict)] for r in rows]
+    counts = np.array([len(i) for i in items], dtype=int)
+    item_row = np.repeat(np.arange(len(rows)), counts)
+    item_scores = pd.to_numeric(
+        pd.Series([i.get('score') for row in items for i in row], dtype=object), errors='coerce'
+    ).fillna(0).to_numpy(dtype=float)
+
+    meals_logged = counts.astype(float)
+    meals_completed = np.bincount(item_row, weights=(item_scores > 0), minlength=len(rows))
+    meals_on_track = np.bincount(item_row, weights=(item_scores >= ON_TRACK_SCORE), minlength=len(rows))
+    score_sum = np.bincount(item_row, weights=item_scores, minlength=len(rows))
+
+    total_score = pd.to_numeric(
+        pd.Series([r.get('total_score') for r in rows], dtype=object), errors='coerce'
+    ).fillna(0).to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        item_avg = np.where(counts > 0, score_sum / np.maximum(counts, 1), 0.0)
+    score = np.where(total_score > 0, total_score, item_avg)
+
+    per_row = pd.DataFrame({
+        "score": score,
+        "meals_logged": meals_logged,
+        "meals_completed": meals_completed,
+        "meals_on_track": meals_on_track,
+    }, index=dates)
+    # Duplicate dates (legacy rows) keep the latest value
+    per_row = per_row[~per_row.index.duplicated(keep='last')]
+    daily = per_row.reindex(index)
+    logged = daily['score'].notna().to_numpy()
+    daily = daily.fillna(0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        completion = np.where(daily['meals_logged'] > 0,
+                              daily['meals_completed'] / daily['meals_logged'] * 100, 0.0)
+    daily['adherence'] = daily['score'] * 10
+    daily['completion'] = completion
+    daily['logged'] = logged.astype(float)
+
+    # Weeks start on Monday; averages only over logged days
+    weekly_groups = daily.assign(
+        logged_score=daily['score'].where(logged),
+        logged_completion=daily['completion'].where(logged)
+    ).resample('W-MON', label='left', closed='left')
+    weekly = pd.DataFrame({
+        "days_logged": weekly_groups['logged'].sum(),
+        "span_days": weekly_groups['logged'].count(),
+        "avg_score": weekly_groups['logged_score'].mean(),
+        "completion": weekly_groups['logged_completion'].mean(),
+        "meals_on_track": weekly_groups['meals_on_track'].sum(),
+    })
+    weekly['adherence'] = weekly['avg_score'] * 10
+    weekly['consistency'] = weekly['days_logged'] / weekly['span_days'] * 100
+    weekly = weekly.fillna(0)
+
+    days_logged = int(logged.sum())
+    logged_scores = daily['score'].to_numpy()[logged]
+    avg_score = float(logged_scores.mean()) if days_logged else 0.0
+    best = int(np.argmax(np.where(logged, daily['score'].to_numpy(), -1))) if days_logged else None
+
+    return {
+        "range_days": days,
+        "start": index[0].strftime('%Y-%m-%d'),
+        "end": index[-1].strftime('%Y-%m-%d'),
+        "daily": {
+            "dates": [d.strftime('%Y-%m-%d') for d in index],
+            "score": _series(daily['score'].to_numpy(), logged),
+            "adherence": _series(daily['adherence'].to_numpy(), logged, 0),
+            "completion": _series(daily['completion'].to_numpy(), logged, 0),
+            "meals_logged": daily['meals_logged'].astype(int).tolist(),
+            "meals_on_track": daily['meals_on_track'].astype(int).tolist(),
+        },
+        "weekly": [
+            {
+                "week_start": week.strftime('%Y-%m-%d'),
+                "days_logged": int(row['days_logged']),
+                "avg_score": round(float(row['avg_score']), 1),
+                "adherence": round(float(row['adherence'])),
+                "completion": round(float(row['completion'])),
+                "consistency": round(float(row['consistency'])),
+                "meals_on_track": int(row['meals_on_track']),
+            }
+            for week, row in weekly.iterrows()
+        ],
+        "totals": {
+            "days_logged": days_logged,
+            "avg_score": round(avg_score, 1),
+            "avg_adherence": round(avg_score * 10),
+            "consistency": round(days_logged / days * 100),
+            "completion": round(float(daily['completion'].to_numpy()[logged].mean())) if days_logged else 0,
+            "today": float(round(daily['score'].iloc[-1], 1)) if logged[-1] else None,
+            "best_day": index[best].strftime('%Y-%m-%d') if best is not None else None,
+        }
+    }
+
+
+class TrackingSummaryCache:
+    """
+    Per-user summaries keyed by range; a user's entries are dropped by
+    `invalidate()` whenever that user saves tracking, and expire at midnight
+    since the window is anchored on today.
+    """
+
+    def __init__(self, max_users: int = 5000):
+        self.max_users = max_users
+        self._summaries = {}    # user_id -> {(range_days, day): summary}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str, days: int, loader: Callable[[int], List[Dict[str, Any]]]) -> Dict[str, Any]:
+        key = (days, datetime.now().strftime('%Y-%m-%d'))
+        with self._lock:
+            cached = self._summaries.get(user_id, {}).get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        summary = compute_tracking_summary(loader(days), days)
+
+        with self._lock:
+            if len(self._summaries) >= self.max_users and user_id not in self._summaries:
+                self._summaries.pop(next(iter(self._summaries)))
+            entries = self._summaries.setdefault(user_id, {})
+            for stale in [k for k in entries if k[1] != key[1]]:
+                del entries[stale]
+            entries[key] = summary
+        return summary
+
+    def invalidate(self, user_id: str):
+        with self._lock:
+            self._summaries.pop(user_id, None)
+
+
+# Global instance
+tracking_summary_cache = TrackingSummaryCache()
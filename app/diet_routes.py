@@ -1,22 +1,32 @@
+import logging
 from flask import Blueprint, render_template, request, jsonify, session, redirect
-from .services.ai_diet_service import DietAI
+from .services.ai_diet_service import DietAI, key_pool
+from .services.assistant_cache import profile_context_cache
+from .services.expert_cache import expert_cache
 from .core.database import (
     get_profile, save_diet_plan, get_user_plans, 
-    get_active_plan, get_plan_by_id, set_active_plan,
-    get_profile_progress
+    get_active_plan, get_active_plan_summary, get_plan_by_id, set_active_plan,
+    get_tracking_history, get_active_plan_version, get_tracking_version,
+    encode_cursor, decode_cursor
 )
+from .core.http_cache import make_etag, not_modified, with_etag
+from .core.session_profile import get_profile_snapshot
+from .core.tracking_aggregates import tracking_aggregator, report_cache
+from .core.tracking_summary import tracking_summary_cache, parse_range
+from datetime import datetime
 import os
 
+logger = logging.getLogger(__name__)
+
 diet_bp = Blueprint('diet', __name__)
 
-# Initialize AI Service
-API_KEY = os.getenv('GEMINI_API_KEY', '').split(',')[0]
-if not API_KEY:
-    print("[DietRoutes] CRITICAL WARNING: No GEMINI_API_KEY found in environment!")
+# Initialize AI Service (keys are leased per call from the shared key pool)
+if not len(key_pool):
+    logger.critical("No GEMINI_API_KEY found in environment!")
 else:
-    print(f"[DietRoutes] Loaded API Key: {API_KEY[:4]}...{API_KEY[-4:]}")
+    logger.info("AI key pool ready with %s key(s)", len(key_pool))
 
-ai_service = DietAI(api_key=API_KEY)
+ai_service = DietAI()
 
 
 def is_authenticated():
@@ -36,13 +46,13 @@ def diet_smart_entry():
     user_id = get_current_user()
     
     # 1. Check Profile Completion
-    progress = get_profile_progress(user_id)
+    progress = get_profile_snapshot(user_id)
     if not progress['is_complete']:
         # Force redirect to profile if incomplete
         return redirect('/profile_setup.html')
     
     # 2. Check for Active Plan
-    active_plan = get_active_plan(user_id)
+    active_plan = get_active_plan_summary(user_id)
     if active_plan:
         return redirect('/diet/dashboard')
     else:
@@ -57,7 +67,7 @@ def create_plan_page():
         
     # Enforce profile completion even here
     user_id = get_current_user()
-    progress = get_profile_progress(user_id)
+    progress = get_profile_snapshot(user_id)
     if not progress['is_complete']:
          return redirect('/profile_setup.html')
 
@@ -71,12 +81,12 @@ def daily_tracking_page():
         return redirect('/login')
     
     user_id = get_current_user()
-    active_plan = get_active_plan(user_id)
+    active_plan = get_active_plan_summary(user_id)
     
     meals_data = []
-    if active_plan and 'plan_data' in active_plan:
-        # Extract meals from the AI generated plan
-        diet_protocol = active_plan['plan_data'].get('diet_protocol', {})
+    if active_plan and active_plan.get('plan_summary'):
+        # Meal schedule lives in the plan summary - no need to load the full plan
+        diet_protocol = active_plan['plan_summary'].get('diet_protocol', {})
         meals_data = diet_protocol.get('meals', [])
         
     return render_template('daily_tracking.html', meals=meals_data)
@@ -105,25 +115,46 @@ def dashboard_page():
 
 @diet_bp.route('/api/diet/active_plan', methods=['GET'])
 def get_active_plan_api():
-    """Get user's currently active diet plan"""
+    """
+    Get user's currently active diet plan.
+    ?view=summary returns only targets + meal schedule (same plan_data shape).
+    Supports If-None-Match: the ETag comes from the plan id + updated timestamp,
+    so an unchanged plan is answered with 304 before it is loaded.
+    """
     if not is_authenticated():
         return jsonify({"error": "Login required"}), 401
     
     user_id = get_current_user()
-    plan = get_active_plan(user_id)
+    view = 'summary' if request.args.get('view') == 'summary' else 'full'
     
-    if plan and plan.get('plan_data'):
-        return jsonify({
+    version = get_active_plan_version(user_id)
+    etag = None
+    if version is not None:
+        etag = make_etag('active_plan', view, user_id, version.get('id'),
+                         version.get('updated_at') or version.get('created_at'))
+        cached = not_modified(etag)
+        if cached:
+            return cached
+    
+    if view == 'summary':
+        plan = get_active_plan_summary(user_id)
+        plan_data = plan.get('plan_summary') if plan else None
+    else:
+        plan = get_active_plan(user_id)
+        plan_data = plan.get('plan_data') if plan else None
+    
+    if plan_data:
+        return with_etag(jsonify({
             "status": "success",
-            "plan_data": plan['plan_data'],
+            "plan_data": plan_data,
             "plan_meta": {
                 "id": plan.get('id'),
                 "created_at": plan.get('created_at'),
                 "duration_type": plan.get('duration_type')
             }
-        })
+        }), etag)
     
-    return jsonify({"status": "no_plan", "message": "No active plan found"})
+    return with_etag(jsonify({"status": "no_plan", "message": "No active plan found"}), etag)
 
 
 @diet_bp.route('/api/diet/user_profile', methods=['GET'])
@@ -158,6 +189,7 @@ def generate_all():
     try:
         data = request.json or {}
         duration = data.get('duration', 'weekly')
+        user_id = None
         
         # Check if user is authenticated and has profile
         if is_authenticated():
@@ -166,7 +198,7 @@ def generate_all():
             if profile:
                 # Remove Supabase-specific fields
                 user_profile = {k: v for k, v in profile.items() if k not in ['id', 'email', 'updated_at', 'created_at', 'current_step', 'is_complete']}
-                print(f"[DietRoutes] Using profile from database for: {user_id}")
+                logger.info("Using profile from database for: %s", user_id)
             else:
                 return jsonify({"error": "Profile not found. Please complete your profile first."}), 400
         else:
@@ -175,7 +207,8 @@ def generate_all():
             if not user_profile:
                 return jsonify({"error": "Login required or provide profile data"}), 400
         
-        print(f"[DietRoutes] Generating comprehensive {duration} plan for:", user_profile)
+        logger.info("Generating comprehensive %s plan for user %s", duration, user_id or 'anonymous')
+        logger.debug("Plan profile fields: %s", sorted(user_profile))
         result = ai_service.generate_comprehensive_plan(user_profile, duration)
         
         # Add duration type to result for saving
@@ -184,7 +217,7 @@ def generate_all():
         return jsonify(result)
         
     except Exception as e:
-        print(f"[DietRoutes] Error: {e}")
+        logger.error("Error: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
@@ -205,6 +238,7 @@ def save_plan():
         plan_data = data.get('plan_data', data)  # Allow full data or nested plan_data
         
         saved_plan = save_diet_plan(user_id, plan_data, duration_type)
+        report_cache.invalidate(user_id)
         
         if saved_plan:
             return jsonify({
@@ -216,7 +250,7 @@ def save_plan():
             return jsonify({"error": "Failed to save plan"}), 500
         
     except Exception as e:
-        print(f"[DietRoutes] Save plan error: {e}")
+        logger.error("Save plan error: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
@@ -229,9 +263,20 @@ def my_plans():
     try:
         user_id = get_current_user()
         limit = request.args.get('limit', 10, type=int)
-        plans = get_user_plans(user_id, limit=limit)
-        
-        # Simplify plan data for listing (don't send full plan_data)
+        try:
+            # Opaque keyset cursor: (created_at, id) of the last plan seen
+            before = request.args.get('before')
+            before = tuple(decode_cursor(before)) if before else None
+            if before is not None and len(before) != 2:
+                raise ValueError("Invalid cursor")
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        plans = get_user_plans(
+            user_id, limit=limit, before=before,
+            columns="id,duration_type,is_active,created_at,bio_summary:plan_summary->>bio_summary"
+        )
+        
+        # Listing uses summary records only (full plan is never fetched here)
         plan_list = []
         for plan in plans:
             plan_list.append({
@@ -240,17 +285,19 @@ def my_plans():
                 "is_active": plan.get('is_active'),
                 "created_at": plan.get('created_at'),
                 # Include summary info if available
-                "bio_summary": (plan.get('plan_data') or {}).get('bio_analysis', {}).get('body_type', 'N/A')
+                "bio_summary": plan.get('bio_summary') or 'N/A'
             })
         
         return jsonify({
             "authenticated": True,
             "plans": plan_list,
-            "count": len(plan_list)
+            "count": len(plan_list),
+            "next_cursor": (encode_cursor(plan_list[-1]['created_at'], plan_list[-1]['id'])
+                            if len(plan_list) == limit else None)
         })
         
     except Exception as e:
-        print(f"[DietRoutes] Get plans error: {e}")
+        logger.error("Get plans error: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
@@ -277,7 +324,7 @@ def get_plan(plan_id):
         })
         
     except Exception as e:
-        print(f"[DietRoutes] Get plan error: {e}")
+        logger.error("Get plan error: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
@@ -290,6 +337,7 @@ def set_active(plan_id):
     try:
         user_id = get_current_user()
         success = set_active_plan(user_id, plan_id)
+        report_cache.invalidate(user_id)
         
         if success:
             return jsonify({
@@ -300,7 +348,7 @@ def set_active(plan_id):
             return jsonify({"error": "Plan not found or access denied"}), 404
             
     except Exception as e:
-        print(f"[DietRoutes] Set active error: {e}")
+        logger.error("Set active error: %s", e)
         return jsonify({"error": str(e)}), 500
 @diet_bp.route('/api/expert_search', methods=['POST'])
 def expert_search():
@@ -315,8 +363,16 @@ def expert_search():
         if not lat or not lng:
             return jsonify({"error": "Location data missing"}), 400
 
-        print(f"[DietRoutes] AI Search request for: {query} near {location_name}")
-        experts = ai_service.search_experts(query, location_name)
+        try:
+            lat, lng = float(lat), float(lng)
+        except (TypeError, ValueError):
+            return jsonify({"error": "Invalid location data"}), 400
+
+        logger.info("AI Search request for: %s near %s", query, location_name)
+        experts = expert_cache.get_or_fetch(
+            query, lat, lng,
+            lambda: ai_service.search_experts(query, location_name)
+        )
         
         return jsonify({
             "status": "success",
@@ -324,14 +380,14 @@ def expert_search():
         })
         
     except Exception as e:
-        print(f"[DietRoutes] Expert search error: {e}")
+        logger.error("Expert search error: %s", e)
         return jsonify({"error": str(e)}), 500
 @diet_bp.route('/api/assistant_chat', methods=['POST'])
 def assistant_chat():
     """Endpoint for Diety AI Assistant (Gemma 3)"""
-    print("[DietRoutes] Incoming assistant chat request...")
+    logger.debug("Incoming assistant chat request...")
     if not is_authenticated():
-        print("[DietRoutes] Chat failed: User not authenticated")
+        logger.warning("Chat failed: User not authenticated")
         return jsonify({"error": "Login required"}), 401
         
     try:
@@ -339,15 +395,15 @@ def assistant_chat():
         data = request.json or {}
         message = data.get('message')
         
-        print(f"[DietRoutes] Message from user {user_id}: {message}")
+        logger.debug("Message from user %s: %s", user_id, message)
         if not message:
             return jsonify({"error": "Message missing"}), 400
             
-        # Get profile for context
-        profile = get_profile(user_id)
+        # Coarse profile context (name, goal, diet type), cached per user
+        profile = profile_context_cache.get(user_id, get_profile)
         
         answer = ai_service.chat_with_assistant(message, profile)
-        print(f"[DietRoutes] Gemma 3 response: {answer[:50]}...")
+        logger.debug("Gemma 3 response: %s...", answer[:50])
         
         return jsonify({
             "status": "success",
@@ -355,7 +411,7 @@ def assistant_chat():
         })
         
     except Exception as e:
-        print(f"[DietRoutes] Assistant chat error: {e}")
+        logger.error("Assistant chat error: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
@@ -377,12 +433,79 @@ def save_tracking():
         success = save_daily_tracking(user_id, data)
         
         if success:
+            tracking_summary_cache.invalidate(user_id)
+            tracking_aggregator.record(user_id, {
+                "date": data.get('date', datetime.now().strftime('%Y-%m-%d')),
+                "data": data.get('items', []),
+                "total_score": data.get('total_score', 0)
+            })
             return jsonify({"success": True, "message": "Report saved successfully"})
         else:
             return jsonify({"error": "Failed to save into database"}), 500
             
     except Exception as e:
-        print(f"[DietRoutes] Save tracking error: {e}")
+        logger.error("Save tracking error: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+MAX_TRACKING_BATCH = 90
+
+
+@diet_bp.route('/api/tracking/batch', methods=['POST'])
+def batch_tracking():
+    """
+    Save many days of tracking at once (offline sync / backfill).
+    Body: {"entries": [{"date": "YYYY-MM-DD", "items": [...], "total_score": 7.5}, ...]}
+    Returns per-date status: saved / unchanged / invalid / error.
+    """
+    if not is_authenticated():
+        return jsonify({"error": "Login required"}), 401
+    
+    try:
+        user_id = get_current_user()
+        data = request.json or {}
+        entries = data.get('entries')
+        
+        if not isinstance(entries, list) or not entries:
+            return jsonify({"error": "Missing tracking entries"}), 400
+        if len(entries) > MAX_TRACKING_BATCH:
+            return jsonify({"error": f"At most {MAX_TRACKING_BATCH} entries per batch"}), 400
+        
+        results = {}
+        valid = {}
+        for entry in entries:
+            date = (entry or {}).get('date') if isinstance(entry, dict) else None
+            try:
+                datetime.strptime(date or '', '%Y-%m-%d')
+            except ValueError:
+                results[str(date)] = "invalid"
+                continue
+            if not isinstance(entry.get('items'), list):
+                results[date] = "invalid"
+                continue
+            valid[date] = entry  # last entry for a date wins
+        
+        from .core.database import save_daily_tracking_batch
+        results.update(save_daily_tracking_batch(user_id, list(valid.values())))
+        if "saved" in results.values():
+            tracking_summary_cache.invalidate(user_id)
+        
+        for date, status in results.items():
+            if status == "saved":
+                entry = valid[date]
+                tracking_aggregator.record(user_id, {
+                    "date": date,
+                    "data": entry.get('items', []),
+                    "total_score": entry.get('total_score', 0)
+                })
+        
+        return jsonify({
+            "success": all(s in ("saved", "unchanged") for s in results.values()),
+            "results": results
+        })
+        
+    except Exception as e:
+        logger.error("Batch tracking error: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
@@ -395,17 +518,54 @@ def history_tracking():
     try:
         user_id = get_current_user()
         limit = request.args.get('limit', 7, type=int)
-        
-        from .core.database import get_tracking_history
-        history = get_tracking_history(user_id, limit)
-        
-        return jsonify({
+        before = request.args.get('before')  # keyset cursor: date of last entry seen
+        
+        # ETag from the latest tracking write (any save rewrites created_at)
+        version = get_tracking_version(user_id)
+        etag = None
+        if version is not None:
+            etag = make_etag('history', user_id, version.get('date'), version.get('created_at'), limit, before)
+            cached = not_modified(etag)
+            if cached:
+                return cached
+        
+        history = get_tracking_history(
+            user_id, limit, columns="date,data,total_score,created_at", before_date=before
+        )
+        
+        return with_etag(jsonify({
             "success": True, 
-            "history": history
-        })
+            "history": history,
+            "next_cursor": history[-1]['date'] if len(history) == limit else None
+        }), etag)
             
     except Exception as e:
-        print(f"[DietRoutes] History error: {e}")
+        logger.error("History error: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+@diet_bp.route('/api/tracking/summary', methods=['GET'])
+def tracking_summary():
+    """
+    Chart-ready rollups of recent tracking (?range=7d|30d|90d or a day count).
+    Daily series are aligned to one entry per calendar day (null = not logged).
+    """
+    if not is_authenticated():
+        return jsonify({"error": "Login required"}), 401
+    
+    try:
+        user_id = get_current_user()
+        days = parse_range(request.args.get('range'))
+        
+        summary = tracking_summary_cache.get(
+            user_id, days,
+            lambda n: get_tracking_history(user_id, n, columns="date,data,total_score")
+        )
+        
+        return jsonify({"success": True, "summary": summary})
+        
+    except Exception as e:
+        logger.error("Tracking summary error: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
@@ -418,26 +578,35 @@ def ai_analysis_api():
     try:
         user_id = get_current_user()
         
-        # 1. Get user profile
-        from .core.database import get_profile
+        # 1. Rollups over the last 30 days (maintained incrementally on save)
+        rollups = tracking_aggregator.get(
+            user_id, lambda: get_tracking_history(user_id, 30, columns="date,data,total_score")
+        )
+        # The report's TODAY section and streaks are relative to the current day
+        cache_key = (datetime.now().strftime('%Y-%m-%d'), rollups.get('last_date'), rollups.get('version'))
+        
+        cached = report_cache.get(user_id, cache_key)
+        if cached:
+            return jsonify({
+                "success": True,
+                "report": cached,
+                "cached": True
+            })
+        
+        # 2. Get user profile
         user_profile = get_profile(user_id)
         if not user_profile:
             return jsonify({"error": "User profile not found"}), 404
             
-        # 2. Get active plan
-        from .core.database import get_active_plan
-        active_plan = get_active_plan(user_id)
+        # 3. Get active plan (summary carries targets + meal schedule)
+        active_plan = get_active_plan_summary(user_id)
         if not active_plan:
             return jsonify({"error": "No active diet plan found to analyze"}), 404
-            
-        # 3. Get tracking history (last 30 days)
-        from .core.database import get_tracking_history
-        history = get_tracking_history(user_id, 30)
         
-        # 4. Run AI Analysis
-        from .services.ai_diet_service import DietAI
-        ai_service = DietAI()
-        report = ai_service.analyze_progress(user_profile, active_plan, history)
+        # 4. Run AI Analysis (shared service, pooled clients)
+        report = ai_service.analyze_progress(user_profile, active_plan, rollups)
+        if not report.get('error'):
+            report_cache.put(user_id, cache_key, report)
         
         return jsonify({
             "success": True,
@@ -445,6 +614,6 @@ def ai_analysis_api():
         })
         
     except Exception as e:
-        print(f"[DietRoutes] AI Analysis error: {e}")
+        logger.error("AI Analysis error: %s", e)
         return jsonify({"error": str(e)}), 500
 
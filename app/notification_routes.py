@@ -5,8 +5,9 @@ API endpoints for managing push notifications and preferences
 from flask import Blueprint, request, jsonify, session, send_from_directory, current_app, render_template
 import os
 from .services.notification_service import get_scheduler, init_notifications
+from .core.lifecycle import lifecycle, requires
 from .core.database import (
-    get_active_plan, get_profile
+    get_active_plan_summary, get_profile
 )
 from .core.notification_db import (
     save_notification_token, get_user_tokens, delete_notification_token,
@@ -36,6 +37,11 @@ def get_current_user():
 
 # ============== DEVICE TOKEN MANAGEMENT ==============
 
+def scheduler_ready() -> bool:
+    """Scheduler started and jobs restored; DB writes do not need to wait for it (restore picks them up)."""
+    return lifecycle.is_ready('notifications')
+
+
 @notification_bp.route('/api/notifications/register', methods=['POST'])
 def register_token():
     """Register a device FCM token for push notifications."""
@@ -54,12 +60,12 @@ def register_token():
     
     if result:
         # Also schedule notifications if user has an active diet plan
-        active_plan = get_active_plan(user_id)
+        active_plan = get_active_plan_summary(user_id) if scheduler_ready() else None
         if active_plan:
             preferences = get_notification_preferences(user_id)
             if preferences and preferences.get('enabled', True):
                 scheduler = get_scheduler()
-                plan_data = active_plan.get('plan_data', {})
+                plan_data = active_plan.get('plan_summary', {})
                 lead_time = preferences.get('lead_time_minutes', 5)
                 custom_timings = preferences.get('custom_timings', {})
                 
@@ -157,9 +163,13 @@ def update_preferences():
         return jsonify({"success": False, "error": "Database error while saving preferences"}), 500
     
     if result:
+        if not scheduler_ready():
+            # Saved; the scheduler applies it when it restores jobs at startup
+            return jsonify({"success": True, "message": "Preferences updated"})
+        
         # Reschedule notifications if enabled
         if prefs['enabled']:
-            active_plan = get_active_plan(user_id)
+            active_plan = get_active_plan_summary(user_id)
             tokens = get_user_tokens(user_id)
             
             if active_plan and tokens:
@@ -169,7 +179,7 @@ def update_preferences():
                 token_list = [t['fcm_token'] for t in tokens]
                 job_ids = scheduler.schedule_from_diet_plan(
                     user_id=user_id,
-                    diet_plan=active_plan.get('plan_data', {}),
+                    diet_plan=active_plan.get('plan_summary', {}),
                     tokens=token_list,
                     lead_time_minutes=prefs['lead_time_minutes'],
                     custom_timings=prefs.get('custom_timings', {})
@@ -198,6 +208,7 @@ def update_preferences():
 # ============== NOTIFICATION SCHEDULING ==============
 
 @notification_bp.route('/api/notifications/schedule', methods=['POST'])
+@requires('notifications')
 def schedule_notifications():
     """Schedule notifications from active diet plan."""
     if not is_authenticated():
@@ -206,7 +217,7 @@ def schedule_notifications():
     user_id = get_current_user()
     
     # Get user's active diet plan
-    active_plan = get_active_plan(user_id)
+    active_plan = get_active_plan_summary(user_id)
     if not active_plan:
         return jsonify({"error": "No active diet plan found"}), 404
     
@@ -224,7 +235,7 @@ def schedule_notifications():
     scheduler.cancel_user_notifications(user_id)  # Clear old schedules
     
     token_list = [t['fcm_token'] for t in tokens]
-    plan_data = active_plan.get('plan_data', {})
+    plan_data = active_plan.get('plan_summary', {})
     custom_timings = prefs.get('custom_timings', {}) if prefs else {}
     
     job_ids = scheduler.schedule_from_diet_plan(
@@ -250,17 +261,17 @@ def get_status():
     
     user_id = get_current_user()
     
-    # Get tokens
-    tokens = get_user_tokens(user_id)
+    # Get tokens (only ids are needed to count devices)
+    tokens = get_user_tokens(user_id, columns="id")
     
     # Get preferences
-    prefs = get_notification_preferences(user_id)
+    prefs = get_notification_preferences(user_id, columns="enabled,lead_time_minutes")
     
-    # Get scheduled jobs
-    scheduler = get_scheduler()
-    jobs = scheduler.get_user_jobs(user_id)
+    # Get scheduled jobs (none until the scheduler is up)
+    jobs = get_scheduler().get_user_jobs(user_id) if scheduler_ready() else []
     
     return jsonify({
+        "scheduler_ready": scheduler_ready(),
         "registered_devices": len(tokens) if tokens else 0,
         "enabled": prefs.get('enabled', False) if prefs else False,
         "lead_time_minutes": prefs.get('lead_time_minutes', 5) if prefs else 5,
@@ -277,6 +288,7 @@ def debug_page():
     return render_template('notification_debug.html')
 
 @notification_bp.route('/api/notifications/test', methods=['POST'])
+@requires('notifications')
 def send_test():
     """Send a test notification to verify setup."""
     if not is_authenticated():
@@ -1,11 +1,26 @@
-from flask import Blueprint, request, jsonify, render_template, send_from_directory, redirect, current_app
+import logging
+from flask import Blueprint, request, jsonify, render_template, redirect, current_app
 import os
 import json
 from . import loader
-from .core.nutrition_engine import calculate_meal_totals, get_major_nutrients, get_detailed_nutrients
+from .core.static_assets import static_assets
+from .core.json_provider import frame_response
+from .core.lifecycle import lifecycle, requires
+from .core.nutrition_engine import (calculate_meal_totals, get_major_nutrients, get_detailed_nutrients,
+                                    classify_health_scores, MAJOR_NUTRIENTS)
+
+logger = logging.getLogger(__name__)
 
 main_bp = Blueprint('main', __name__)
 
+# /api/search: default page size, and the slim autocomplete projection used unless ?fields= is given
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+SEARCH_DEFAULT_FIELDS = ['food'] + MAJOR_NUTRIENTS + ['health_score']
+SEARCH_COMPUTED_FIELDS = ('health_score', 'health_class')
+# CSV index artifacts and the internal sort key - never returned
+SEARCH_HIDDEN_COLUMNS = {'Unnamed: 0', 'Unnamed: 0.1', 'rank', 'level_0', 'index'}
+
 # Helper to get data directory
 def get_data_dir():
     # app/../data
@@ -30,9 +45,16 @@ def about():
 
 @main_bp.route('/healthz')
 def health_check():
+    # Liveness only: answers as soon as the worker is up, warm-up or not
     return jsonify({"status": "healthy"}), 200
 
 
+@main_bp.route('/readyz')
+def readiness_check():
+    status = lifecycle.status()
+    return jsonify(status), 200 if status['ready'] else 503
+
+
 
 # Static asset route is handled automatically by Flask for 'static' folder
 # But if html files link to "assets/...", we might need a redirect or ensuring templates use valid paths.
@@ -42,18 +64,63 @@ def health_check():
 
 @main_bp.route('/assets/<path:filename>')
 def serve_assets(filename):
-    return send_from_directory('static', filename)
+    # Same precompressed / hashed lookup as the /static route
+    return static_assets.send(filename)
 
 # ============== API ROUTES ==============
 
+def _search_fields(spec):
+    """Columns for ?fields= ('all', a comma list, or empty for the slim default); raises ValueError."""
+    available = [c for c in loader.get_dataframe().columns if c not in SEARCH_HIDDEN_COLUMNS]
+    if spec == 'all':
+        return available + list(SEARCH_COMPUTED_FIELDS)
+    fields = [f.strip() for f in spec.split(',') if f.strip()] or SEARCH_DEFAULT_FIELDS
+    unknown = [f for f in fields if f not in available and f not in SEARCH_COMPUTED_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def _decode_cursor(cursor):
+    """'<rank>.<row index>' of the last row of the previous page; raises ValueError."""
+    if not cursor:
+        return None
+    rank, index = cursor.split('.')
+    return int(rank), int(index)
+
+
 @main_bp.route('/api/search', methods=['GET'])
+@requires('nutrition_data')
 def search_food():
+    """
+    ?q= search. ?fields=food,Protein,... (or 'all') selects columns, default is the slim
+    autocomplete projection; ?limit= (max 100) pages, with X-Next-Cursor to pass as ?cursor=.
+    """
     query = request.args.get('q', '').strip()
     if not query:
         return jsonify([])
     
-    results = loader.search(query, limit=50)
-    return jsonify(results)
+    try:
+        fields = _search_fields(request.args.get('fields', '').strip())
+        limit = min(max(int(request.args.get('limit', SEARCH_DEFAULT_LIMIT)), 1), SEARCH_MAX_LIMIT)
+        after = _decode_cursor(request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({"error": str(e) if str(e).startswith('Unknown') else "Invalid limit or cursor"}), 400
+    
+    # One extra row tells us whether there is a next page
+    matches = loader.search_frame(query, limit=limit + 1, after=after)
+    page = matches.iloc[:limit]
+    
+    projected = page[[f for f in fields if f not in SEARCH_COMPUTED_FIELDS]]
+    if any(f in SEARCH_COMPUTED_FIELDS for f in fields):
+        scores, classes = classify_health_scores(page)
+        projected = projected.assign(health_score=scores, health_class=classes)[fields]
+    
+    # Serialized from the column arrays - no dict per row
+    response = frame_response(projected)
+    if len(matches) > limit:
+        response.headers['X-Next-Cursor'] = f"{int(page['rank'].iloc[-1])}.{int(page.index[-1])}"
+    return response
 
 @main_bp.route('/api/calculate', methods=['POST'])
 def calculate_meal():
@@ -63,6 +130,7 @@ def calculate_meal():
     return jsonify(totals)
 
 @main_bp.route('/api/food/<food_name>', methods=['GET'])
+@requires('nutrition_data')
 def get_food_detail(food_name):
     # Search precise
     data = loader.get_dataframe()
@@ -100,7 +168,7 @@ def save_profile():
             
         return jsonify({"status": "success", "message": "Profile saved successfully"})
     except Exception as e:
-        print(f"Error saving profile: {e}")
+        logger.error("Error saving profile: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @main_bp.route('/api/status')
@@ -108,7 +176,8 @@ def api_status():
     return jsonify({
         "status": "online",
         "message": "DietNotify API v2 running",
-        "total_foods": len(loader.get_dataframe()) if loader else 0
+        "total_foods": len(loader.get_dataframe()) if loader else 0,
+        "ready": lifecycle.status()['ready']
     })
 
 @main_bp.route('/api/ask', methods=['POST'])
@@ -135,9 +204,9 @@ def ask_query():
         if success:
             return jsonify({"status": "success", "message": "Query submitted successfully! Our science team will reach out soon."})
         else:
-            print(f"Bkd Save Query Failure: {message}")
+            logger.warning("Bkd Save Query Failure: %s", message)
             return jsonify({"status": "error", "message": f"Database error: {message}"}), 500
 
     except Exception as e:
-        print(f"Error in /api/ask: {e}")
+        logger.error("Error in /api/ask: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
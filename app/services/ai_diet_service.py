@@ -3,62 +3,106 @@ AI Diet Service for DietNotify
 Generates personalized diet plans using Google Gemini AI
 Pattern adapted from crop flow ai for robust API handling
 """
+import logging
 import os
 import json
 from typing import Dict, Any, Optional, List
 from datetime import datetime
+import time
+import threading
+
+from .key_pool import KeyPool, backoff_delay, is_rate_limit_error, response_token_count
+from .assistant_cache import assistant_cache, small_talk_reply
+from ..core.metrics import observe_upstream
+
+logger = logging.getLogger(__name__)
 
 try:
     from google import genai
     from google.genai import types
-    print("[DietAI] google-genai SDK loaded successfully")
+    logger.info("google-genai SDK loaded successfully")
 except ImportError as e:
-    print(f"[DietAI] google-genai library not found: {e}")
-    print("[DietAI] Please run: pip install google-genai")
+    logger.warning("google-genai library not found: %s", e)
+    logger.warning("Please run: pip install google-genai")
     genai = None
     types = None
 
 
-# API KEY MANAGEMENT - Multiple keys for fallback
+# API KEY MANAGEMENT - Multiple keys, leased per call from a health-tracked pool
 GEMINI_API_KEYS = [key.strip() for key in os.getenv('GEMINI_API_KEY', '').split(',') if key.strip()]
 
+# Global API key pool
+key_pool = KeyPool(GEMINI_API_KEYS)
 
-class APIKeyRotator:
-    """Thread-safe API key rotation manager - adapted from crop flow ai."""
-    def __init__(self, keys: List[str]):
-        self.keys = [k for k in keys if k]
-        self.current_index = 0
-        self.failed_keys = set()
-        
-        if not self.keys:
-            print("[DietAI] WARNING: No API keys available!")
-    
-    def get_current_key(self) -> Optional[str]:
-        if not self.keys:
-            return None
-        return self.keys[self.current_index]
-    
-    def rotate_key(self) -> Optional[str]:
-        if not self.keys:
+
+class ClientPool:
+    """
+    Process-wide cache of genai.Client instances, one per API key.
+    Each client (and its HTTP connection pool) is built once and reused,
+    so switching keys is a dict lookup instead of a client rebuild.
+    """
+
+    def __init__(self):
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def get(self, api_key: str):
+        if not api_key or not genai:
             return None
-            
-        self.failed_keys.add(self.current_index)
-        for _ in range(len(self.keys)):
-            self.current_index = (self.current_index + 1) % len(self.keys)
-            if self.current_index not in self.failed_keys:
-                print(f"[DietAI] Rotated to API key #{self.current_index + 1}")
-                return self.keys[self.current_index]
-        
-        print(f"[DietAI] All keys exhausted, resetting rotation")
-        self.failed_keys.clear()
-        return self.keys[self.current_index]
-    
-    def reset_failures(self):
-        self.failed_keys.clear()
+        client = self._clients.get(api_key)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._clients.get(api_key)
+            if client is None:
+                client = genai.Client(api_key=api_key)
+                self._clients[api_key] = client
+                logger.info("Gemini Client created (%s pooled)", len(self._clients))
+            return client
+
+    def warm(self, api_keys: List[str]) -> int:
+        """Build clients for every key ahead of the first request; returns how many are ready."""
+        ready = 0
+        for key in api_keys:
+            try:
+                if self.get(key) is not None:
+                    ready += 1
+            except Exception as e:
+                logger.error("Client warm-up error: %s", e)
+        return ready
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+# Global client pool shared by every DietAI instance
+client_pool = ClientPool()
+
+
+PROFILE_PROMPT_FIELDS = ['name', 'age', 'gender', 'weight', 'height', 'goal', 'job_activity',
+                         'activity_level', 'diet_type', 'conditions', 'allergies']
 
 
-# Global API key rotator
-api_rotator = APIKeyRotator(GEMINI_API_KEYS)
+def compact_profile(user_profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Only the profile fields that matter for progress analysis."""
+    return {k: user_profile.get(k) for k in PROFILE_PROMPT_FIELDS if user_profile.get(k) not in (None, '')}
+
+
+def compact_protocol(plan_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Targets and meal schedule of a plan, without the long-form bullets."""
+    protocol = (plan_data or {}).get('diet_protocol', {})
+    return {
+        "targets": (plan_data or {}).get('user_overview', {}),
+        "meals": [
+            {"time": m.get('time'), "name": m.get('name'), "macros": m.get('macros')}
+            for m in protocol.get('meals', [])
+        ]
+    }
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Rough prompt token estimate (~4 chars per token) used for TPM budgeting."""
+    return sum(len(t) for t in texts if t) // 4
 
 
 class DietAI:
@@ -68,29 +112,56 @@ class DietAI:
     """
     
     def __init__(self, api_key: str = None):
-        self.api_key = api_key or api_rotator.get_current_key()
+        self.api_key = api_key or (GEMINI_API_KEYS[0] if GEMINI_API_KEYS else None)
         self.client = None
         self.model_name = "gemini-2.5-flash"
-        
-        self._initialize_client()
+        # Client is taken from the pool on first use (warmed in the background at startup)
     
     def _initialize_client(self):
         """Initialize the Gemini API client."""
         if not self.api_key:
-            print("[DietAI] No API Key provided!")
+            logger.warning("No API Key provided!")
             return
         
         if not genai:
-            print("[DietAI] google-genai SDK not available!")
+            logger.warning("google-genai SDK not available!")
             return
         
         try:
-            self.client = genai.Client(api_key=self.api_key)
-            print(f"[DietAI] Gemini Client initialized with model: {self.model_name}")
+            self.client = client_pool.get(self.api_key)
+            logger.info("Gemini Client ready with model: %s", self.model_name)
         except Exception as e:
-            print(f"[DietAI] Error initializing client: {e}")
+            logger.error("Error initializing client: %s", e)
             self.client = None
     
+    def _client_for(self, api_key: str):
+        """Pooled client bound to the given key."""
+        return client_pool.get(api_key)
+
+    def _generate(self, model: str, contents: str, config, estimated_tokens: int = 0):
+        """
+        Single generate_content call on a key leased from the pool.
+        Key health (tokens used, failures, rate-limit cooldown) is recorded on release.
+        """
+        with key_pool.lease(estimated_tokens) as lease, observe_upstream('gemini', model) as call:
+            if not lease.key:
+                call.status = 'no_key'
+                raise RuntimeError("No API key available (all keys cooling down or busy)")
+            client = self._client_for(lease.key)
+            call.bytes_out = len(contents or '')
+            try:
+                response = client.models.generate_content(model=model, contents=contents, config=config)
+            except Exception as e:
+                call.status = 'rate_limited' if is_rate_limit_error(e) else 'error'
+                raise
+            lease.tokens_used = response_token_count(response) or estimated_tokens
+            call.tokens = lease.tokens_used
+            call.bytes_in = len(getattr(response, 'text', None) or '')
+            return response
+
+    def _max_attempts(self) -> int:
+        return max(len(key_pool), 1) + 1
+
     def _get_system_prompt(self) -> str:
         """
         CRITICAL: This prompt generates the EXACT JSON structure required by dashboard.
@@ -319,7 +390,7 @@ Generate the complete JSON protocol now:"""
         Uses API key rotation for robustness.
         """
         if not self.client:
-            print("[DietAI] No client available, attempting to reinitialize...")
+            logger.info("No client available, attempting to reinitialize...")
             self._initialize_client()
             if not self.client:
                 return {"error": "AI Service unavailable - could not initialize client"}
@@ -328,15 +399,19 @@ Generate the complete JSON protocol now:"""
         
         user_prompt = self._build_user_prompt(user_profile, duration)
         
-        # Try with API key rotation on failure
-        max_attempts = len(GEMINI_API_KEYS)
+        # Each attempt leases the least-loaded healthy key from the pool
+        max_attempts = self._max_attempts()
+        estimated_tokens = estimate_tokens(system_prompt, user_prompt) + 8000
+        response = None
         
         for attempt in range(max_attempts):
+            if attempt:
+                time.sleep(backoff_delay(attempt))
             try:
-                print(f"[DietAI] Attempt {attempt + 1}/{max_attempts} - Generating plan with {self.model_name}...")
-                print(f"[DietAI] User: {user_profile.get('name', 'Unknown')}, Goal: {user_profile.get('goal', 'Unknown')}")
+                logger.info("Attempt %s/%s - Generating plan with %s...", attempt + 1, max_attempts, self.model_name)
+                logger.info("User: %s, Goal: %s", user_profile.get('name', 'Unknown'), user_profile.get('goal', 'Unknown'))
                 
-                response = self.client.models.generate_content(
+                response = self._generate(
                     model=self.model_name,
                     contents=user_prompt,
                     config=types.GenerateContentConfig(
@@ -344,10 +419,11 @@ Generate the complete JSON protocol now:"""
                         response_mime_type="application/json",
                         max_output_tokens=30000,
                         temperature=0.7
-                    )
+                    ),
+                    estimated_tokens=estimated_tokens
                 )
                 
-                print(f"[DietAI] Response received! Size: {len(response.text)} chars")
+                logger.info("Response received! Size: %s chars", len(response.text))
                 
                 # Clean and parse response
                 clean_text = response.text.strip()
@@ -367,28 +443,22 @@ Generate the complete JSON protocol now:"""
                 result['_timestamp'] = datetime.now().isoformat()
                 result['_user_name'] = user_profile.get('name', 'User')
                 
-                print(f"[DietAI] Successfully generated plan for {user_profile.get('name', 'User')}!")
-                api_rotator.reset_failures()
+                logger.info("Successfully generated plan for %s!", user_profile.get('name', 'User'))
                 return result
                 
             except json.JSONDecodeError as e:
-                print(f"[DietAI] JSON Parse Error (attempt {attempt + 1}): {e}")
-                print(f"[DietAI] Raw response preview: {response.text[:500] if response else 'No response'}...")
+                logger.error("JSON Parse Error (attempt %s): %s", attempt + 1, e)
+                logger.debug("Raw response preview: %s...", response.text[:500] if response else 'No response')
                 
             except Exception as e:
-                error_str = str(e).lower()
-                print(f"[DietAI] API Error (attempt {attempt + 1}): {e}")
+                logger.error("API Error (attempt %s): %s", attempt + 1, e)
                 
-                if any(x in error_str for x in ['quota', 'rate', 'resource', '429', 'exhausted']):
-                    print(f"[DietAI] Rate limit detected, rotating API key...")
-                    self.api_key = api_rotator.rotate_key()
-                    self._initialize_client()
+                if is_rate_limit_error(e):
+                    logger.warning("Rate limit detected, key cooled down - backing off before next key")
                 else:
-                    print(f"[DietAI] Unknown error, rotating API key for resilience...")
-                    self.api_key = api_rotator.rotate_key()
-                    self._initialize_client()
+                    logger.warning("Unknown error, backing off before retry...")
         
-        print(f"[DietAI] All {max_attempts} attempts failed!")
+        logger.warning("All %s attempts failed!", max_attempts)
         return {
             "error": "AI Generation Failed after all attempts",
             "details": "Please check server logs for details"
@@ -403,7 +473,7 @@ Generate the complete JSON protocol now:"""
                 return []
 
         search_model = "gemini-2.5-flash-lite"
-        max_attempts = len(GEMINI_API_KEYS)
+        max_attempts = self._max_attempts()
         
         system_prompt = """You are a health discovery assistant. 
         Your task is to find REAL, REPUTABLE health experts, nutritionists, dietitians, and clinics near a specific location.
@@ -419,31 +489,33 @@ Generate the complete JSON protocol now:"""
         prompt = f"Search for real {query} near {location_context}. Return 5 results as JSON."
 
         for attempt in range(max_attempts):
+            if attempt:
+                time.sleep(backoff_delay(attempt))
             try:
-                print(f"[DietAI] AI Discovery (Attempt {attempt+1}) using {search_model} for: {location_context}")
-                response = self.client.models.generate_content(
+                logger.info("AI Discovery (Attempt %s) using %s for: %s", attempt+1, search_model, location_context)
+                response = self._generate(
                     model=search_model,
                     contents=prompt,
                     config=types.GenerateContentConfig(
                         system_instruction=system_prompt,
                         response_mime_type="application/json"
-                    )
+                    ),
+                    estimated_tokens=estimate_tokens(system_prompt, prompt) + 1000
                 )
                 
-                print(f"[DietAI] AI Discovery Success!")
+                logger.info("AI Discovery Success!")
                 experts = json.loads(response.text.strip())
                 return experts if isinstance(experts, list) else []
                 
             except Exception as e:
-                print(f"[DietAI] AI Discovery attempt {attempt+1} failed: {e}")
-                self.api_key = api_rotator.rotate_key()
-                self._initialize_client()
+                logger.warning("AI Discovery attempt %s failed: %s", attempt+1, e)
                 
         return []
-    def analyze_progress(self, user_profile: Dict[str, Any], active_plan: Dict[str, Any], tracking_history: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def analyze_progress(self, user_profile: Dict[str, Any], active_plan: Dict[str, Any], rollups: Dict[str, Any]) -> Dict[str, Any]:
         """
         AI Progress Analysis - Compares plan vs actual results and provides guidance.
         Using Gemini 2.5 Flash for professional reporting.
+        `rollups` comes from TrackingAggregator.get() - only aggregates reach the prompt.
         """
         if not self.client:
             self._initialize_client()
@@ -451,7 +523,7 @@ Generate the complete JSON protocol now:"""
                 return {"error": "AI Service unavailable"}
 
         model_to_use = "gemini-2.5-flash"
-        max_attempts = len(GEMINI_API_KEYS)
+        max_attempts = self._max_attempts()
 
         system_prompt = """You are a Senior High-Performance Bio-Data Analyst and Clinical Nutritionist.
         Your goal is to provide a 'Progress Intelligence Report' by comparing the user's assigned 'Diet Protocol' with their 'Real-World Performance Logs' across TODAY, THIS WEEK, and THIS MONTH.
@@ -502,32 +574,25 @@ Generate the complete JSON protocol now:"""
         }
         """
 
-        # Pre-process history into Today, Weekly, Monthly for the AI
+        # Compact, pre-aggregated context (see core/tracking_aggregates.py)
         today_str = datetime.now().strftime('%Y-%m-%d')
-        today_data = [h for h in tracking_history if h.get('date') == today_str]
-        
-        from datetime import timedelta
-        week_ago = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
-        weekly_data = [h for h in tracking_history if h.get('date') >= week_ago]
-        
-        # Calculate Data Completeness Factors
-        days_logged_week = len(set(h['date'] for h in weekly_data))
-        days_logged_month = len(set(h['date'] for h in tracking_history)) # assuming 30 day history passed
-        
-        # Determine Score Caps
-        # Week: 1 day = ~14%, 2 days = ~28%, etc. Cap at strict ratio.
-        weekly_score_cap = int((days_logged_week / 7) * 100)
-        # Month: Cap at ratio of 30 days
-        monthly_score_cap = int((days_logged_month / 30) * 100)
+        weekly = rollups.get('weekly', {})
+        monthly = rollups.get('monthly', {})
+        days_logged_week = weekly.get('days_logged', 0)
+        days_logged_month = monthly.get('days_logged', 0)
+        weekly_score_cap = weekly.get('score_cap', 0)
+        monthly_score_cap = monthly.get('score_cap', 0)
         
         user_context = f"""
-        USER PROFILE: {json.dumps(user_profile)}
-        ASSIGNED DIET PROTOCOL: {json.dumps(active_plan.get('plan_data', {}).get('diet_protocol', {}))}
+        USER PROFILE: {json.dumps(compact_profile(user_profile))}
+        ASSIGNED DIET PROTOCOL: {json.dumps(compact_protocol(active_plan.get('plan_summary') or active_plan.get('plan_data', {})))}
         
-        PERFORMANCE DATA:
-        - TODAY ({today_str}): {json.dumps(today_data)}
-        - LAST 7 DAYS: {json.dumps(weekly_data)} (DAYS LOGGED: {days_logged_week}/7)
-        - LAST 30 DAYS (ALL LOGS): {json.dumps(tracking_history)} (DAYS LOGGED: {days_logged_month}/30)
+        PERFORMANCE DATA (meal ratings are 0-10, adherence is % of a perfect day):
+        - TODAY ({today_str}): {json.dumps(rollups.get('today'))}
+        - LAST 7 DAYS: {json.dumps(weekly)} (DAYS LOGGED: {days_logged_week}/7)
+        - LAST 30 DAYS: {json.dumps(monthly)} (DAYS LOGGED: {days_logged_month}/30)
+        - STREAKS: {json.dumps(rollups.get('streaks', {}))}
+        - DAILY SCORES [date, score]: {json.dumps(rollups.get('daily_series', []))}
         
         === MANDATORY SCORING CONSTRAINTS ===
         Based on the data volume, you MUST adhere to these maximum scores:
@@ -543,32 +608,40 @@ Generate the complete JSON protocol now:"""
         prompt = f"Perform a cross-timeframe analysis (Today vs Week vs Month) against the assigned protocol and generate a Progress Intelligence Report in JSON format:\n{user_context}"
 
         for attempt in range(max_attempts):
+            if attempt:
+                time.sleep(backoff_delay(attempt))
             try:
-                print(f"[DietAI] Progress Analysis (Attempt {attempt+1}) using {model_to_use}")
-                response = self.client.models.generate_content(
+                logger.info("Progress Analysis (Attempt %s) using %s", attempt+1, model_to_use)
+                response = self._generate(
                     model=model_to_use,
                     contents=prompt,
                     config=types.GenerateContentConfig(
                         system_instruction=system_prompt,
                         response_mime_type="application/json",
                         temperature=0.4
-                    )
+                    ),
+                    estimated_tokens=estimate_tokens(system_prompt, prompt) + 3000
                 )
                 
-                print(f"[DietAI] Progress Analysis Success!")
+                logger.info("Progress Analysis Success!")
                 return json.loads(response.text.strip())
                 
             except Exception as e:
-                print(f"[DietAI] Progress Analysis attempt {attempt+1} failed: {e}")
-                self.api_key = api_rotator.rotate_key()
-                self._initialize_client()
+                logger.warning("Progress Analysis attempt %s failed: %s", attempt+1, e)
                 
         return {"error": "Failed to generate AI analysis after multiple attempts"}
 
     def chat_with_assistant(self, message: str, user_profile: Dict[str, Any]) -> str:
         """
         Diety AI Assistant - Using Gemma 3 4B for smart, concise health chat.
+        Small talk and repeated questions are answered from the assistant cache.
         """
+        user_profile = user_profile or {}
+
+        local_reply = small_talk_reply(message, user_profile) or assistant_cache.get(message, user_profile)
+        if local_reply:
+            return local_reply
+
         if not self.client:
             self._initialize_client()
             if not self.client:
@@ -592,17 +665,20 @@ Generate the complete JSON protocol now:"""
         full_prompt = f"INSTRUCTIONS:\n{system_prompt}\n\nUSER MESSAGE:\n{message}"
 
         try:
-            print(f"[Diety] Chatting with Gemma 3 4B-IT for: {user_profile.get('name', 'User')}")
-            response = self.client.models.generate_content(
+            logger.info("Chatting with Gemma 3 4B-IT for: %s", user_profile.get('name', 'User'))
+            response = self._generate(
                 model=assistant_model,
                 contents=full_prompt,
                 config=types.GenerateContentConfig(
                     max_output_tokens=250,
                     temperature=0.8
-                )
+                ),
+                estimated_tokens=estimate_tokens(full_prompt) + 250
             )
-            return response.text.strip()
+            reply = response.text.strip()
+            assistant_cache.put(message, user_profile, reply)
+            return reply
             
         except Exception as e:
-            print(f"[Diety] Chat error: {e}")
+            logger.error("Chat error: %s", e)
             return "I'm having a small metabolic glitch. Can we try again in a moment?"
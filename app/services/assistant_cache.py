@@ -0,0 +1,291 @@
+"""
+Diety Assistant Response Cache for DietNotify
+TTL/LRU reply cache with TF-IDF near-duplicate lookup and precomputed small-talk replies
+Keeps greetings and repeated FAQ-style questions off the Gemma round trip
+"""
+import logging
+import os
+import re
+import math
+import time
+import threading
+from collections import OrderedDict, Counter
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+ASSISTANT_CACHE_SIZE = int(os.getenv('ASSISTANT_CACHE_SIZE', '1000'))
+ASSISTANT_CACHE_TTL = int(os.getenv('ASSISTANT_CACHE_TTL', str(6 * 3600)))        # seconds
+ASSISTANT_SIMILARITY = float(os.getenv('ASSISTANT_SIMILARITY', '0.85'))            # cosine threshold
+PROFILE_CONTEXT_TTL = int(os.getenv('ASSISTANT_PROFILE_TTL', '600'))               # seconds
+
+NAME_PLACEHOLDER = '{name}'
+
+# Profile fields whose values make a reply specific to one user (never cached, only the name is masked)
+PERSONAL_FIELDS = ('age', 'weight', 'height', 'target_weight', 'allergies', 'conditions', 'medications')
+EMPTY_VALUES = {'', 'none', 'no', 'nil', 'n/a', 'na', '0', 'no specific allergies'}
+# Body measurements / ages / allergy statements addressed to the user
+PERSONAL_PATTERN = re.compile(
+    r"\b\d+(?:\.\d+)?\s*(?:kg|kgs|kilos?|lbs?|pounds|cm|years?\s+old|yrs?\s+old)\b"
+    r"|\byou(?:'re| are)\s+(?:allergic|intolerant)\b|\byour\s+(?:allerg|weight\b|age\b|bmi\b)",
+    re.IGNORECASE
+)
+
+STOPWORDS = {
+    'a', 'an', 'the', 'is', 'are', 'am', 'i', 'me', 'my', 'you', 'your', 'it', 'to', 'of',
+    'and', 'or', 'in', 'on', 'for', 'with', 'be', 'do', 'does', 'can', 'should', 'what',
+    'how', 'please', 'tell', 'about', 'this', 'that', 'diety', 'hey', 'so', 'some'
+}
+
+# Precomputed replies for small talk - never worth a model call
+SMALL_TALK = {
+    'greeting': (
+        {'hi', 'hello', 'hey', 'hii', 'hiii', 'hola', 'namaste', 'yo', 'good morning',
+         'good afternoon', 'good evening', 'hi diety', 'hello diety', 'hey diety'},
+        "Hi {name}! I'm Diety. Ask me anything about your meals, nutrition or {goal} journey."
+    ),
+    'thanks': (
+        {'thanks', 'thank you', 'thx', 'ty', 'thank u', 'thanks diety', 'thank you diety'},
+        "Anytime, {name}! Stay consistent - small daily wins add up."
+    ),
+    'farewell': (
+        {'bye', 'goodbye', 'see you', 'good night', 'gn', 'cya'},
+        "Take care, {name}! Hydrate well and stick to your next meal on time."
+    ),
+    'identity': (
+        {'who are you', 'what are you', 'what can you do', 'help'},
+        "I'm Diety, your DietNotify assistant. I can answer quick questions on nutrition, meals, "
+        "exercise and your {goal} plan."
+    ),
+}
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace."""
+    text = re.sub(r"[^a-z0-9\s]", " ", (message or '').lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def tokenize(normalized: str) -> list:
+    return [t for t in normalized.split() if t not in STOPWORDS and len(t) > 1]
+
+
+def context_bucket(context: Dict[str, Any]) -> Tuple[str, str]:
+    """Coarse profile attributes that shape a reply: (goal, diet type)."""
+    context = context or {}
+    goal = str(context.get('goal') or 'general').strip().lower()
+    diet = str(context.get('diet_type') or context.get('dietary_preferences') or 'any').strip().lower()
+    return goal, diet
+
+
+def personalize(reply: str, context: Dict[str, Any]) -> str:
+    """Fill the name/goal placeholders of a cached or precomputed reply."""
+    context = context or {}
+    return (reply
+            .replace(NAME_PLACEHOLDER, str(context.get('name') or 'there'))
+            .replace('{goal}', str(context.get('goal') or 'health')))
+
+
+def small_talk_reply(message: str, context: Dict[str, Any]) -> Optional[str]:
+    """Precomputed reply for greetings / thanks / farewells, else None."""
+    normalized = normalize_message(message)
+    for phrases, reply in SMALL_TALK.values():
+        if normalized in phrases:
+            return personalize(reply, context)
+    return None
+
+
+def mask_name(reply: str, name: str) -> str:
+    """Replace the user's name (whole word, any case) with the placeholder."""
+    if len(name) < 2:
+        return reply
+    return re.sub(rf"\b{re.escape(name)}\b", NAME_PLACEHOLDER, reply, flags=re.IGNORECASE)
+
+
+def has_personal_details(reply: str, context: Dict[str, Any]) -> bool:
+    """True if the reply mentions the user's measurements, age, allergies or conditions."""
+    if PERSONAL_PATTERN.search(reply):
+        return True
+    context = context or {}
+    for field in PERSONAL_FIELDS:
+        value = context.get(field)
+        values = value if isinstance(value, (list, tuple, set)) else re.split(r"[,;]", str(value or ''))
+        for item in values:
+            item = str(item).strip()
+            if item.lower() in EMPTY_VALUES:
+                continue
+            if re.search(rf"\b{re.escape(item)}\b", reply, flags=re.IGNORECASE):
+                return True
+    return False
+
+
+class _Entry:
+    __slots__ = ('bucket', 'normalized', 'reply', 'expires_at', 'tf', 'hits')
+
+    def __init__(self, bucket, normalized, reply, expires_at, tf):
+        self.bucket = bucket
+        self.normalized = normalized
+        self.reply = reply
+        self.expires_at = expires_at
+        self.tf = tf
+        self.hits = 0
+
+
+class AssistantCache:
+    """
+    Thread-safe TTL + LRU cache of assistant replies.
+
+    Lookup order: exact normalized message, then the most similar past
+    question in the same (goal, diet type) bucket by TF-IDF cosine similarity.
+    Replies are stored with the user's name replaced by a placeholder so they
+    can be served to other users in the same bucket; replies that mention other
+    personal details (weight, age, allergies...) are not cached.
+    """
+
+    def __init__(self, max_entries: int = ASSISTANT_CACHE_SIZE, ttl_seconds: int = ASSISTANT_CACHE_TTL,
+                 similarity_threshold: float = ASSISTANT_SIMILARITY):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._entries = OrderedDict()   # (bucket, normalized) -> _Entry
+        self._doc_freq = Counter()      # term -> number of cached questions containing it
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    # ---------- index maintenance ----------
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry:
+            for term in entry.tf:
+                self._doc_freq[term] -= 1
+                if self._doc_freq[term] <= 0:
+                    del self._doc_freq[term]
+
+    def _evict(self, now: float):
+        expired = [k for k, e in self._entries.items() if e.expires_at <= now]
+        for key in expired:
+            self._remove(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _vector(self, tf: Counter) -> Dict[str, float]:
+        n_docs = len(self._entries) + 1
+        vec = {t: c * (math.log(n_docs / (1 + self._doc_freq.get(t, 0))) + 1.0) for t, c in tf.items()}
+        norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+        return {t: v / norm for t, v in vec.items()}
+
+    def _most_similar(self, bucket, tf: Counter, now: float) -> Tuple[Optional[_Entry], float]:
+        if not tf:
+            return None, 0.0
+        query = self._vector(tf)
+        best, best_score = None, 0.0
+        for entry in self._entries.values():
+            if entry.bucket != bucket or entry.expires_at <= now:
+                continue
+            if not query.keys() & entry.tf.keys():
+                continue
+            candidate = self._vector(entry.tf)
+            score = sum(w * candidate.get(t, 0.0) for t, w in query.items())
+            if score > best_score:
+                best, best_score = entry, score
+        return best, best_score
+
+    # ---------- public API ----------
+    def get(self, message: str, context: Dict[str, Any]) -> Optional[str]:
+        """Cached reply (personalized for this user) or None."""
+        normalized = normalize_message(message)
+        if not normalized:
+            return None
+        bucket = context_bucket(context)
+        key = (bucket, normalized)
+
+        with self._lock:
+            now = time.time()
+            entry = self._entries.get(key)
+            if entry and entry.expires_at > now:
+                self._entries.move_to_end(key)
+                entry.hits += 1
+                self.hits += 1
+                return personalize(entry.reply, context)
+
+            entry, score = self._most_similar(bucket, Counter(tokenize(normalized)), now)
+            if entry and score >= self.similarity_threshold:
+                self._entries.move_to_end((entry.bucket, entry.normalized))
+                entry.hits += 1
+                self.semantic_hits += 1
+                logger.info("Near-duplicate cache hit (%.2f): '%s' ~ '%s'", score, normalized, entry.normalized)
+                return personalize(entry.reply, context)
+
+            self.misses += 1
+            return None
+
+    def put(self, message: str, context: Dict[str, Any], reply: str):
+        normalized = normalize_message(message)
+        if not normalized or not reply:
+            return
+        bucket = context_bucket(context)
+        key = (bucket, normalized)
+
+        # Shared across users: only the name can be masked, anything else personal is not cached
+        if has_personal_details(reply, context):
+            return
+        name = str((context or {}).get('name') or '').strip()
+        generic = mask_name(reply, name)
+        tf = Counter(tokenize(normalized))
+
+        with self._lock:
+            now = time.time()
+            self._remove(key)
+            self._entries[key] = _Entry(bucket, normalized, generic, now + self.ttl_seconds, tf)
+            for term in tf:
+                self._doc_freq[term] += 1
+            self._evict(now)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses
+            }
+
+
+class ProfileContextCache:
+    """Short-lived per-user cache of the coarse profile fields the assistant needs."""
+
+    def __init__(self, ttl_seconds: int = PROFILE_CONTEXT_TTL):
+        self.ttl_seconds = ttl_seconds
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str, loader) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            item = self._items.get(user_id)
+            if item and item[0] > now:
+                return item[1]
+
+        profile = loader(user_id) or {}
+        context = {
+            "name": profile.get('name', 'User'),
+            "goal": profile.get('goal', 'Health Improvement'),
+            "diet_type": profile.get('diet_type') or profile.get('dietary_preferences')
+        }
+        # Not used for the prompt - lets AssistantCache.put recognise replies that mention them
+        context.update({field: profile.get(field) for field in PERSONAL_FIELDS if profile.get(field)})
+        with self._lock:
+            self._items[user_id] = (now + self.ttl_seconds, context)
+        return context
+
+    def invalidate(self, user_id: str):
+        with self._lock:
+            self._items.pop(user_id, None)
+
+
+# Global instances
+assistant_cache = AssistantCache()
+profile_context_cache = ProfileContextCache()
@@ -0,0 +1,135 @@
+"""
+Expert Search Cache for DietNotify
+Caches AI expert discovery results by (normalized query, geohash cell)
+Nearby users share results; concurrent identical misses coalesce into one upstream call
+"""
+import logging
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+
+EXPERT_CACHE_PRECISION = int(os.getenv('EXPERT_CACHE_PRECISION', '5'))   # ~4.9km x 4.9km cells
+EXPERT_CACHE_TTL = int(os.getenv('EXPERT_CACHE_TTL', str(24 * 3600)))     # seconds
+EXPERT_CACHE_SIZE = int(os.getenv('EXPERT_CACHE_SIZE', '2000'))
+EXPERT_CACHE_WAIT = float(os.getenv('EXPERT_CACHE_WAIT', '60'))           # max wait on an in-flight call
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def geohash_encode(lat: float, lng: float, precision: int = EXPERT_CACHE_PRECISION) -> str:
+    """Standard base32 geohash of a coordinate."""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    bits, bit_count, even = 0, 0, True
+    chars = []
+    while len(chars) < precision:
+        rng, val = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if val >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return ''.join(chars)
+
+
+def normalize_query(query: str) -> str:
+    text = re.sub(r"[^a-z0-9\s]", " ", (query or '').lower())
+    return ' '.join(sorted(set(text.split())))
+
+
+class _InFlight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+
+
+class ExpertSearchCache:
+    """
+    Bounded TTL cache for expert search results with single-flight misses.
+
+    Keys are (normalized query, geohash prefix). Only non-empty result lists
+    are cached, so a failed upstream call is retried by the next request.
+    """
+
+    def __init__(self, precision: int = EXPERT_CACHE_PRECISION, ttl_seconds: int = EXPERT_CACHE_TTL,
+                 max_entries: int = EXPERT_CACHE_SIZE):
+        self.precision = precision
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # key -> (expires_at, results)
+        self._in_flight = {}            # key -> _InFlight
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def make_key(self, query: str, lat: float, lng: float) -> tuple:
+        return normalize_query(query), geohash_encode(float(lat), float(lng), self.precision)
+
+    def get_or_fetch(self, query: str, lat: float, lng: float,
+                     fetch: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Cached results for this query/cell, calling `fetch` at most once per miss."""
+        key = self.make_key(query, lat, lng)
+
+        with self._lock:
+            now = time.time()
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _InFlight()
+                self._in_flight[key] = flight
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            logger.info("Waiting on in-flight search for %s", key)
+            flight.event.wait(EXPERT_CACHE_WAIT)
+            return flight.result or []
+
+        results = []
+        try:
+            results = fetch() or []
+        finally:
+            with self._lock:
+                if results:
+                    self._entries[key] = (time.time() + self.ttl_seconds, results)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                self._in_flight.pop(key, None)
+            flight.result = results
+            flight.event.set()
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "precision": self.precision
+            }
+
+
+# Global instance
+expert_cache = ExpertSearchCache()
@@ -0,0 +1,224 @@
+"""
+Gemini API Key Pool for DietNotify
+Health-tracked, rate-aware key selection with a global concurrency limit
+Replaces the reactive APIKeyRotator: keys are picked per call, not per failure
+"""
+import logging
+import os
+import time
+import random
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+
+# Pool tuning (all overridable through the environment)
+GEMINI_MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', '4'))
+GEMINI_TPM_LIMIT = int(os.getenv('GEMINI_TPM_LIMIT', '250000'))       # tokens/minute per key
+GEMINI_COOLDOWN_SECONDS = float(os.getenv('GEMINI_COOLDOWN_SECONDS', '30'))
+GEMINI_MAX_COOLDOWN_SECONDS = float(os.getenv('GEMINI_MAX_COOLDOWN_SECONDS', '300'))
+GEMINI_BACKOFF_BASE = float(os.getenv('GEMINI_BACKOFF_BASE', '0.5'))
+GEMINI_BACKOFF_MAX = float(os.getenv('GEMINI_BACKOFF_MAX', '8'))
+GEMINI_ACQUIRE_TIMEOUT = float(os.getenv('GEMINI_ACQUIRE_TIMEOUT', '30'))
+
+TPM_WINDOW_SECONDS = 60.0
+
+# Substrings that identify quota / rate-limit errors from the SDK
+RATE_LIMIT_MARKERS = ('quota', 'rate', 'resource', '429', 'exhausted')
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True if the exception looks like a quota / rate-limit rejection."""
+    error_str = str(error).lower()
+    return any(x in error_str for x in RATE_LIMIT_MARKERS)
+
+
+class KeyState:
+    """Live health and load counters for one API key."""
+
+    def __init__(self, index: int, key: str):
+        self.index = index
+        self.key = key
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.consecutive_failures = 0
+        self.total_calls = 0
+        self.total_failures = 0
+        self.token_window = deque()  # (timestamp, tokens)
+
+    def tokens_last_minute(self, now: float) -> int:
+        while self.token_window and now - self.token_window[0][0] > TPM_WINDOW_SECONDS:
+            self.token_window.popleft()
+        return sum(tokens for _, tokens in self.token_window)
+
+    def is_cooling(self, now: float) -> bool:
+        return now < self.cooldown_until
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        return {
+            "key": f"#{self.index + 1}",
+            "in_flight": self.in_flight,
+            "tokens_last_minute": self.tokens_last_minute(now),
+            "cooldown_remaining": round(max(0.0, self.cooldown_until - now), 1),
+            "consecutive_failures": self.consecutive_failures,
+            "total_calls": self.total_calls,
+            "total_failures": self.total_failures
+        }
+
+
+class KeyPool:
+    """
+    Thread-safe pool of Gemini API keys.
+
+    Every model call leases a key via `lease()`. The pool picks the healthy key
+    with the fewest in-flight calls (ties broken by tokens used in the last
+    minute), skips keys in cooldown or over their TPM budget, and caps total
+    concurrent calls with a global semaphore.
+    """
+
+    def __init__(self, keys: List[str], max_concurrency: int = GEMINI_MAX_CONCURRENCY,
+                 tpm_limit: int = GEMINI_TPM_LIMIT):
+        self.keys = [KeyState(i, k) for i, k in enumerate(k for k in keys if k)]
+        self.tpm_limit = tpm_limit
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._semaphore = threading.BoundedSemaphore(max(1, max_concurrency))
+
+        if not self.keys:
+            logger.warning("No API keys available!")
+        else:
+            logger.info("%s key(s), max concurrency %s, TPM limit %s/key", len(self.keys), max_concurrency, tpm_limit)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _pick(self, estimated_tokens: int, now: float) -> Optional[KeyState]:
+        """Least-loaded healthy key, or None if every key is cooling / saturated."""
+        candidates = [
+            k for k in self.keys
+            if not k.is_cooling(now) and k.tokens_last_minute(now) + estimated_tokens <= self.tpm_limit
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda k: (k.in_flight, k.tokens_last_minute(now), k.consecutive_failures))
+
+    def _next_ready_in(self, now: float) -> float:
+        """Seconds until some key leaves cooldown or frees TPM budget."""
+        waits = []
+        for k in self.keys:
+            if k.is_cooling(now):
+                waits.append(k.cooldown_until - now)
+            elif k.token_window:
+                waits.append(TPM_WINDOW_SECONDS - (now - k.token_window[0][0]))
+        return max(0.05, min(waits)) if waits else 0.05
+
+    def acquire(self, estimated_tokens: int = 0, timeout: float = GEMINI_ACQUIRE_TIMEOUT) -> Optional[KeyState]:
+        """
+        Reserve a concurrency slot and a key.
+
+        Blocks until a slot and a healthy key are available or `timeout`
+        elapses. Returns None on timeout or when the pool is empty.
+        """
+        if not self.keys:
+            return None
+
+        deadline = time.monotonic() + timeout
+        if not self._semaphore.acquire(timeout=timeout):
+            logger.warning("Concurrency limit reached, acquire timed out")
+            return None
+
+        with self._available:
+            while True:
+                now = time.monotonic()
+                state = self._pick(estimated_tokens, now)
+                if state:
+                    state.in_flight += 1
+                    state.total_calls += 1
+                    return state
+
+                remaining = deadline - now
+                if remaining <= 0:
+                    self._semaphore.release()
+                    logger.warning("All keys cooling or over TPM budget, acquire timed out")
+                    return None
+                self._available.wait(min(remaining, self._next_ready_in(now)))
+
+    def release(self, state: KeyState, tokens_used: int = 0, success: bool = True,
+                rate_limited: bool = False, retry_after: float = None):
+        """Return a key to the pool and record the outcome of the call."""
+        with self._available:
+            now = time.monotonic()
+            state.in_flight = max(0, state.in_flight - 1)
+            if tokens_used:
+                state.token_window.append((now, tokens_used))
+
+            if success:
+                state.consecutive_failures = 0
+            else:
+                state.consecutive_failures += 1
+                state.total_failures += 1
+                if rate_limited:
+                    cooldown = retry_after or min(
+                        GEMINI_COOLDOWN_SECONDS * (2 ** (state.consecutive_failures - 1)),
+                        GEMINI_MAX_COOLDOWN_SECONDS
+                    )
+                    state.cooldown_until = now + cooldown
+                    logger.warning("Key #%s rate limited, cooling down for %.0fs", state.index + 1, cooldown)
+
+            self._available.notify_all()
+        self._semaphore.release()
+
+    @contextmanager
+    def lease(self, estimated_tokens: int = 0, timeout: float = GEMINI_ACQUIRE_TIMEOUT):
+        """
+        Context manager around acquire/release.
+
+        Yields a `KeyState` (or None if no key could be leased). The caller
+        reports the outcome by setting attributes on the yielded lease record:
+        `tokens_used`, `error`.
+        """
+        state = self.acquire(estimated_tokens, timeout)
+        record = _Lease(state)
+        try:
+            yield record
+        except Exception as e:
+            record.error = e
+            raise
+        finally:
+            if state:
+                error = record.error
+                self.release(
+                    state,
+                    tokens_used=record.tokens_used,
+                    success=error is None,
+                    rate_limited=error is not None and is_rate_limit_error(error)
+                )
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            now = time.monotonic()
+            return [k.snapshot(now) for k in self.keys]
+
+
+class _Lease:
+    """Mutable record handed to callers of `KeyPool.lease()`."""
+
+    def __init__(self, state: Optional[KeyState]):
+        self.state = state
+        self.key = state.key if state else None
+        self.tokens_used = 0
+        self.error = None
+
+
+def backoff_delay(attempt: int, base: float = GEMINI_BACKOFF_BASE, cap: float = GEMINI_BACKOFF_MAX) -> float:
+    """Exponential backoff with full jitter: uniform(0, min(cap, base * 2^attempt))."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def response_token_count(response) -> int:
+    """Total tokens billed for a generate_content response (0 if unknown)."""
+    usage = getattr(response, 'usage_metadata', None)
+    return int(getattr(usage, 'total_token_count', 0) or 0) if usage else 0
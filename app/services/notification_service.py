@@ -3,11 +3,14 @@ Notification Service for DietNotify
 Handles scheduling and sending meal reminder notifications
 Uses APScheduler for background job scheduling
 """
+import logging
 import os
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 import pytz
 
+logger = logging.getLogger(__name__)
+
 # APScheduler for background jobs
 try:
     from apscheduler.schedulers.background import BackgroundScheduler
@@ -15,13 +18,13 @@ try:
     from apscheduler.triggers.date import DateTrigger
     SCHEDULER_AVAILABLE = True
 except ImportError:
-    print("[Notifications] APScheduler not installed. Run: pip install apscheduler")
+    logger.warning("APScheduler not installed. Run: pip install apscheduler")
     SCHEDULER_AVAILABLE = False
     BackgroundScheduler = None
 
 from app.core.firebase_config import send_push_notification, send_bulk_notifications, init_firebase
-from app.core.notification_db import get_all_enabled_preferences, get_user_tokens
-from app.core.database import get_active_plan
+from app.core.notification_db import iter_enabled_preferences, get_user_tokens
+from app.core.database import get_active_plan_summary
 
 
 class NotificationScheduler:
@@ -37,57 +40,50 @@ class NotificationScheduler:
         if SCHEDULER_AVAILABLE:
             self.scheduler = BackgroundScheduler(timezone=self.timezone)
         else:
-            print("[Notifications] Scheduler unavailable - notifications disabled")
+            logger.warning("Scheduler unavailable - notifications disabled")
     
     def start(self):
         """Start the background scheduler."""
         if self.scheduler and not self._initialized:
             self.scheduler.start()
             self._initialized = True
-            self._log("Scheduler started!")
+            logger.info("Scheduler started!")
             return True
         return False
     
-    def _log(self, message: str):
-        """Log message to console and file."""
-        msg = f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [Notifications] {message}"
-        print(msg)
-        try:
-            with open("notification_debug.log", "a", encoding="utf-8") as f:
-                f.write(msg + "\n")
-        except:
-            pass
-
     def restore_jobs(self):
         """Restore scheduled jobs from database on startup."""
         try:
-            print("[Notifications] Restoring scheduled jobs...")
+            logger.info("Restoring scheduled jobs...")
             
             # Clear existing jobs to ensure clean slate (User request)
             if self.scheduler:
                 self.scheduler.remove_all_jobs()
-                print("[Notifications] Cleared previous jobs")
+                logger.info("Cleared previous jobs")
             
-            preferences_list = get_all_enabled_preferences()
+            # Paged, projected scan - only the fields scheduling needs
+            preferences = iter_enabled_preferences(columns="user_id,lead_time_minutes,custom_timings")
             
             restored_count = 0
-            for pref in preferences_list:
+            user_count = 0
+            for pref in preferences:
+                user_count += 1
                 user_id = pref.get('user_id')
                 if not user_id:
                     continue
                 
                 # Get active plan
-                active_plan = get_active_plan(user_id)
+                active_plan = get_active_plan_summary(user_id)
                 if not active_plan:
                     continue
                 
                 # Get tokens
-                tokens = get_user_tokens(user_id)
+                tokens = get_user_tokens(user_id, columns="fcm_token")
                 if not tokens:
                     continue
                 
                 token_list = [t['fcm_token'] for t in tokens]
-                active_plan_data = active_plan.get('plan_data', {})
+                active_plan_data = active_plan.get('plan_summary', {})
                 lead_time = pref.get('lead_time_minutes', 5)
                 custom_timings = pref.get('custom_timings', {})
                 
@@ -100,20 +96,23 @@ class NotificationScheduler:
                 )
                 restored_count += len(job_ids)
             
-            self._log(f"Restored {restored_count} notifications for {len(preferences_list)} users")
+            logger.info("Restored %s notifications for %s users", restored_count, user_count)
             return restored_count
             
         except Exception as e:
-            print(f"[Notifications] Restoration error: {e}")
-            self._log(f"Restoration failed: {e}")
+            logger.error("Restoration error: %s", e)
             return 0
     
+    @property
+    def running(self) -> bool:
+        return self._initialized
+
     def stop(self):
         """Stop the scheduler gracefully."""
         if self.scheduler and self._initialized:
             self.scheduler.shutdown(wait=False)
             self._initialized = False
-            print("[Notifications] Scheduler stopped")
+            logger.info("Scheduler stopped")
     
     def schedule_meal_reminder(
         self,
@@ -155,7 +154,7 @@ class NotificationScheduler:
                     continue
             
             if not parsed_time:
-                print(f"[Notifications] Could not parse time: {meal_time}")
+                logger.warning("Could not parse time: %s", meal_time)
                 return None
             
             # Calculate notification time (meal time - lead time)
@@ -184,7 +183,7 @@ class NotificationScheduler:
             
             # Schedule daily notification
             def send_notification():
-                print(f"[Notifications] Sending reminder for {meal_name} to {len(tokens)} devices")
+                logger.info("Sending reminder for %s to %s devices", meal_name, len(tokens))
                 for token in tokens:
                     send_push_notification(
                         token=token,
@@ -215,7 +214,7 @@ class NotificationScheduler:
                 misfire_grace_time=3600  # Fire if missed within last hour (e.g. server restart)
             )
             
-            self._log(f"Scheduled '{meal_name}' for user {user_id} at {notify_hour:02d}:{notify_minute:02d} (lead time: {lead_time_minutes}min)")
+            logger.info("Scheduled '%s' for user %s at %02d:%02d (lead time: %smin)", meal_name, user_id, notify_hour, notify_minute, lead_time_minutes)
             
             # CATCH-UP LOGIC: Check if we just missed this today and fire immediately
             now = datetime.now(self.timezone)
@@ -225,17 +224,17 @@ class NotificationScheduler:
             # If target was in the last hour, fire immediately
             time_diff = (now - today_target).total_seconds()
             if 0 <= time_diff < 3600:
-                print(f"[Notifications] Catch-up: Missed schedule for '{meal_name}' by {int(time_diff/60)} mins. Sending now.")
+                logger.info("Catch-up: Missed schedule for '%s' by %s mins. Sending now.", meal_name, int(time_diff/60))
                 # Run purely inside a try-catch to avoid blocking startup
                 try:
                     send_notification()
                 except Exception as e:
-                    print(f"[Notifications] Catch-up error: {e}")
+                    logger.error("Catch-up error: %s", e)
             
             return job_id
             
         except Exception as e:
-            print(f"[Notifications] Scheduling error: {e}")
+            logger.error("Scheduling error: %s", e)
             return None
     
     def schedule_from_diet_plan(
@@ -267,10 +266,10 @@ class NotificationScheduler:
         meals = diet_protocol.get('meals', [])
         
         if not meals:
-            print(f"[Notifications] No meals found in diet plan for user {user_id}")
+            logger.info("No meals found in diet plan for user %s", user_id)
             return job_ids
         
-        print(f"[Notifications] Scheduling {len(meals)} meal reminders for user {user_id}")
+        logger.info("Scheduling %s meal reminders for user %s", len(meals), user_id)
         
         for meal in meals:
             meal_name = meal.get('name', 'Meal')
@@ -311,7 +310,7 @@ class NotificationScheduler:
                 self.scheduler.remove_job(job.id)
                 cancelled += 1
         
-        print(f"[Notifications] Cancelled {cancelled} notifications for user {user_id}")
+        logger.info("Cancelled %s notifications for user %s", cancelled, user_id)
         return cancelled
     
     def get_user_jobs(self, user_id: str) -> List[Dict]:
@@ -359,7 +358,8 @@ def init_notifications():
     
     # Initialize Scheduler
     scheduler = get_scheduler()
-    scheduler_ok = scheduler.start()
+    scheduler.start()
+    scheduler_ok = scheduler.running   # also True when re-run after the database came up
     
     # Restore jobs from DB
     restored_count = 0
@@ -123,6 +123,28 @@ async function handleSearch(query, container, type) {
     }
 }
 
+async function fetchFoodDetail(item) {
+    // Sharded client export first (one cached shard fetch), then the API
+    if (window.NutritionIndex) {
+        try {
+            const row = await NutritionIndex.getFoodByName(item.food);
+            if (row) return row;
+        } catch (e) {
+            console.warn("Nutrition index unavailable, using API", e);
+        }
+    }
+    try {
+        const res = await fetch(`${API_BASE}/food/${encodeURIComponent(item.food)}`);
+        if (res.ok) {
+            const detail = await res.json();
+            return detail.raw_data || item;
+        }
+    } catch (e) {
+        console.error("Food detail failed", e);
+    }
+    return item;
+}
+
 function renderResults(items, container, type) {
     container.innerHTML = '';
 
@@ -140,14 +162,16 @@ function renderResults(items, container, type) {
             <span class="macros">${Math.round(item['Caloric Value'] || 0)} cal</span>
         `;
 
-        div.addEventListener('click', (e) => {
+        div.addEventListener('click', async (e) => {
             e.stopPropagation(); // Prevent closing immediately
+            // Search rows are a slim projection; load every nutrient for the chosen food
+            const full = await fetchFoodDetail(item);
             if (type === 'view') {
-                displaySingleItemDetail(item);
+                displaySingleItemDetail(full);
                 mainSearchInput.value = item.food;
                 container.style.display = 'none';
             } else {
-                addToMeal(item);
+                addToMeal(full);
                 mealSearchInput.value = '';
                 container.style.display = 'none';
             }
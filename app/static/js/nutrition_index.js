@@ -0,0 +1,76 @@
+/**
+ * DietNotify Nutrition Index (client side)
+ * Reads the sharded export in /static/data/nutrition:
+ *   index.json      -> sorted names, column list, shard list (loaded once)
+ *   shard-NNN.json  -> columnar nutrient arrays (fetched on demand, cached)
+ * Prefix search runs locally on the name index; details need one shard fetch.
+ * nutrition_engine.js reads full food rows from here (falling back to /api/food).
+ */
+
+const NutritionIndex = (() => {
+    const BASE = '/static/data/nutrition';
+    let index = null;
+    let lowerNames = [];      // same order as index.names (sorted at export)
+    const shardCache = {};
+
+    async function load() {
+        if (index) return index;
+        const res = await fetch(`${BASE}/index.json`);
+        index = await res.json();
+        lowerNames = index.names.map(n => n.toLowerCase());
+        return index;
+    }
+
+    // First position whose lower-cased name is >= prefix
+    function lowerBound(prefix) {
+        let lo = 0, hi = lowerNames.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (lowerNames[mid] < prefix) lo = mid + 1; else hi = mid;
+        }
+        return lo;
+    }
+
+    async function prefixSearch(query, limit = 20) {
+        await load();
+        const prefix = (query || '').trim().toLowerCase();
+        if (!prefix) return [];
+        const results = [];
+        for (let i = lowerBound(prefix); i < lowerNames.length && results.length < limit; i++) {
+            if (!lowerNames[i].startsWith(prefix)) break;
+            results.push({ id: i, food: index.names[i] });
+        }
+        return results;
+    }
+
+    async function loadShard(n) {
+        if (!shardCache[n]) {
+            shardCache[n] = fetch(`${BASE}/${index.shards[n]}`).then(res => res.json());
+        }
+        return shardCache[n];
+    }
+
+    // Full row for an id returned by prefixSearch
+    async function getFood(id) {
+        await load();
+        const shard = await loadShard(Math.floor(id / index.shard_size));
+        const offset = id % index.shard_size;
+        const row = { food: index.names[id] };
+        index.columns.forEach(col => { row[col] = shard.values[col][offset]; });
+        return row;
+    }
+
+    // Full row for an exact food name (as returned by /api/search), or null
+    async function getFoodByName(name) {
+        await load();
+        const lower = (name || '').toLowerCase();
+        for (let i = lowerBound(lower); i < lowerNames.length && lowerNames[i] === lower; i++) {
+            if (index.names[i] === name) return getFood(i);
+        }
+        return null;
+    }
+
+    return { load, prefixSearch, getFood, getFoodByName };
+})();
+
+window.NutritionIndex = NutritionIndex;
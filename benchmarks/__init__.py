@@ -0,0 +1,3 @@
+"""
+Performance benchmarks for DietNotify (not shipped with the app)
+"""
@@ -0,0 +1,407 @@
+"""
+Notification Scheduler Simulator for DietNotify
+Synthesizes N users (plans, preferences, FCM tokens) and drives the real NotificationScheduler
+on a real APScheduler whose clock runs `--speed` times faster than wall time. Measures scheduling
+throughput, memory per job, fire-time lag, send throughput against a stubbed FCM, restore_jobs
+and cancel_user_notifications. Results are written as JSON.
+
+Run with:  python -m benchmarks.bench_notifications --users 10000 [--speed 3600] [--fcm-latency-ms 50]
+"""
+import os
+import gc
+import sys
+import json
+import time
+import atexit
+import shutil
+import random
+import argparse
+import tempfile
+import threading
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional
+
+os.environ.setdefault('STORAGE_BACKEND', 'sqlite')
+# Fresh database per run, so restore only sees the users seeded by this run
+BENCH_DB_DIR = tempfile.mkdtemp(prefix='dietnotify-bench-notify-')
+atexit.register(shutil.rmtree, BENCH_DB_DIR, ignore_errors=True)
+os.environ['SQLITE_PATH'] = os.path.join(BENCH_DB_DIR, 'bench.db')
+os.environ.setdefault('NOTIFICATION_LOG_FILE', '')
+
+import numpy as np
+
+from app.services import notification_service
+from app.services.notification_service import NotificationScheduler, SCHEDULER_AVAILABLE
+
+from .bench_nutrition import environment
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+SUITE = 'notifications'
+SUITE_VERSION = 1
+
+# Synthetic population: meal windows (local time) and how often users pick a round time,
+# which is what produces the per-minute bursts the dispatcher has to absorb
+MEAL_WINDOWS = [
+    ("Breakfast", 6, 9), ("Mid-Morning Snack", 10, 11), ("Lunch", 12, 14),
+    ("Evening Snack", 16, 18), ("Dinner", 19, 22),
+]
+ROUND_TIME_SHARE = 0.6
+LEAD_TIMES = (5, 10, 15)
+CUSTOM_TIMING_SHARE = 0.1
+
+
+# ============== ACCELERATED CLOCK ==============
+
+class SimClock:
+    """Virtual time = start + elapsed wall time x speed; paused while the harness sets up."""
+
+    def __init__(self, start: datetime, speed: float):
+        self.start = start
+        self.speed = speed
+        self._origin = None
+
+    def resume(self):
+        self._origin = time.perf_counter()
+
+    def pause(self):
+        self.start = self.now()
+        self._origin = None
+
+    def now(self) -> datetime:
+        if self._origin is None:
+            return self.start
+        return self.start + timedelta(seconds=(time.perf_counter() - self._origin) * self.speed)
+
+
+class SimDatetime(datetime):
+    """`datetime` whose now() reads the simulator clock (patched into the scheduler modules)."""
+    clock: SimClock = None
+
+    @classmethod
+    def now(cls, tz=None):
+        current = cls.clock.now()
+        return current.astimezone(tz) if tz else current.astimezone().replace(tzinfo=None)
+
+
+def install_clock(clock: SimClock):
+    """Point APScheduler and the notification service at the simulator clock; returns an undo function."""
+    import apscheduler.schedulers.base as scheduler_base
+    import apscheduler.executors.base as executor_base
+
+    SimDatetime.clock = clock
+    modules = (scheduler_base, executor_base, notification_service)
+    originals = [m.datetime for m in modules]
+    for module in modules:
+        module.datetime = SimDatetime
+
+    def undo():
+        for module, original in zip(modules, originals):
+            module.datetime = original
+    return undo
+
+
+def accelerated_scheduler(clock: SimClock, tz, threads: int):
+    """BackgroundScheduler whose sleeps between wake-ups are divided by the clock speed."""
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from apscheduler.executors.pool import ThreadPoolExecutor
+
+    class AcceleratedScheduler(BackgroundScheduler):
+        def _process_jobs(self):
+            wait_seconds = super()._process_jobs()
+            return None if wait_seconds is None else wait_seconds / clock.speed
+
+    return AcceleratedScheduler(timezone=tz, executors={'default': ThreadPoolExecutor(threads)})
+
+
+def make_scheduler(clock: SimClock, threads: int) -> NotificationScheduler:
+    service = NotificationScheduler()
+    service.scheduler = accelerated_scheduler(clock, service.timezone, threads)
+    service.start()
+    return service
+
+
+# ============== SYNTHETIC USERS ==============
+
+def synthesize_users(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    users = []
+    for n in range(count):
+        meals = []
+        for name, first_hour, last_hour in MEAL_WINDOWS:
+            hour = rng.randint(first_hour, last_hour)
+            minute = rng.choice((0, 30)) if rng.random() < ROUND_TIME_SHARE else rng.randrange(60)
+            meals.append({"name": name, "time": f"{hour:02d}:{minute:02d}",
+                          "bullets": ["Paneer bhurji", "Multigrain roti", "Curd"]})
+        custom = {}
+        if rng.random() < CUSTOM_TIMING_SHARE:
+            custom[meals[0]['name']] = f"{rng.randint(6, 9):02d}:{rng.choice((0, 15, 45)):02d}"
+        users.append({
+            "user_id": f"sim{n:07d}",
+            "plan": {"diet_protocol": {"meals": meals}},
+            "tokens": [f"fcm-sim{n:07d}-{d}" for d in range(rng.choice((1, 1, 1, 2, 3)))],
+            "lead_time_minutes": rng.choice(LEAD_TIMES),
+            "custom_timings": custom,
+        })
+    return users
+
+
+def reminder_job_id(data: Dict[str, Any]) -> str:
+    """Job id of the reminder that sent `data` (same format as NotificationScheduler)."""
+    meal_time = data.get('meal_time', '')
+    return f"meal_{data.get('user_id')}_{data.get('meal_name', '').replace(' ', '_')}_{meal_time.replace(':', '').replace(' ', '')}"
+
+
+# ============== STUBBED FCM ==============
+
+class FakeFCM:
+    """
+    Replaces send_push_notification. `latency` is virtual seconds per send, so it is
+    compressed by the clock speed like every other duration in the simulation.
+    """
+
+    def __init__(self, clock: SimClock, latency: float):
+        self.clock = clock
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.sends = []     # (wall seconds, virtual datetime, job id)
+
+    def __call__(self, token: str, title: str, body: str, data: dict = None) -> bool:
+        virtual, wall = self.clock.now(), time.perf_counter()
+        if self.latency:
+            time.sleep(self.latency / self.clock.speed)
+        with self.lock:
+            self.sends.append((wall, virtual, reminder_job_id(data or {})))
+        return True
+
+
+def _stats(values: List[float], unit: str) -> Dict[str, Any]:
+    if not values:
+        return {"count": 0, "unit": unit}
+    arr = np.asarray(values, dtype=float)
+    return {
+        "count": int(arr.size), "unit": unit,
+        "mean": float(arr.mean()), "p50": float(np.percentile(arr, 50)),
+        "p90": float(np.percentile(arr, 90)), "p99": float(np.percentile(arr, 99)), "max": float(arr.max()),
+    }
+
+
+# ============== PHASES ==============
+
+def schedule_users(service: NotificationScheduler, users: List[Dict[str, Any]]) -> Dict[str, Any]:
+    per_user = []
+    jobs = 0
+    started = time.perf_counter()
+    for user in users:
+        t0 = time.perf_counter()
+        jobs += len(service.schedule_from_diet_plan(
+            user_id=user['user_id'], diet_plan=user['plan'], tokens=user['tokens'],
+            lead_time_minutes=user['lead_time_minutes'], custom_timings=user['custom_timings']
+        ))
+        per_user.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+    return {
+        "users": len(users), "jobs": jobs, "elapsed_s": elapsed,
+        "jobs_per_s": jobs / elapsed if elapsed else 0.0,
+        "per_user_ms": _stats([t * 1000 for t in per_user], 'ms'),
+    }
+
+
+def measure_memory(clock: SimClock, users: List[Dict[str, Any]], threads: int) -> Dict[str, Any]:
+    """Traced allocation growth of the job store per scheduled job."""
+    service = make_scheduler(clock, threads)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = schedule_users(service, users)
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    grown = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    service.scheduler.shutdown(wait=False)
+    return {"users": len(users), "jobs": result['jobs'], "bytes": grown,
+            "bytes_per_job": grown / result['jobs'] if result['jobs'] else 0.0}
+
+
+def run_fire_window(service: NotificationScheduler, clock: SimClock, fcm: FakeFCM, hours: float) -> Dict[str, Any]:
+    window_start = clock.now()
+    window_end = window_start + timedelta(hours=hours)
+    # Expected fire times come from the triggers themselves, whatever timezone they resolved to
+    expected = {job.id: job.next_run_time for job in service.scheduler.get_jobs()
+                if job.next_run_time and job.next_run_time < window_end}
+
+    missed = []
+    from apscheduler.events import EVENT_JOB_MISSED
+    service.scheduler.add_listener(lambda event: missed.append(event.job_id), EVENT_JOB_MISSED)
+
+    real_seconds = hours * 3600 / clock.speed
+    clock.resume()
+    service.scheduler.wakeup()
+    time.sleep(real_seconds)
+    # Stop dispatching and let in-flight sends drain before reading the results
+    drain_started = time.perf_counter()
+    service.scheduler.pause()
+    service.scheduler._lookup_executor('default')._pool.shutdown(wait=True)
+    drain = time.perf_counter() - drain_started
+    clock.pause()
+
+    first_send = {}
+    for wall, virtual, job_id in fcm.sends:
+        if job_id not in first_send or virtual < first_send[job_id]:
+            first_send[job_id] = virtual
+    lags = [(first_send[job_id] - due).total_seconds() for job_id, due in expected.items() if job_id in first_send]
+
+    walls = np.sort(np.asarray([s[0] for s in fcm.sends], dtype=float))
+    span = float(walls[-1] - walls[0]) if walls.size > 1 else 0.0
+    per_second = np.bincount((walls - walls[0]).astype(int)) if walls.size else np.zeros(0, dtype=int)
+    return {
+        "virtual_hours": hours,
+        "wall_seconds": real_seconds,
+        "drain_seconds": drain,
+        "jobs_due": len(expected),
+        "jobs_fired": len(lags),
+        "jobs_missed": len(missed),
+        "sends": int(walls.size),
+        # Wall-clock rate the dispatcher sustained while sends were flowing
+        "sends_per_s": walls.size / span if span else 0.0,
+        "peak_sends_per_s": int(per_second.max()) if per_second.size else 0,
+        # Delay from scheduled fire time to the first send, in virtual seconds and wall milliseconds
+        "fire_lag_virtual_s": _stats(lags, 's'),
+        "fire_lag_wall_ms": _stats([lag / clock.speed * 1000 for lag in lags], 'ms'),
+    }
+
+
+def run_cancel(service: NotificationScheduler, users: List[Dict[str, Any]], sample: int) -> Dict[str, Any]:
+    chosen = random.Random(11).sample(users, min(sample, len(users)))
+    jobs_before = len(service.scheduler.get_jobs())
+    times, cancelled = [], 0
+    for user in chosen:
+        t0 = time.perf_counter()
+        cancelled += service.cancel_user_notifications(user['user_id'])
+        times.append(time.perf_counter() - t0)
+    return {"users": len(chosen), "jobs_in_store": jobs_before, "cancelled": cancelled,
+            "per_user_ms": _stats([t * 1000 for t in times], 'ms')}
+
+
+def seed_storage(users: List[Dict[str, Any]]):
+    """Write preferences, tokens and active plan summaries the way the app stores them."""
+    from app.core.storage import storage
+
+    now = datetime.now(timezone.utc).isoformat()
+    for start in range(0, len(users), 1000):
+        chunk = users[start:start + 1000]
+        storage.post("notification_preferences", [{
+            "user_id": u['user_id'], "enabled": True,
+            "lead_time_minutes": u['lead_time_minutes'], "custom_timings": u['custom_timings']
+        } for u in chunk], params={"on_conflict": "user_id"})
+        storage.post("notification_tokens", [
+            {"user_id": u['user_id'], "fcm_token": token, "device_info": {}} for u in chunk for token in u['tokens']
+        ], params={"on_conflict": "fcm_token"})
+        storage.post("diet_plans", [{
+            "user_id": u['user_id'], "duration_type": "weekly", "is_active": True,
+            "created_at": now, "plan_summary": u['plan']
+        } for u in chunk])
+
+
+def run_restore(clock: SimClock, users: List[Dict[str, Any]], threads: int) -> Dict[str, Any]:
+    seed_started = time.perf_counter()
+    seed_storage(users)
+    seeded = time.perf_counter() - seed_started
+
+    service = make_scheduler(clock, threads)
+    started = time.perf_counter()
+    restored = service.restore_jobs()
+    elapsed = time.perf_counter() - started
+    service.scheduler.shutdown(wait=False)
+    return {"users": len(users), "jobs": restored, "elapsed_s": elapsed, "seed_s": seeded,
+            "users_per_s": len(users) / elapsed if elapsed else 0.0}
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=10000, help='synthetic users (5 reminders each)')
+    parser.add_argument('--speed', type=float, default=3600.0, help='virtual seconds per wall second')
+    parser.add_argument('--hours', type=float, default=24.0, help='virtual hours to run the fire window')
+    parser.add_argument('--threads', type=int, default=10, help='APScheduler executor threads (app default 10)')
+    parser.add_argument('--fcm-latency-ms', type=float, default=50.0, help='stubbed FCM latency per send (virtual time)')
+    parser.add_argument('--memory-users', type=int, default=2000, help='users for the traced memory phase')
+    parser.add_argument('--restore-users', type=int, default=5000, help='users seeded for restore_jobs (0 = skip)')
+    parser.add_argument('--cancel-users', type=int, default=200, help='users cancelled one by one')
+    parser.add_argument('--log-level', default='WARNING', help='level for app loggers during the run')
+    parser.add_argument('--output', help='results file (default benchmarks/results/notifications-<commit>.json)')
+    args = parser.parse_args(argv)
+
+    if not SCHEDULER_AVAILABLE:
+        print("APScheduler is not installed (pip install -r requirements.txt)")
+        return 2
+
+    import logging
+    logging.getLogger('app').setLevel(args.log_level.upper())
+    # Misfires are counted from scheduler events; one warning per job would swamp the output
+    logging.getLogger('apscheduler').setLevel(logging.ERROR)
+
+    tz = NotificationScheduler().timezone
+    local_midnight = tz.localize(datetime.now(tz).replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None))
+    clock = SimClock(local_midnight.astimezone(timezone.utc), args.speed)
+    undo = install_clock(clock)
+    fcm = FakeFCM(clock, args.fcm_latency_ms / 1000)
+    original_send = notification_service.send_push_notification
+    notification_service.send_push_notification = fcm
+
+    results = {}
+    try:
+        users = synthesize_users(args.users)
+        print(f"Synthesized {len(users)} users")
+
+        if args.memory_users:
+            results['memory'] = measure_memory(clock, users[:args.memory_users], args.threads)
+            print(f"  memory: {results['memory']['bytes_per_job']:.0f} B/job over {results['memory']['jobs']} jobs")
+
+        service = make_scheduler(clock, args.threads)
+        results['schedule'] = schedule_users(service, users)
+        s = results['schedule']
+        print(f"  schedule: {s['jobs']} jobs in {s['elapsed_s']:.2f}s ({s['jobs_per_s']:.0f} jobs/s, "
+              f"p99 {s['per_user_ms']['p99']:.2f} ms/user)")
+
+        results['fire'] = run_fire_window(service, clock, fcm, args.hours)
+        f = results['fire']
+        print(f"  fire: {f['jobs_fired']}/{f['jobs_due']} jobs, {f['jobs_missed']} missed, "
+              f"{f['sends_per_s']:.0f} sends/s (peak {f['peak_sends_per_s']}), "
+              f"lag p50 {f['fire_lag_virtual_s'].get('p50', 0):.1f}s / p99 {f['fire_lag_virtual_s'].get('p99', 0):.1f}s virtual")
+
+        results['cancel'] = run_cancel(service, users, args.cancel_users)
+        print(f"  cancel: p50 {results['cancel']['per_user_ms'].get('p50', 0):.2f} ms/user "
+              f"with {results['cancel']['jobs_in_store']} jobs in store")
+        service.scheduler.shutdown(wait=False)
+        del service
+        gc.collect()
+
+        if args.restore_users:
+            results['restore'] = run_restore(clock, users[:args.restore_users], args.threads)
+            r = results['restore']
+            print(f"  restore: {r['jobs']} jobs for {r['users']} users in {r['elapsed_s']:.2f}s "
+                  f"({r['users_per_s']:.0f} users/s)")
+    finally:
+        notification_service.send_push_notification = original_send
+        undo()
+
+    env = environment()
+    report = {
+        "suite": SUITE,
+        "suite_version": SUITE_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "env": env,
+        "config": {k: v for k, v in vars(args).items() if k != 'output'},
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{SUITE}-{env['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1, default=str)
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
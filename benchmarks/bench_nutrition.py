@@ -0,0 +1,289 @@
+"""
+Nutrition Hot-Path Benchmarks for DietNotify
+Times knowledge-base loading and search, the /api/food lookup, meal totals and health scoring
+on the real dataset and on synthetic 10x / 100x copies of it. Results are written as JSON,
+and --compare fails the run when a median regresses past the threshold.
+
+Run with:  python -m benchmarks.bench_nutrition [--scales 1,10,100] [--output FILE] [--compare BASELINE]
+"""
+import os
+import gc
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from typing import Callable, Dict, Any, List, Optional
+
+# Keep app start-up local and quiet: no Supabase probe, warm-up inline
+os.environ.setdefault('STORAGE_BACKEND', 'sqlite')
+os.environ.setdefault('SQLITE_PATH', os.path.join(tempfile.gettempdir(), 'dietnotify-bench.db'))
+os.environ.setdefault('LIFECYCLE_SYNC', '1')
+
+import numpy as np
+import pandas as pd
+
+from app.core.data_loader import DataLoader
+from app.core.nutrition_engine import calculate_meal_totals, classify_food_health_score
+
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+SUITE = 'nutrition'
+SUITE_VERSION = 1   # bump when a benchmark's workload changes (old baselines stop matching)
+
+DEFAULT_SCALES = (1, 10, 100)
+DEFAULT_REPEAT = 7
+DEFAULT_BUDGET = 20.0            # seconds per benchmark before it stops repeating (min 1 run)
+DEFAULT_THRESHOLD = 0.20         # --compare: median slowdown that counts as a regression
+HEALTH_SCORE_CHUNK = 10000       # rows converted to dicts at a time (bounds memory at 100x)
+
+# The three CSV groups DataLoader.load_all_data reads, relative to the base dir
+DATASET_FILES = [
+    os.path.join('data', 'nutrition_db', 'DeitNotify', 'nutrition prediction', 'dataset', 'combined_food_data.csv'),
+    os.path.join('data', 'nutrition_db', 'FINAL FOOD DATASET', 'FOOD-DATA-GROUP*.csv'),
+    os.path.join('data', 'nutrition_db', 'indian_foods.csv'),
+]
+
+# Search mix modelled on the search box: typed prefixes, mid-word substrings, typos (fuzzy fallback), misses
+QUERY_MIX = {
+    "prefix": ['a', 'ch', 'ric', 'pan', 'dal', 'to', 'mil', 'b'],
+    "substring": ['paneer', 'milk', 'rice', 'masala', 'juice', 'bread', 'sauce', 'oil'],
+    "typo": ['panner', 'chapatti', 'broccolli', 'spinnach', 'tomatoe', 'panner butter masla'],
+    "miss": ['zzq', 'xylophone', 'qwertyu', 'blorf'],
+}
+MEAL_SIZES = (1, 10, 100)
+FOOD_LOOKUPS = 20
+
+
+# ============== SYNTHETIC DATASETS ==============
+
+def build_scaled_dataset(scale: int, target_dir: str, source_dir: str = BASE_DIR) -> str:
+    """
+    Mirror the dataset layout under target_dir with every CSV repeated `scale`
+    times. Copies get a ' #n' name suffix so the loader's name de-duplication
+    keeps them, giving a knowledge base ~scale times the real one.
+    """
+    import glob
+
+    for pattern in DATASET_FILES:
+        for path in glob.glob(os.path.join(source_dir, pattern)):
+            out_path = os.path.join(target_dir, os.path.relpath(path, source_dir))
+            os.makedirs(os.path.dirname(out_path), exist_ok=True)
+            if scale == 1:
+                shutil.copyfile(path, out_path)
+                continue
+            df = pd.read_csv(path, encoding='utf-8')
+            name_col = next((c for c in df.columns if c.strip() == 'food'), None)
+            copies = []
+            for n in range(scale):
+                copy = df.copy()
+                if n and name_col:
+                    copy[name_col] = copy[name_col].astype(str) + f" #{n}"
+                copies.append(copy)
+            pd.concat(copies, ignore_index=True).to_csv(out_path, index=False, encoding='utf-8')
+    return target_dir
+
+
+# ============== TIMING ==============
+
+def measure(fn: Callable[[], Any], repeat: int, budget: float, per_call: int = 1) -> Dict[str, Any]:
+    """
+    Run fn once to warm up, then up to `repeat` timed runs (stopping early once
+    `budget` seconds are spent). GC is disabled while timing, as in timeit.
+    Times are per call: each run is divided by `per_call`.
+    """
+    fn()
+    times = []
+    started = time.perf_counter()
+    gc_was_enabled = gc.isenabled()
+    try:
+        while len(times) < repeat:
+            gc.collect()
+            gc.disable()
+            t0 = time.perf_counter()
+            fn()
+            times.append((time.perf_counter() - t0) / per_call)
+            if gc_was_enabled:
+                gc.enable()
+            if time.perf_counter() - started > budget:
+                break
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    ordered = sorted(times)
+    return {
+        "runs": len(times),
+        "min": ordered[0],
+        "median": statistics.median(ordered),
+        "mean": statistics.fmean(ordered),
+        "stdev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "max": ordered[-1],
+        "unit": "s",
+    }
+
+
+# ============== BENCHMARKS ==============
+
+def _health_score_table(df: pd.DataFrame):
+    for start in range(0, len(df), HEALTH_SCORE_CHUNK):
+        for record in df.iloc[start:start + HEALTH_SCORE_CHUNK].to_dict(orient='records'):
+            classify_food_health_score(record)
+
+
+def _lookup_names(df: pd.DataFrame) -> List[str]:
+    """Deterministic spread of real names across the table, plus one miss."""
+    names = df['food'].astype(str)
+    picks = names.iloc[np.linspace(0, len(names) - 1, FOOD_LOOKUPS - 1, dtype=int)].tolist()
+    return picks + ['no such food zzq']
+
+
+def run_scale(scale: int, client, loader: DataLoader, repeat: int, budget: float) -> List[Dict[str, Any]]:
+    results = []
+
+    def record(name: str, stats: Dict[str, Any], **params):
+        entry = {"name": name, "scale": scale, "rows": len(loader.get_dataframe()), "params": params}
+        entry.update(stats)
+        results.append(entry)
+        print(f"  {name:<28} x{scale:<4} median {stats['median'] * 1000:10.3f} ms  "
+              f"(min {stats['min'] * 1000:.3f}, runs {stats['runs']})")
+
+    with tempfile.TemporaryDirectory(prefix=f'dietnotify-bench-x{scale}-') as tmp:
+        build_scaled_dataset(scale, tmp)
+        scaled = DataLoader(tmp)
+        record("load_all_data", measure(scaled.load_all_data, repeat, budget))
+
+    # Route code reads the shared app loader, so swap the scaled table in
+    loader.data = scaled.get_dataframe()
+    loader.fuzzy = scaled.fuzzy
+
+    for kind, queries in QUERY_MIX.items():
+        stats = measure(lambda: [loader.search(q, limit=50) for q in queries], repeat, budget, per_call=len(queries))
+        record(f"search/{kind}", stats, queries=len(queries), limit=50)
+
+    names = _lookup_names(loader.get_dataframe())
+    def lookups():
+        for name in names:
+            client.get(f"/api/food/{name}")
+    record("api_food", measure(lookups, repeat, budget, per_call=len(names)), lookups=len(names))
+
+    record("health_score/table", measure(lambda: _health_score_table(loader.get_dataframe()), repeat, budget))
+    return results
+
+
+def run_meal_totals(loader: DataLoader, repeat: int, budget: float) -> List[Dict[str, Any]]:
+    """calculate_meal_totals only sees the meal, not the table: measured once."""
+    results = []
+    records = loader.get_dataframe().head(max(MEAL_SIZES)).to_dict(orient='records')
+    for size in MEAL_SIZES:
+        items = (records * size)[:size]
+        stats = measure(lambda: calculate_meal_totals(items), repeat * 100, budget / 4, per_call=1)
+        results.append(dict({"name": f"meal_totals/{size}", "scale": None, "rows": None, "params": {"items": size}}, **stats))
+        print(f"  {'meal_totals/' + str(size):<28} {'':6} median {stats['median'] * 1000:10.3f} ms")
+    return results
+
+
+# ============== REPORTING ==============
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "commit": _git_commit(),
+    }
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Benchmarks whose median got slower than baseline by more than `threshold`."""
+    if baseline.get('suite_version') != SUITE_VERSION:
+        print(f"Baseline suite version {baseline.get('suite_version')} != {SUITE_VERSION}; skipping comparison")
+        return []
+    before = {(r['name'], r['scale']): r for r in baseline.get('results', [])}
+    regressions = []
+    for r in results:
+        old = before.get((r['name'], r['scale']))
+        if not old or not old['median']:
+            continue
+        change = r['median'] / old['median'] - 1
+        if change > threshold:
+            regressions.append(f"{r['name']} x{r['scale']}: {old['median'] * 1000:.3f} ms -> "
+                               f"{r['median'] * 1000:.3f} ms (+{change:.0%})")
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)),
+                        help='comma-separated dataset multipliers (default 1,10,100)')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='timed runs per benchmark')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help='max seconds per benchmark')
+    parser.add_argument('--output', help='results file (default benchmarks/results/nutrition-<commit>.json)')
+    parser.add_argument('--compare', help='baseline results file; exit 1 on regressions')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='median slowdown counted as a regression (default 0.20)')
+    args = parser.parse_args(argv)
+    scales = [int(s) for s in args.scales.split(',') if s.strip()]
+
+    from app import create_app
+    import app as app_module
+    import logging
+    logging.getLogger('app').setLevel(logging.WARNING)
+
+    flask_app = create_app()
+    client = flask_app.test_client()
+    loader = app_module.loader
+    real_data = loader.get_dataframe()
+
+    results = []
+    print(f"Meal totals ({len(real_data)} foods)")
+    results.extend(run_meal_totals(loader, args.repeat, args.budget))
+    for scale in scales:
+        print(f"Scale x{scale}")
+        results.extend(run_scale(scale, client, loader, args.repeat, args.budget))
+    loader.data = real_data
+
+    env = environment()
+    report = {
+        "suite": SUITE,
+        "suite_version": SUITE_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "env": env,
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{SUITE}-{env['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,4 @@
+"""
+Load-testing harness for DietNotify (not shipped with the app)
+Runs the real app under gunicorn against local stand-ins for Supabase, Gemini and FCM
+"""
@@ -0,0 +1,130 @@
+"""
+Fake PostgREST Server for DietNotify load tests
+Serves /rest/v1/<table> over HTTP on top of the SQLite storage backend, so the app runs
+its real SupabaseBackend code path (HTTP, headers, JSON) without touching Supabase.
+
+Run standalone with:  python -m loadtest.fake_postgrest --port 54321 [--latency-ms 20]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl
+
+from app.core.storage import SQLiteBackend
+
+
+REST_PREFIX = '/rest/v1/'
+
+
+class PostgRESTHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'   # keep-alive, like the real pooled requests.Session
+
+    def log_message(self, format, *args):
+        pass
+
+    def _dispatch(self, method: str):
+        url = urlsplit(self.path)
+        if not url.path.startswith(REST_PREFIX):
+            return self._send(404, {"message": f"Unknown path {url.path}"})
+        table = url.path[len(REST_PREFIX):].strip('/')
+        params = dict(parse_qsl(url.query, keep_blank_values=True))
+
+        body = None
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            try:
+                body = json.loads(self.rfile.read(length))
+            except ValueError:
+                return self._send(400, {"message": "Invalid JSON body"})
+
+        server = self.server
+        if server.latency:
+            time.sleep(max(0.0, random.gauss(server.latency, server.latency * server.jitter)))
+
+        backend = server.backend
+        if method == 'GET':
+            response = backend.get(table, params)
+        elif method == 'POST':
+            response = backend.post(table, body, params=params, prefer=self.headers.get('Prefer'))
+        elif method == 'PATCH':
+            response = backend.patch(table, params, body or {})
+        else:
+            response = backend.delete(table, params)
+
+        with server.stats_lock:
+            server.requests += 1
+
+        if response.status_code >= 400:
+            return self._send(response.status_code, {"message": response.text})
+        if 'return=minimal' in (self.headers.get('Prefer') or ''):
+            return self._send(response.status_code if method != 'GET' else 200, None)
+        return self._send(response.status_code, response.json())
+
+    def _send(self, status: int, payload):
+        data = b'' if payload is None else json.dumps(payload, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PATCH(self):
+        self._dispatch('PATCH')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+
+class FakePostgREST(ThreadingHTTPServer):
+    """PostgREST stand-in; `latency` (seconds) adds a gaussian delay per request like a remote database."""
+    daemon_threads = True
+
+    def __init__(self, db_path: str, host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.25):
+        super().__init__((host, port), PostgRESTHandler)
+        self.backend = SQLiteBackend(db_path)
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self.stats_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FakePostgREST':
+        self._thread = threading.Thread(target=self.serve_forever, name='fake-postgrest', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fake PostgREST server backed by SQLite')
+    parser.add_argument('--port', type=int, default=54321)
+    parser.add_argument('--db', default=os.path.join('data', 'local', 'fake_postgrest.db'))
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FakePostgREST(args.db, port=args.port, latency=args.latency_ms / 1000)
+    print(f"Fake PostgREST on {server.url}/rest/v1 (db {args.db})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        sys.exit(0)
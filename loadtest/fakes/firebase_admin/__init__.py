@@ -0,0 +1,21 @@
+"""
+Fake firebase-admin SDK for DietNotify load tests
+Put loadtest/fakes first on PYTHONPATH; FIREBASE_KEY_PATH must point at any existing file.
+"""
+_apps = {}
+
+
+class App:
+    def __init__(self, credential, name: str = '[DEFAULT]'):
+        self.credential = credential
+        self.name = name
+
+
+def initialize_app(credential=None, options=None, name: str = '[DEFAULT]'):
+    app = App(credential, name)
+    _apps[name] = app
+    return app
+
+
+def get_app(name: str = '[DEFAULT]'):
+    return _apps[name]
@@ -0,0 +1,6 @@
+"""Fake firebase_admin.credentials."""
+
+
+class Certificate:
+    def __init__(self, path: str):
+        self.path = path
@@ -0,0 +1,93 @@
+"""
+Fake firebase_admin.messaging: accepts messages after a configurable delay and counts them.
+
+    FAKE_FCM_LATENCY_MS=80          mean send latency
+    FAKE_FCM_UNREGISTERED_RATE=0.0  fraction of tokens reported as unregistered
+"""
+import os
+import time
+import random
+import threading
+import itertools
+
+
+FAKE_FCM_LATENCY_MS = float(os.getenv('FAKE_FCM_LATENCY_MS', '80'))
+FAKE_FCM_UNREGISTERED_RATE = float(os.getenv('FAKE_FCM_UNREGISTERED_RATE', '0'))
+
+_ids = itertools.count(1)
+_lock = threading.Lock()
+sent = 0
+
+
+class UnregisteredError(Exception):
+    pass
+
+
+class _Payload:
+    def __init__(self, *args, **kwargs):
+        self.args = args
+        self.__dict__.update(kwargs)
+
+
+class Notification(_Payload):
+    pass
+
+
+class WebpushNotification(_Payload):
+    pass
+
+
+class WebpushNotificationAction(_Payload):
+    pass
+
+
+class WebpushConfig(_Payload):
+    pass
+
+
+class Message(_Payload):
+    pass
+
+
+class MulticastMessage(_Payload):
+    pass
+
+
+class SendResponse:
+    def __init__(self, message_id: str = None, exception: Exception = None):
+        self.message_id = message_id
+        self.exception = exception
+        self.success = exception is None
+
+
+class BatchResponse:
+    def __init__(self, responses):
+        self.responses = responses
+        self.success_count = sum(1 for r in responses if r.success)
+        self.failure_count = len(responses) - self.success_count
+
+
+def _deliver() -> str:
+    global sent
+    if FAKE_FCM_LATENCY_MS:
+        mean = FAKE_FCM_LATENCY_MS / 1000
+        time.sleep(max(0.0, random.gauss(mean, mean * 0.3)))
+    if FAKE_FCM_UNREGISTERED_RATE and random.random() < FAKE_FCM_UNREGISTERED_RATE:
+        raise UnregisteredError("Requested entity was not found.")
+    with _lock:
+        sent += 1
+    return f"projects/fake/messages/{next(_ids)}"
+
+
+def send(message: Message, dry_run: bool = False) -> str:
+    return _deliver()
+
+
+def send_each_for_multicast(message: MulticastMessage, dry_run: bool = False) -> BatchResponse:
+    responses = []
+    for _ in getattr(message, 'tokens', None) or []:
+        try:
+            responses.append(SendResponse(_deliver()))
+        except UnregisteredError as e:
+            responses.append(SendResponse(exception=e))
+    return BatchResponse(responses)
@@ -0,0 +1,116 @@
+"""
+Fake google-genai SDK for DietNotify load tests
+Put loadtest/fakes first on PYTHONPATH and `from google import genai` resolves here.
+Responses have the shape each DietAI call parses, with configurable latency, size and errors:
+
+    FAKE_GENAI_LATENCY_MS=1500      mean generate_content latency
+    FAKE_GENAI_JITTER=0.3           latency standard deviation as a fraction of the mean
+    FAKE_GENAI_RESPONSE_BYTES=12000 approximate size of JSON plan / report bodies
+    FAKE_GENAI_ERROR_RATE=0.0       fraction of calls that fail with a 429 RESOURCE_EXHAUSTED error
+"""
+import os
+import json
+import time
+import random
+
+from . import types
+
+
+FAKE_GENAI_LATENCY_MS = float(os.getenv('FAKE_GENAI_LATENCY_MS', '1500'))
+FAKE_GENAI_JITTER = float(os.getenv('FAKE_GENAI_JITTER', '0.3'))
+FAKE_GENAI_RESPONSE_BYTES = int(os.getenv('FAKE_GENAI_RESPONSE_BYTES', '12000'))
+FAKE_GENAI_ERROR_RATE = float(os.getenv('FAKE_GENAI_ERROR_RATE', '0'))
+
+MEALS = [
+    ("07:30", "Breakfast"), ("10:30", "Mid-Morning Snack"), ("13:00", "Lunch"),
+    ("16:30", "Evening Snack"), ("20:00", "Dinner"),
+]
+
+
+class UsageMetadata:
+    def __init__(self, prompt_tokens: int, output_tokens: int):
+        self.prompt_token_count = prompt_tokens
+        self.candidates_token_count = output_tokens
+        self.total_token_count = prompt_tokens + output_tokens
+
+
+class GenerateContentResponse:
+    def __init__(self, text: str, prompt_chars: int):
+        self.text = text
+        self.usage_metadata = UsageMetadata(prompt_chars // 4, len(text) // 4)
+
+
+def _pad(payload: dict, size: int) -> dict:
+    """Grow a JSON body towards `size` bytes with plausible bullet lists."""
+    filler = []
+    while len(json.dumps(payload)) + sum(len(f) + 4 for f in filler) < size:
+        filler.append(f"Keep portions steady and hydrate well (note {len(filler) + 1})")
+    payload["notes"] = filler
+    return payload
+
+
+def _plan() -> dict:
+    return _pad({
+        "user_overview": {
+            "bmi": 22.5, "daily_calories_target": 2200, "protein_target_g": 120,
+            "carbs_target_g": 260, "fat_target_g": 70, "fiber_target_g": 32, "water_target_l": 3.0
+        },
+        "diet_protocol": {
+            "meals": [
+                {"time": t, "name": name, "items": ["Paneer", "Brown rice", "Dal"],
+                 "macros": {"calories": 440, "protein": 24, "carbs": 52, "fat": 14}}
+                for t, name in MEALS
+            ]
+        },
+        "bio_analysis": {"strengths": ["Consistent sleep"], "risks": ["Low fibre intake"]},
+    }, FAKE_GENAI_RESPONSE_BYTES)
+
+
+def _report() -> dict:
+    return _pad({
+        "matrices": {
+            window: {"score": random.randint(40, 90), "analysis": ["Steady adherence on logged days"]}
+            for window in ("today", "weekly", "monthly")
+        },
+        "improvement_protocol": {"daily_tactics": ["Log every meal"], "monthly_strategy": ["Add a protein snack"]},
+        "chart_data": {
+            "radar": {"labels": ["Discipline", "Timing", "Variety", "Hydration", "Recovery", "Energy"],
+                      "values": [random.randint(50, 95) for _ in range(6)]},
+            "trend": {"labels": [], "values": []}
+        }
+    }, FAKE_GENAI_RESPONSE_BYTES // 2)
+
+
+def _experts() -> list:
+    return [
+        {"id": f"expert-{n}", "name": f"Clinic {n}", "address": f"{n} Main Road",
+         "type": "Nutritionist", "relevance": "Vegetarian sports nutrition"}
+        for n in range(1, 6)
+    ]
+
+
+class Models:
+    def generate_content(self, model: str, contents: str, config: types.GenerateContentConfig = None):
+        config = config or types.GenerateContentConfig()
+        if FAKE_GENAI_LATENCY_MS:
+            mean = FAKE_GENAI_LATENCY_MS / 1000
+            time.sleep(max(0.0, random.gauss(mean, mean * FAKE_GENAI_JITTER)))
+        if FAKE_GENAI_ERROR_RATE and random.random() < FAKE_GENAI_ERROR_RATE:
+            raise RuntimeError("429 RESOURCE_EXHAUSTED: fake quota exceeded")
+
+        instruction = config.system_instruction or ''
+        if config.response_mime_type != 'application/json':
+            text = "Great question! Aim for a protein source at every meal and keep water nearby."
+        elif 'JSON array' in instruction:
+            text = json.dumps(_experts())
+        elif 'Progress Intelligence Report' in (contents or ''):
+            text = json.dumps(_report())
+        else:
+            text = json.dumps(_plan())
+        return GenerateContentResponse(text, len(contents or '') + len(instruction))
+
+
+class Client:
+    def __init__(self, api_key: str = None, **kwargs):
+        self.api_key = api_key
+        self.models = Models()
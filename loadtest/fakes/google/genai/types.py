@@ -0,0 +1,11 @@
+"""Fake google.genai.types: just the config object DietAI builds."""
+
+
+class GenerateContentConfig:
+    def __init__(self, system_instruction: str = None, response_mime_type: str = None,
+                 max_output_tokens: int = None, temperature: float = None, **kwargs):
+        self.system_instruction = system_instruction
+        self.response_mime_type = response_mime_type
+        self.max_output_tokens = max_output_tokens
+        self.temperature = temperature
+        self.extra = kwargs
@@ -0,0 +1,139 @@
+"""
+Scripted User Journeys for DietNotify load tests
+Each virtual user walks the real onboarding-to-analysis flow over HTTP with its own
+cookie session; every request is timed under a step name for the report.
+"""
+import time
+import random
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Any, List, Optional
+
+import requests
+
+
+PROFILE_STEPS = [
+    {"name": "Load Tester", "gender": "female", "age": 29, "height": 165, "weight": 62},
+    {"job_activity": "moderate", "exercise_days": 4, "sleep_hours": 7, "water_intake": 2.5},
+    {"conditions": [], "allergies": [], "on_medication": "no", "medications": ""},
+    {"diet_type": "vegetarian", "cuisine": "indian", "spice_level": "medium", "meals_per_day": 5},
+    {"goal": "lose_weight", "target_weight": 58, "timeline": "3_months"},
+]
+MEALS = ["Breakfast", "Mid-Morning Snack", "Lunch", "Evening Snack", "Dinner"]
+TRACKING_DAYS = 7
+
+
+class JourneyError(Exception):
+    """A step returned an unexpected status; the rest of the journey is skipped."""
+
+
+class Journey:
+    """
+    One virtual user. `record(step, seconds, status, size)` is called for every
+    request; `think` seconds (randomised +-50%) pass between steps like a real user.
+    """
+
+    def __init__(self, base_url: str, user_id: str, record: Callable[[str, float, int, int], None],
+                 think: float = 0.0, timeout: float = 120.0):
+        self.base_url = base_url.rstrip('/')
+        self.user_id = user_id
+        self.record = record
+        self.think = think
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _call(self, step: str, method: str, path: str, json_body=None, expect=(200,)) -> Optional[Dict[str, Any]]:
+        started = time.perf_counter()
+        status, size, payload = 0, 0, None
+        try:
+            response = self.session.request(method, self.base_url + path, json=json_body, timeout=self.timeout)
+            status, size = response.status_code, len(response.content)
+            if 'json' in response.headers.get('Content-Type', ''):
+                payload = response.json()
+        except requests.RequestException:
+            status = 0
+        finally:
+            self.record(step, time.perf_counter() - started, status, size)
+        if status not in expect:
+            raise JourneyError(f"{step}: {method} {path} -> {status}")
+        return payload
+
+    def _pause(self):
+        if self.think:
+            time.sleep(self.think * random.uniform(0.5, 1.5))
+
+    # ============== STEPS ==============
+
+    def signup(self):
+        self._call('signup', 'POST', '/api/auth/signup', {"user_id": self.user_id, "password": "loadtest"})
+
+    def profile(self):
+        for step, data in enumerate(PROFILE_STEPS, start=1):
+            self._call('profile_step', 'POST', '/api/auth/profile/step', {"step": step, "data": data})
+        self._call('auth_status', 'GET', '/api/auth/status')
+
+    def generate(self) -> Dict[str, Any]:
+        plan = self._call('generate', 'POST', '/api/diet/generate_all', {"duration": "weekly"})
+        if not plan or plan.get('error'):
+            raise JourneyError(f"generate: {plan.get('error') if plan else 'empty response'}")
+        return plan
+
+    def save(self, plan: Dict[str, Any]):
+        self._call('save_plan', 'POST', '/api/diet/save_plan', {"plan_data": plan, "duration_type": "weekly"})
+        self._call('active_plan', 'GET', '/api/diet/active_plan')
+
+    def notify(self):
+        token = f"fake-fcm-{self.user_id}"
+        self._call('notify_register', 'POST', '/api/notifications/register',
+                   {"token": token, "device_info": {"platform": "loadtest"}})
+        self._call('notify_test', 'POST', '/api/notifications/test', {"token": token})
+
+    def track(self):
+        today = datetime.now().date()
+        # Backfill the past week in one batch, then log today like the tracking page does
+        days = []
+        for offset in range(TRACKING_DAYS - 1, 0, -1):
+            items = [{"name": meal, "score": random.randint(4, 10)} for meal in MEALS]
+            days.append({
+                "date": (today - timedelta(days=offset)).strftime('%Y-%m-%d'),
+                "items": items,
+                "total_score": round(sum(i['score'] for i in items) / len(items), 1)
+            })
+        self._call('track_batch', 'POST', '/api/tracking/batch', {"entries": days})
+        items = [{"name": meal, "score": random.randint(4, 10)} for meal in MEALS]
+        self._call('track_save', 'POST', '/api/tracking/save', {
+            "date": today.strftime('%Y-%m-%d'),
+            "items": items,
+            "total_score": round(sum(i['score'] for i in items) / len(items), 1)
+        })
+        self._call('track_summary', 'GET', '/api/tracking/summary?range=30d')
+
+    def analysis(self):
+        self._call('analysis', 'POST', '/api/tracking/ai-analysis')
+
+    def run(self, notifications: bool = True) -> bool:
+        """Full journey; False if a step failed (the failure is already recorded)."""
+        try:
+            self.signup()
+            self._pause()
+            self.profile()
+            self._pause()
+            plan = self.generate()
+            self._pause()
+            self.save(plan)
+            if notifications:
+                self.notify()
+            self._pause()
+            self.track()
+            self._pause()
+            self.analysis()
+            return True
+        except JourneyError:
+            return False
+        finally:
+            self.session.close()
+
+
+JOURNEY_STEPS: List[str] = [
+    'signup', 'profile_step', 'auth_status', 'generate', 'save_plan', 'active_plan',
+    'notify_register', 'notify_test', 'track_batch', 'track_save', 'track_summary', 'analysis',
+]
@@ -0,0 +1,248 @@
+"""
+Load Test Runner for DietNotify
+Starts the fake PostgREST server, launches the real app under gunicorn with the fake
+genai / firebase-admin packages on its path, drives scripted journeys at a fixed
+concurrency and reports throughput and per-step latency (text table + JSON).
+
+Run with:  python -m loadtest.run --users 100 --concurrency 20 --workers 2 --threads 8
+           python -m loadtest.run --target http://127.0.0.1:5000   (already-running app; no fakes started)
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Any, List
+
+import requests
+
+from .fake_postgrest import FakePostgREST
+from .journeys import Journey, JOURNEY_STEPS
+
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+FAKES_DIR = os.path.join(os.path.dirname(__file__), 'fakes')
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+READY_TIMEOUT = 120   # seconds to wait for /readyz after launching the server
+
+
+# ============== RESULTS ==============
+
+def percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class Recorder:
+    """Thread-safe per-step latency / status / size samples."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)    # step -> [(seconds, status, bytes)]
+
+    def __call__(self, step: str, seconds: float, status: int, size: int):
+        with self._lock:
+            self.samples[step].append((seconds, status, size))
+
+    def summary(self) -> Dict[str, Any]:
+        steps = {}
+        order = JOURNEY_STEPS + sorted(s for s in self.samples if s not in JOURNEY_STEPS)
+        for step in order:
+            samples = self.samples.get(step)
+            if not samples:
+                continue
+            latencies = sorted(s[0] for s in samples)
+            statuses = defaultdict(int)
+            for _, status, _ in samples:
+                statuses[str(status)] += 1
+            steps[step] = {
+                "count": len(samples),
+                "errors": sum(1 for _, status, _ in samples if not 200 <= status < 400),
+                "statuses": dict(statuses),
+                "mean_ms": sum(latencies) / len(latencies) * 1000,
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p90_ms": percentile(latencies, 90) * 1000,
+                "p99_ms": percentile(latencies, 99) * 1000,
+                "max_ms": latencies[-1] * 1000,
+                "mean_bytes": sum(s[2] for s in samples) / len(samples),
+            }
+        return steps
+
+
+# ============== SERVER ==============
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def app_environment(args, postgrest_url: str, workdir: str) -> Dict[str, str]:
+    """Environment for the app process: real code paths, fake upstreams."""
+    key_path = os.path.join(workdir, 'firebase-admin-key.json')
+    with open(key_path, 'w') as f:
+        json.dump({"type": "service_account", "project_id": "loadtest"}, f)
+
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": os.pathsep.join([FAKES_DIR, BASE_DIR, env.get('PYTHONPATH', '')]).rstrip(os.pathsep),
+        "STORAGE_BACKEND": "supabase",
+        "SUPABASE_URL": postgrest_url,
+        "SUPABASE_ANON_KEY": "loadtest-anon-key",
+        "GEMINI_API_KEY": ",".join(f"fake-gemini-key-{n}" for n in range(1, args.keys + 1)),
+        "FIREBASE_KEY_PATH": key_path,
+        "FLASK_SECRET_KEY": "loadtest-secret",
+        "FAKE_GENAI_LATENCY_MS": str(args.genai_latency_ms),
+        "FAKE_GENAI_RESPONSE_BYTES": str(args.genai_bytes),
+        "FAKE_GENAI_ERROR_RATE": str(args.genai_error_rate),
+        "FAKE_FCM_LATENCY_MS": str(args.fcm_latency_ms),
+        "LOG_LEVEL": args.log_level,
+        "NOTIFICATION_LOG_FILE": "",
+        "PROFILE_JOURNAL_DIR": "",
+    })
+    return env
+
+
+def launch_app(args, env: Dict[str, str]) -> subprocess.Popen:
+    if args.server == 'gunicorn':
+        command = [sys.executable, '-m', 'gunicorn', 'run:app',
+                   '--bind', f"127.0.0.1:{args.port}",
+                   '--workers', str(args.workers), '--threads', str(args.threads),
+                   '--timeout', '600']
+    else:
+        # Werkzeug threaded server: for machines without gunicorn (e.g. Windows); not representative
+        command = [sys.executable, '-c',
+                   f"from run import app; app.run(host='127.0.0.1', port={args.port}, threaded=True)"]
+    return subprocess.Popen(command, cwd=BASE_DIR, env=env)
+
+
+def wait_ready(base_url: str, process: subprocess.Popen = None, timeout: float = READY_TIMEOUT):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"App process exited with code {process.returncode}")
+        try:
+            if requests.get(f"{base_url}/readyz", timeout=2).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"App at {base_url} not ready after {timeout}s")
+
+
+# ============== DRIVER ==============
+
+def run_journeys(base_url: str, args) -> Dict[str, Any]:
+    recorder = Recorder()
+    run_id = datetime.now().strftime('%H%M%S')
+    outcomes = []
+
+    def one(n: int):
+        journey = Journey(base_url, f"lt{run_id}u{n}", recorder, think=args.think)
+        outcomes.append(journey.run(notifications=not args.no_notifications))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(one, range(args.users)))
+    elapsed = time.perf_counter() - started
+
+    steps = recorder.summary()
+    requests_total = sum(s['count'] for s in steps.values())
+    completed = sum(1 for ok in outcomes if ok)
+    return {
+        "elapsed_s": elapsed,
+        "journeys": {"started": args.users, "completed": completed, "failed": args.users - completed},
+        "throughput": {
+            "journeys_per_s": completed / elapsed if elapsed else 0.0,
+            "requests_per_s": requests_total / elapsed if elapsed else 0.0,
+        },
+        "requests": requests_total,
+        "errors": sum(s['errors'] for s in steps.values()),
+        "steps": steps,
+    }
+
+
+def print_report(result: Dict[str, Any]):
+    j, t = result['journeys'], result['throughput']
+    print(f"\n{j['completed']}/{j['started']} journeys in {result['elapsed_s']:.1f}s  "
+          f"({t['journeys_per_s']:.2f} journeys/s, {t['requests_per_s']:.1f} req/s, {result['errors']} errors)")
+    print(f"{'step':<18}{'count':>7}{'err':>6}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, s in result['steps'].items():
+        print(f"{name:<18}{s['count']:>7}{s['errors']:>6}{s['p50_ms']:>10.1f}{s['p90_ms']:>10.1f}"
+              f"{s['p99_ms']:>10.1f}{s['max_ms']:>10.1f}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=50, help='journeys to run in total')
+    parser.add_argument('--concurrency', type=int, default=10, help='journeys in flight at once')
+    parser.add_argument('--think', type=float, default=0.0, help='mean think time between steps (s)')
+    parser.add_argument('--no-notifications', action='store_true', help='skip FCM register/test steps')
+    parser.add_argument('--target', help='base URL of an already-running app (no server or fakes started)')
+    parser.add_argument('--server', choices=('gunicorn', 'flask'), default='gunicorn')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--port', type=int, default=0, help='app port (default: a free port)')
+    parser.add_argument('--keys', type=int, default=3, help='fake Gemini API keys in the pool')
+    parser.add_argument('--db-latency-ms', type=float, default=25.0, help='fake PostgREST latency per request')
+    parser.add_argument('--genai-latency-ms', type=float, default=1500.0)
+    parser.add_argument('--genai-bytes', type=int, default=12000, help='fake plan/report response size')
+    parser.add_argument('--genai-error-rate', type=float, default=0.0, help='fraction of 429s from fake Gemini')
+    parser.add_argument('--fcm-latency-ms', type=float, default=80.0)
+    parser.add_argument('--log-level', default='WARNING', help='LOG_LEVEL for the app process')
+    parser.add_argument('--output', help='results file (default loadtest/results/<timestamp>.json)')
+    args = parser.parse_args(argv)
+
+    postgrest, process = None, None
+    with tempfile.TemporaryDirectory(prefix='dietnotify-loadtest-') as workdir:
+        try:
+            if args.target:
+                base_url = args.target.rstrip('/')
+                wait_ready(base_url)
+            else:
+                postgrest = FakePostgREST(os.path.join(workdir, 'postgrest.db'),
+                                          latency=args.db_latency_ms / 1000).start()
+                args.port = args.port or _free_port()
+                base_url = f"http://127.0.0.1:{args.port}"
+                process = launch_app(args, app_environment(args, postgrest.url, workdir))
+                wait_ready(base_url, process)
+
+            print(f"Driving {args.users} journeys at concurrency {args.concurrency} against {base_url}")
+            result = run_journeys(base_url, args)
+            if postgrest:
+                result["fake_postgrest_requests"] = postgrest.requests
+        finally:
+            if process is not None:
+                process.terminate()
+                try:
+                    process.wait(timeout=15)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            if postgrest is not None:
+                postgrest.stop()
+
+    print_report(result)
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "config": {k: v for k, v in vars(args).items() if k != 'output'},
+        "result": result,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime('loadtest-%Y%m%d-%H%M%S.json'))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+    print(f"Results written to {output}")
+    return 0 if result['journeys']['failed'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
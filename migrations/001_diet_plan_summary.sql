@@ -0,0 +1,16 @@
+-- Split diet_plans into a small summary record and a compressed full protocol.
+-- New rows are written with plan_summary + plan_blob and a NULL plan_data;
+-- legacy rows keep plan_data and are decoded transparently by the app.
+
+ALTER TABLE diet_plans ADD COLUMN IF NOT EXISTS plan_summary jsonb;
+ALTER TABLE diet_plans ADD COLUMN IF NOT EXISTS plan_blob text;
+ALTER TABLE diet_plans ALTER COLUMN plan_data DROP NOT NULL;
+
+-- Backfill summaries for existing plans (same shape as plan_storage.build_plan_summary)
+UPDATE diet_plans
+SET plan_summary = jsonb_build_object(
+    'user_overview', COALESCE(plan_data->'user_overview', '{}'::jsonb),
+    'diet_protocol', jsonb_build_object('meals', COALESCE(plan_data->'diet_protocol'->'meals', '[]'::jsonb)),
+    'bio_summary', COALESCE(plan_data->'bio_analysis'->>'body_type', 'N/A')
+)
+WHERE plan_summary IS NULL AND plan_data IS NOT NULL;
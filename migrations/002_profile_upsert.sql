@@ -0,0 +1,4 @@
+-- Profile auto-save flushes a single merged upsert (on_conflict=user_id),
+-- which requires a unique constraint on profiles.user_id.
+
+CREATE UNIQUE INDEX IF NOT EXISTS profiles_user_id_key ON profiles (user_id);
@@ -0,0 +1,4 @@
+-- Bulk tracking sync: upsert on (user_id, date) and skip unchanged days by content hash.
+
+ALTER TABLE daily_tracking ADD COLUMN IF NOT EXISTS content_hash text;
+CREATE UNIQUE INDEX IF NOT EXISTS daily_tracking_user_id_date_key ON daily_tracking (user_id, date);
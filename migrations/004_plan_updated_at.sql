@@ -0,0 +1,5 @@
+-- Version timestamp for diet plans, used to build ETags for /api/diet/active_plan.
+-- Written on insert and whenever a plan is (re)activated.
+
+ALTER TABLE diet_plans ADD COLUMN IF NOT EXISTS updated_at timestamptz;
+UPDATE diet_plans SET updated_at = created_at WHERE updated_at IS NULL;
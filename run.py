@@ -1,10 +1,11 @@
-from app import create_app
 from dotenv import load_dotenv
 import os
 
-# Load environment variables
+# Load environment variables (before importing the app: module settings such as LOG_LEVEL are read at import)
 load_dotenv()
 
+from app import create_app
+
 app = create_app()
 
 if __name__ == '__main__':